@@ -1,20 +1,51 @@
 import os
 import sys
 import tkinter as tk
-from tkinter import filedialog, ttk, messagebox, scrolledtext
+from tkinter import filedialog, ttk, messagebox, simpledialog
+from tkinter import font as tkfont
 import json
 import re
+import queue
+import sqlite3
+import threading
+import time
+import functools
 from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from testpoint_core import (FileContent, format_size, make_source_spec, split_source_spec, source_exists, source_dedupe_key,
+                            is_json_source, is_archive_source, write_testpoints_json,
+                            ParseCache, ContentStore, DirectoryWatcher, MappedDocument,
+                            load_json_testpoints, load_text_testpoints, find_related_testpoints,
+                            scan_testpoint_folder, load_archive_testpoints, read_testpoint_pair,
+                            parse_testpoint_source, DocumentCache, process_rss)
+from testpoint_compare import COMPARE_MODES, LINE_MODE, DiffDocument
+from testpoint_judge import AC, SKIP, build_command, judge_testpoints
+from testpoint_search import INPUT_SIDE, MAX_RESULTS, search_testpoints
+from testpoint_stats import stats_testpoints
+from testpoint_profile import PROFILE_ENV, Profiler, content_bytes, parse_profile_mode
+
+CONFIG_DIR_ENV = "LUOGU_TESTPOINT_CONFIG_DIR"  # 设置该环境变量时使用指定的配置目录（例如性能测试时使用独立的配置）
 
 class ConfigManager:
-    """配置管理类，用于保存和加载配置"""
+    """配置管理类，用于保存和加载配置
+    
+    设置定时器后，修改配置只标记为待保存，短暂空闲后合并为一次写入；写入时先写临时文件再替换。
+    """
+    SAVE_DELAY_MS = 500  # 最后一次修改后等待多久再写入磁盘
+    
     def __init__(self):
-        self.config_dir = Path.home() / ".luogu_testpoint_viewer"
+        self.config_dir = Path(os.environ.get(CONFIG_DIR_ENV) or Path.home() / ".luogu_testpoint_viewer")
         self.config_file = self.config_dir / "config.json"
         self.open_tabs_file = self.config_dir / "open_tabs.json"
         self.testpoint_paths_file = self.config_dir / "testpoints.json"
+        self.parse_cache_file = self.config_dir / "parse_cache.sqlite3"
         self.ensure_config_dir()
         self.config = self.load_config()
+        self._scheduler = None  # (after, after_cancel)，为None时立即写入
+        self._save_job = None
+        self._dirty = set()  # 等待写入的文件
+        self._testpoint_paths = None  # testpoints.json在内存中的内容，首次读取后缓存
     
     def ensure_config_dir(self):
         """确保配置目录存在"""
@@ -34,10 +65,45 @@ class ConfigManager:
                 return {"font_size": 10, "view_mode": "side_by_side", "font_family": "Microsoft YaHei UI", "sash_position": 250}
         return {"font_size": 10, "view_mode": "side_by_side", "font_family": "Microsoft YaHei UI", "sash_position": 250}
     
+    def set_scheduler(self, after, after_cancel):
+        """设置延迟保存使用的定时器（例如Tk的after和after_cancel）"""
+        self._scheduler = (after, after_cancel)
+    
     def save_config(self):
-        """保存配置"""
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, ensure_ascii=False, indent=2)
+        """保存配置（设置了定时器时延迟合并写入）"""
+        self._schedule_save(self.config_file)
+    
+    def _schedule_save(self, file_path):
+        """标记文件需要写入，并重新开始计时"""
+        self._dirty.add(file_path)
+        if self._scheduler is None:
+            self.flush()
+            return
+        after, after_cancel = self._scheduler
+        if self._save_job is not None:
+            after_cancel(self._save_job)
+        self._save_job = after(self.SAVE_DELAY_MS, self.flush)
+    
+    def flush(self):
+        """立即写入所有待保存的文件"""
+        self._save_job = None
+        for file_path in list(self._dirty):
+            data = self.config if file_path == self.config_file else self._testpoint_paths
+            try:
+                self._write_json_atomic(file_path, data)
+            except OSError:
+                continue  # 保留待保存状态，下次再试
+            self._dirty.discard(file_path)
+    
+    def _write_json_atomic(self, file_path, data):
+        """先写入临时文件再替换目标文件，写入中断时不会留下不完整的文件"""
+        self.ensure_config_dir()
+        temp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
     
     def get_font_size(self):
         """获取字体大小"""
@@ -75,6 +141,63 @@ class ConfigManager:
         self.config["sash_position"] = position
         self.save_config()
     
+    def get_lazy_loading(self):
+        """获取是否延迟加载测试点内容（默认开启）"""
+        return self.config.get("lazy_loading", True)
+    
+    def set_lazy_loading(self, enabled):
+        """设置是否延迟加载测试点内容"""
+        self.config["lazy_loading"] = bool(enabled)
+        self.save_config()
+    
+    def get_auto_reload(self):
+        """获取是否在测试点文件变化时自动重新加载（默认开启）"""
+        return self.config.get("auto_reload", True)
+    
+    def set_auto_reload(self, enabled):
+        """设置是否在测试点文件变化时自动重新加载"""
+        self.config["auto_reload"] = bool(enabled)
+        self.save_config()
+    
+    def get_max_loaded_tabs(self):
+        """获取最多同时保留内容的标签页数量"""
+        return max(1, int(self.config.get("max_loaded_tabs", 8)))
+    
+    def get_tab_memory_budget(self):
+        """获取标签页内容占用内存的上限（字节），配置项以MB为单位"""
+        return int(self.config.get("tab_memory_budget_mb", 256) * 1024 * 1024)
+    
+    def get_judge_settings(self):
+        """获取上次评测使用的程序路径、时间限制（秒）和内存限制（MB）"""
+        return (self.config.get("judge_program", ""),
+                self.config.get("judge_time_limit", 1.0),
+                self.config.get("judge_memory_limit_mb", 256))
+    
+    def set_judge_settings(self, program, time_limit, memory_limit_mb):
+        """保存评测使用的程序路径、时间限制和内存限制"""
+        self.config["judge_program"] = program
+        self.config["judge_time_limit"] = time_limit
+        self.config["judge_memory_limit_mb"] = memory_limit_mb
+        self.save_config()
+    
+    def get_judge_compare_mode(self):
+        """获取评测时比较输出的方式（line、token或float）和float方式允许的误差"""
+        mode = self.config.get("judge_compare_mode", LINE_MODE)
+        return (mode if mode in COMPARE_MODES else LINE_MODE), float(self.config.get("judge_float_eps", 1e-6))
+    
+    def get_parse_cache_max_bytes(self):
+        """获取解析缓存的容量上限（字节），配置项以MB为单位"""
+        return int(self.config.get("parse_cache_max_mb", 64) * 1024 * 1024)
+    
+    def get_content_cache_max_bytes(self):
+        """获取已显示内容缓存的容量上限（字节），配置项以MB为单位"""
+        return int(self.config.get("content_cache_mb", 256) * 1024 * 1024)
+    
+    def get_profile_mode(self):
+        """获取性能记录模式（默认关闭），环境变量LUOGU_TESTPOINT_PROFILE优先于配置项profiling"""
+        value = os.environ.get(PROFILE_ENV)
+        return parse_profile_mode(value if value is not None else self.config.get("profiling", False))
+    
     def save_open_tabs(self, open_tabs_data):
         """保存已打开的测试点列表 - 根据需求，不再保存open_tabs.json文件"""
         # 不再保存open_tabs.json文件，只保存config.json文件
@@ -91,60 +214,385 @@ class ConfigManager:
         return {}
         
     def save_testpoint_paths(self, testpoint_paths):
-        """保存测试点文件路径列表到testpoints.json"""
+        """保存测试点文件路径列表到testpoints.json（设置了定时器时延迟合并写入）"""
         try:
-            # 确保配置目录存在
-            self.ensure_config_dir()
             # 确保testpoint_paths是一个列表
             if not isinstance(testpoint_paths, list):
                 testpoint_paths = list(testpoint_paths) if testpoint_paths else []
                 
-            # 去除重复的测试点路径（相同基本文件名的文件）
+            # 去除重复的测试点路径（相同基本文件名的文件、相同的文件夹）
             unique_paths = []
             unique_bases = set()
             
             for path in testpoint_paths:
-                if os.path.exists(path):  # 确保文件存在
-                    base_name = os.path.splitext(os.path.basename(path))[0]
+                if source_exists(path):  # 确保文件或文件夹存在
+                    base_name = source_dedupe_key(path)
                     if base_name not in unique_bases:
                         unique_bases.add(base_name)
                         unique_paths.append(path)
             
-            with open(self.testpoint_paths_file, 'w', encoding='utf-8') as f:
-                json.dump(unique_paths, f, ensure_ascii=False, indent=2)
+            if unique_paths != self._testpoint_paths:
+                self._testpoint_paths = unique_paths
+                self._schedule_save(self.testpoint_paths_file)
             return True
         except Exception as e:
             return False
     
     def load_testpoint_paths(self):
-        """从testpoints.json加载测试点文件路径列表"""
+        """加载测试点文件路径列表（首次从testpoints.json读取，之后使用内存中的内容）"""
+        if self._testpoint_paths is None:
+            self._testpoint_paths = self._read_testpoint_paths()
+        
+        # 验证路径格式
+        valid_paths = []
+        for path in self._testpoint_paths:
+            try:
+                # 尝试规范化路径格式
+                norm_path = os.path.normpath(path)
+                if source_exists(norm_path):
+                    valid_paths.append(norm_path)
+            except Exception as e:
+                pass
+        return valid_paths
+    
+    def _read_testpoint_paths(self):
+        """从testpoints.json读取测试点文件路径列表"""
         if self.testpoint_paths_file.exists():
             try:
                 with open(self.testpoint_paths_file, 'r', encoding='utf-8') as f:
                     content = f.read().strip()
                     if not content:  # 处理空文件的情况
                         return []
-                    
                     paths = json.loads(content)
-                    # 验证路径格式
-                    valid_paths = []
-                    for path in paths:
-                        try:
-                            # 尝试规范化路径格式
-                            norm_path = os.path.normpath(path)
-                            if os.path.exists(norm_path):
-                                valid_paths.append(norm_path)
-                        except Exception as e:
-                            pass
-                    
-                    return valid_paths
+                    return paths if isinstance(paths, list) else []
             except json.JSONDecodeError as e:
                 return []  # JSON解析错误时返回空列表
             except Exception as e:
                 return []  # 其他错误时也返回空列表
         return []
 
+class VirtualTextView(ttk.Frame):
+    """虚拟化文本视图，Text组件中只保留可见行及少量余量，滚动时从文档中按需分页读取"""
+    MARGIN_LINES = 100  # 可见区域上下额外渲染的行数
+    
+    def __init__(self, master, document_cache=None, **text_options):
+        super().__init__(master)
+        self.document_cache = document_cache  # 多个视图共享的文档缓存，为None时每次都重新读取
+        self.document = None
+        self.top_line = 0
+        self.window_start = 0
+        self.window_end = 0
+        self._rendering = False
+        self._pending_render = None
+        
+        self.scrollbar = ttk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.text = tk.Text(self, state=tk.DISABLED, **text_options)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.configure(yscrollcommand=self._on_text_scroll)
+        self.text.bind("<Configure>", self._on_resize)
+    
+    def set_source(self, source):
+        """显示测试点内容，source可以是FileContent或字符串"""
+        self._close_document()
+        try:
+            if self.document_cache is not None:
+                self.document = self.document_cache.acquire(source)
+            else:
+                self.document = MappedDocument(source)
+        except (OSError, ValueError) as e:
+            self.document = MappedDocument(f"读取文件失败: {str(e)}")
+        self._render(0)
+    
+    def clear(self):
+        """清空视图并释放文档"""
+        self._close_document()
+        self.window_start = self.window_end = self.top_line = 0
+        self._replace_text('')
+        self.scrollbar.set(0.0, 1.0)
+    
+    def get_text(self):
+        """获取完整内容（而不仅是当前渲染的部分）"""
+        if self.document is None:
+            return ''
+        return self.document.get_text()
+    
+    def set_font(self, font):
+        """设置文本字体"""
+        self.text.configure(font=font)
+    
+    def memory_size(self):
+        """当前文档占用的内存字节数"""
+        return self.document.memory_size() if self.document is not None else 0
+    
+    def yview(self, *args):
+        """滚动条回调，按整个文档的行数计算滚动位置"""
+        if self.document is None or not args:
+            return
+        if args[0] == 'moveto':
+            top = int(float(args[1]) * self.document.line_count)
+        elif args[0] == 'scroll':
+            step = 1
+            if args[2].startswith('page'):
+                step = max(1, self._visible_line_count() - 1)
+            top = self.top_line + int(args[1]) * step
+        else:
+            return
+        self.scroll_to_line(top)
+    
+    def scroll_to_line(self, line):
+        """滚动到指定行（从0开始）"""
+        if self.document is None:
+            return
+        visible = self._visible_line_count()
+        line = max(0, min(line, self.document.line_count - visible))
+        if self.window_start <= line and line + visible <= self.window_end:
+            self.text.yview(f"{line - self.window_start + 1}.0")
+        else:
+            self._render(line)
+    
+    def _close_document(self):
+        if self._pending_render is not None:
+            self.after_cancel(self._pending_render)
+            self._pending_render = None
+        if self.document is not None:
+            if self.document_cache is not None:
+                self.document_cache.release(self.document)
+            else:
+                self.document.close()
+            self.document = None
+    
+    def _visible_line_count(self):
+        """估算可见的行数"""
+        height = self.text.winfo_height()
+        if height <= 1:
+            return 50
+        first = int(self.text.index("@0,0").split('.')[0])
+        last = int(self.text.index(f"@0,{height}").split('.')[0])
+        return max(1, last - first + 1)
+    
+    def _replace_text(self, content):
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        if content:
+            self.text.insert(tk.END, content)
+        self.text.configure(state=tk.DISABLED)
+    
+    def _render(self, top):
+        """以top行为可见区域顶部，重新渲染窗口内的行"""
+        self._pending_render = None
+        if self.document is None:
+            return
+        visible = self._visible_line_count()
+        top = max(0, min(top, self.document.line_count - 1))
+        self.window_start = max(0, top - self.MARGIN_LINES)
+        self.window_end = min(self.document.line_count, top + visible + self.MARGIN_LINES)
+        self._rendering = True
+        try:
+            self._replace_text(self.document.get_lines(self.window_start, self.window_end))
+            self.text.yview(f"{top - self.window_start + 1}.0")
+        finally:
+            self._rendering = False
+        self.top_line = top
+        self._update_scrollbar(top, top + visible)
+    
+    def _update_scrollbar(self, top, bottom):
+        total = max(1, self.document.line_count)
+        self.scrollbar.set(top / total, min(1.0, bottom / total))
+    
+    def _on_text_scroll(self, first, last):
+        """Text组件自身滚动（滚轮、选择拖动等）时同步整体滚动位置，接近窗口边缘时重新分页"""
+        if self.document is None:
+            self.scrollbar.set(first, last)
+            return
+        height = self.text.winfo_height()
+        top = self.window_start + int(self.text.index("@0,0").split('.')[0]) - 1
+        bottom = self.window_start + int(self.text.index(f"@0,{height}").split('.')[0])
+        self.top_line = top
+        self._update_scrollbar(top, bottom)
+        if self._rendering or self._pending_render is not None:
+            return
+        near_start = self.window_start > 0 and top - self.window_start < self.MARGIN_LINES // 2
+        near_end = self.window_end < self.document.line_count and self.window_end - bottom < self.MARGIN_LINES // 2
+        if near_start or near_end:
+            self._pending_render = self.after_idle(self._render, top)
+    
+    def _on_resize(self, event):
+        """窗口变大时补足渲染范围"""
+        if self.document is None or self._pending_render is not None:
+            return
+        if self.top_line + self._visible_line_count() > self.window_end and self.window_end < self.document.line_count:
+            self._pending_render = self.after_idle(self._render, self.top_line)
+    
+    def destroy(self):
+        self._close_document()
+        super().destroy()
+
+class DiffTextView(VirtualTextView):
+    """差异对比中的一侧：只渲染和高亮可见窗口内的行，并与另一侧保持相同的滚动位置"""
+    TAG_COLORS = {"changed": "#fff3c4", "removed": "#ffd7d5", "added": "#d4f7d4", "filler": "#eeeeee"}
+    
+    def __init__(self, master, **text_options):
+        super().__init__(master, **text_options)
+        self.partner = None  # 另一侧的视图
+        self._syncing = False
+        for tag, color in self.TAG_COLORS.items():
+            self.text.tag_configure(tag, background=color)
+    
+    def set_document(self, side):
+        """显示DiffDocument中一侧的对齐视图"""
+        self._close_document()
+        self.document = side
+        self._render(0)
+    
+    def _render(self, top):
+        super()._render(top)
+        if self.document is None:
+            return
+        for tag in self.TAG_COLORS:
+            self.text.tag_remove(tag, "1.0", tk.END)
+        for tag, first, last in self.document.line_tags(self.window_start, self.window_end):
+            self.text.tag_add(tag, f"{first - self.window_start + 1}.0", f"{last - self.window_start + 1}.0")
+        self._sync_partner()
+    
+    def _on_text_scroll(self, first, last):
+        super()._on_text_scroll(first, last)
+        self._sync_partner()
+    
+    def _sync_partner(self):
+        """让另一侧滚动到相同的行位置"""
+        partner = self.partner
+        if partner is None or partner.document is None or self._syncing or partner.top_line == self.top_line:
+            return
+        partner._syncing = True
+        try:
+            partner.scroll_to_line(self.top_line)
+        finally:
+            partner._syncing = False
+
+class DiffWindow(tk.Toplevel):
+    """逐行差异对比窗口，在后台线程中计算差异，两侧只渲染可见部分"""
+    
+    def __init__(self, master, left_title, right_title, font):
+        super().__init__(master)
+        self.title(f"差异对比 - {left_title} / {right_title}")
+        self.geometry("900x600")
+        self.diff_document = None
+        self.diff_queue = queue.Queue()
+        self.diff_after = None
+        self.closed = False
+        
+        top_frame = ttk.Frame(self)
+        top_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Button(top_frame, text="上一处差异", command=self.previous_change).pack(side=tk.LEFT, padx=2)
+        ttk.Button(top_frame, text="下一处差异", command=self.next_change).pack(side=tk.LEFT, padx=2)
+        self.status_var = tk.StringVar(value="正在比较...")
+        ttk.Label(top_frame, textvariable=self.status_var).pack(side=tk.LEFT, padx=10)
+        
+        views_frame = ttk.Frame(self)
+        views_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        views_frame.columnconfigure(0, weight=1, uniform="side")
+        views_frame.columnconfigure(1, weight=1, uniform="side")
+        views_frame.rowconfigure(0, weight=1)
+        
+        left_frame = ttk.LabelFrame(views_frame, text=left_title)
+        left_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 2))
+        right_frame = ttk.LabelFrame(views_frame, text=right_title)
+        right_frame.grid(row=0, column=1, sticky="nsew", padx=(2, 0))
+        
+        self.left_view = DiffTextView(left_frame, wrap=tk.NONE, font=font, bg="#fafafa", relief=tk.FLAT, bd=1)
+        self.left_view.pack(fill=tk.BOTH, expand=True)
+        self.right_view = DiffTextView(right_frame, wrap=tk.NONE, font=font, bg="#fafafa", relief=tk.FLAT, bd=1)
+        self.right_view.pack(fill=tk.BOTH, expand=True)
+        self.left_view.partner = self.right_view
+        self.right_view.partner = self.left_view
+        self.current_row = -1
+    
+    def start(self, left_source, right_source):
+        """在后台线程中计算差异，完成后显示"""
+        def run_diff():
+            try:
+                document = DiffDocument(left_source, right_source)
+            except Exception as e:
+                self.diff_queue.put((None, e))
+                return
+            if self.closed:
+                document.close()
+            else:
+                self.diff_queue.put((document, None))
+        
+        threading.Thread(target=run_diff, daemon=True).start()
+        self.diff_after = self.after(100, self.process_diff_result)
+    
+    def process_diff_result(self):
+        """取出后台计算的差异结果"""
+        try:
+            document, error = self.diff_queue.get_nowait()
+        except queue.Empty:
+            self.diff_after = self.after(100, self.process_diff_result)
+            return
+        self.diff_after = None
+        if error is not None:
+            self.status_var.set(f"比较失败: {str(error)}")
+            return
+        self.diff_document = document
+        self.left_view.set_document(document.left)
+        self.right_view.set_document(document.right)
+        if document.changes:
+            self.status_var.set(f"共 {len(document.changes)} 处差异")
+            self.next_change()
+        else:
+            self.status_var.set("两侧内容相同（忽略行末空白字符）")
+    
+    def next_change(self):
+        """滚动到下一处差异"""
+        self._show_change(self.diff_document and self.diff_document.next_change(self.current_row))
+    
+    def previous_change(self):
+        """滚动到上一处差异"""
+        self._show_change(self.diff_document and self.diff_document.previous_change(self.current_row))
+    
+    def _show_change(self, row):
+        if row is None:
+            return
+        self.current_row = row
+        self.left_view.scroll_to_line(row)
+        index = self.diff_document.change_index(row) + 1
+        self.status_var.set(f"第 {index}/{len(self.diff_document.changes)} 处差异")
+    
+    def destroy(self):
+        # 两侧视图关闭时会释放各自的文档；差异尚未算完时由后台线程在算完后释放
+        self.closed = True
+        if self.diff_after is not None:
+            self.after_cancel(self.diff_after)
+            try:
+                document, _ = self.diff_queue.get_nowait()
+                if document is not None:
+                    document.close()
+            except queue.Empty:
+                pass
+        self.diff_document = None
+        super().destroy()
+
+def profiled(name):
+    """把TestPointViewer的方法作为一次操作记录耗时（见testpoint_profile.Profiler.measure）"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.measure(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
 class TestPointViewer(tk.Tk):
+    TAB_POOL_SIZE = 8  # 最多保留多少个已关闭标签页的组件用于复用
+    # 统计面板的列：(列名, 标题, 宽度)
+    STATS_COLUMNS = [("name", "测试点", 120), ("input_size", "输入大小", 80), ("input_lines", "行数", 70),
+                     ("input_tokens", "单词数", 80), ("first_min", "首行最小", 90), ("first_max", "首行最大", 90),
+                     ("first_sum", "首行和", 90), ("int_min", "整数最小", 90), ("int_max", "整数最大", 90),
+                     ("int_sum", "整数和", 110), ("output_size", "输出大小", 80), ("output_lines", "输出行数", 70)]
+    
     def __init__(self):
         super().__init__()
         self.title("洛谷测试点查看器")
@@ -159,6 +607,21 @@ class TestPointViewer(tk.Tk):
         
         # 初始化配置管理器
         self.config_manager = ConfigManager()
+        self.config_manager.set_scheduler(self.after, self.after_cancel)
+        
+        # 初始化解析缓存，避免每次启动都重新解析测试点文件
+        try:
+            self.parse_cache = ParseCache(self.config_manager.parse_cache_file,
+                                          self.config_manager.get_parse_cache_max_bytes())
+        except (sqlite3.Error, OSError):
+            self.parse_cache = None
+        
+        # 性能记录（默认关闭），开启时记录保存在配置目录的profiles文件夹中
+        self.profiler = Profiler(self.config_manager.get_profile_mode(), self.config_manager.config_dir / "profiles",
+                                 listener=self.show_profile_status)
+        
+        # 已显示内容的缓存：切换回最近看过的测试点时不必重新读取文件，容量上限可在config.json中设置
+        self.document_cache = DocumentCache(self.config_manager.get_content_cache_max_bytes())
         
         # 绑定窗口关闭事件
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -180,6 +643,22 @@ class TestPointViewer(tk.Tk):
         default_font = (self.font_family, 10)
         self.option_add("*Font", default_font)
         
+        # 所有测试点文本框共用同一个字体对象，修改字体时Tk会自动更新全部使用它的组件
+        self.text_font = tkfont.Font(self, family=self.font_family, size=self.config_manager.get_font_size())
+        
+        # 创建状态栏：左侧显示最近一次操作各阶段的耗时（开启性能记录时），右侧显示内容缓存和进程占用的内存
+        self.status_frame = ttk.Frame(self, relief=tk.SUNKEN)
+        self.status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.memory_status_var = tk.StringVar()
+        self.memory_status_label = ttk.Label(self.status_frame, textvariable=self.memory_status_var, padding=(5, 1))
+        self.memory_status_label.pack(side=tk.RIGHT)
+        self.profile_status_var = tk.StringVar(value="性能记录已开启")
+        if self.profiler.enabled:
+            self.profile_status_bar = ttk.Label(self.status_frame, textvariable=self.profile_status_var, anchor=tk.W,
+                                                padding=(5, 1))
+            self.profile_status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.update_memory_status()
+        
         # 创建主框架
         self.main_frame = ttk.Frame(self)
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -192,12 +671,20 @@ class TestPointViewer(tk.Tk):
         self.select_btn = ttk.Button(self.top_frame, text="选择测试点文件", command=self.select_file)
         self.select_btn.pack(side=tk.LEFT, padx=5)
         
+        # 创建打开文件夹按钮，批量导入整个数据目录
+        self.select_folder_btn = ttk.Button(self.top_frame, text="打开文件夹", command=self.select_folder)
+        self.select_folder_btn.pack(side=tk.LEFT, padx=5)
+        
         # 显示当前选择的文件路径
         self.file_path_var = tk.StringVar()
         self.file_path_var.set("未选择文件")
         self.file_path_label = ttk.Label(self.top_frame, textvariable=self.file_path_var)
         self.file_path_label.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
         
+        # 创建后台加载进度条和取消按钮（加载时才显示）
+        self.cancel_load_btn = ttk.Button(self.top_frame, text="取消加载", command=self.cancel_loading)
+        self.load_progress = ttk.Progressbar(self.top_frame, length=150, mode="determinate")
+        
         # 创建可调整的分隔窗口
         self.paned_window = ttk.PanedWindow(self.main_frame, orient=tk.HORIZONTAL)
         self.paned_window.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -206,6 +693,19 @@ class TestPointViewer(tk.Tk):
         self.list_frame = ttk.LabelFrame(self.paned_window, text="测试点列表")
         self.paned_window.add(self.list_frame, weight=1)
         
+        # 创建搜索栏，在所有测试点的输入和输出中查找文字或正则表达式
+        self.search_frame = ttk.Frame(self.list_frame)
+        self.search_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self.search_frame, textvariable=self.search_var)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_entry.bind("<Return>", lambda event: self.start_search())
+        
+        self.search_regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.search_frame, text="正则", variable=self.search_regex_var).pack(side=tk.LEFT, padx=2)
+        ttk.Button(self.search_frame, text="搜索", width=5, command=self.start_search).pack(side=tk.LEFT)
+        
         # 创建测试点列表和滚动条
         self.list_frame_inner = ttk.Frame(self.list_frame)
         self.list_frame_inner.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -224,14 +724,39 @@ class TestPointViewer(tk.Tk):
         self.testpoint_listbox.bind("<<ListboxSelect>>", self.on_testpoint_select)
         self.testpoint_listbox.bind("<Double-Button-1>", self.on_testpoint_double_click)
         
-        # 配置滚动条
-        self.testpoint_scrollbar.config(command=self.testpoint_listbox.yview)
-        self.testpoint_listbox.config(yscrollcommand=self.testpoint_scrollbar.set)
+        # 评测结果列，与测试点列表逐行对应（评测后才显示）
+        self.judge_listbox = tk.Listbox(self.list_frame_inner, width=20, height=25,
+                                        activestyle="none", bg="#f8f8f8", bd=1, relief=tk.SOLID,
+                                        highlightthickness=0, takefocus=0, exportselection=False)
+        self.judge_listbox.bind("<Button-1>", self.on_judge_column_click)
+        
+        # 配置滚动条，同时滚动测试点列表和评测结果列
+        self.testpoint_scrollbar.config(command=self.scroll_testpoint_list)
+        self.testpoint_listbox.config(yscrollcommand=self.on_testpoint_list_scroll)
+        self.judge_listbox.config(yscrollcommand=lambda first, last: self.testpoint_listbox.yview_moveto(first))
         
         # 创建测试点操作按钮框架
         self.list_btn_frame = ttk.Frame(self.list_frame)
         self.list_btn_frame.pack(fill=tk.X, padx=5, pady=5)
         
+        # 创建搜索结果列表（搜索时才显示），点击结果跳转到对应测试点的对应行
+        self.search_result_frame = ttk.LabelFrame(self.list_frame, text="搜索结果")
+        self.search_result_bar = ttk.Frame(self.search_result_frame)
+        self.search_result_bar.pack(fill=tk.X)
+        self.search_status_var = tk.StringVar()
+        ttk.Label(self.search_result_bar, textvariable=self.search_status_var).pack(side=tk.LEFT, padx=2)
+        ttk.Button(self.search_result_bar, text="关闭", width=5, command=self.close_search_results).pack(side=tk.RIGHT)
+        
+        self.search_result_scrollbar = ttk.Scrollbar(self.search_result_frame)
+        self.search_result_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_result_listbox = tk.Listbox(self.search_result_frame, height=8, activestyle="none",
+                                                bg="#f8f8f8", bd=1, relief=tk.SOLID, highlightthickness=0,
+                                                exportselection=False)
+        self.search_result_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.search_result_listbox.bind("<<ListboxSelect>>", self.on_search_result_select)
+        self.search_result_scrollbar.config(command=self.search_result_listbox.yview)
+        self.search_result_listbox.config(yscrollcommand=self.search_result_scrollbar.set)
+        
         # 创建打开选中测试点按钮
         self.open_btn = ttk.Button(self.list_btn_frame, text="打开选中", 
                                  command=self.open_selected_testpoints)
@@ -252,6 +777,40 @@ class TestPointViewer(tk.Tk):
                                      command=self.close_all_tabs)
         self.close_all_btn.pack(side=tk.RIGHT, padx=2)
         
+        # 创建对比输出按钮
+        self.diff_btn = ttk.Button(self.list_btn_frame, text="对比输出", 
+                                 command=self.compare_selected_outputs)
+        self.diff_btn.pack(side=tk.RIGHT, padx=2)
+        
+        # 创建本地评测按钮
+        self.judge_btn = ttk.Button(self.list_btn_frame, text="本地评测", 
+                                  command=self.judge_testpoints)
+        self.judge_btn.pack(side=tk.RIGHT, padx=2)
+        
+        # 创建测试点统计按钮
+        self.stats_btn = ttk.Button(self.list_btn_frame, text="统计", 
+                                  command=self.toggle_stats_panel)
+        self.stats_btn.pack(side=tk.RIGHT, padx=2)
+        
+        # 创建测试点统计面板（点击统计按钮时才显示在测试点列表右侧），点击列标题排序
+        self.stats_frame = ttk.LabelFrame(self.paned_window, text="测试点统计")
+        self.stats_status_var = tk.StringVar()
+        ttk.Label(self.stats_frame, textvariable=self.stats_status_var).pack(fill=tk.X, padx=5)
+        self.stats_tree_frame = ttk.Frame(self.stats_frame)
+        self.stats_tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.stats_tree = ttk.Treeview(self.stats_tree_frame, columns=[column for column, _, _ in self.STATS_COLUMNS],
+                                       show="headings", selectmode="browse")
+        for column, heading, width in self.STATS_COLUMNS:
+            self.stats_tree.heading(column, text=heading, command=lambda column=column: self.sort_stats_column(column))
+            self.stats_tree.column(column, width=width, minwidth=40, anchor=tk.W if column == "name" else tk.E, stretch=False)
+        self.stats_y_scrollbar = ttk.Scrollbar(self.stats_tree_frame, command=self.stats_tree.yview)
+        self.stats_x_scrollbar = ttk.Scrollbar(self.stats_tree_frame, orient=tk.HORIZONTAL, command=self.stats_tree.xview)
+        self.stats_tree.config(yscrollcommand=self.stats_y_scrollbar.set, xscrollcommand=self.stats_x_scrollbar.set)
+        self.stats_y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.stats_x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.stats_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.stats_tree.bind("<<TreeviewSelect>>", self.on_stats_row_select)
+        
         # 创建内容显示框架
         self.content_frame = ttk.LabelFrame(self.paned_window, text="测试点内容")
         self.paned_window.add(self.content_frame, weight=3)
@@ -333,12 +892,14 @@ class TestPointViewer(tk.Tk):
         self.left_input_copy_btn = ttk.Button(self.left_btn_frame, text="复制", width=4, command=lambda: self.copy_text(self.left_input_text))
         self.left_input_copy_btn.pack(side=tk.RIGHT, padx=5)
         
-        # 创建文本框 - 使用ScrolledText自带的滚动条
+        # 创建文本框 - 使用虚拟化文本视图，自带滚动条
         self.left_input_container = ttk.Frame(self.left_input_frame)
         self.left_input_container.pack(fill=tk.BOTH, expand=True)
         
-        # ScrolledText已经包含了滚动条，不需要额外添加
-        self.left_input_text = scrolledtext.ScrolledText(self.left_input_container, wrap=tk.WORD, bg="#fafafa", relief=tk.FLAT, bd=1)
+        # 大文件只渲染可见部分，滚动时按需读取
+        self.left_input_text = VirtualTextView(self.left_input_container, wrap=tk.WORD, font=self.text_font,
+                                               bg="#fafafa", relief=tk.FLAT, bd=1,
+                                               document_cache=self.document_cache)
         self.left_input_text.pack(fill=tk.BOTH, expand=True)
         
         # 创建右侧输出文本框和复制按钮框架（用于并排显示）
@@ -352,12 +913,14 @@ class TestPointViewer(tk.Tk):
         self.right_output_copy_btn = ttk.Button(self.right_btn_frame, text="复制", width=4, command=lambda: self.copy_text(self.right_output_text))
         self.right_output_copy_btn.pack(side=tk.RIGHT, padx=5)
         
-        # 创建文本框 - 使用ScrolledText自带的滚动条
+        # 创建文本框 - 使用虚拟化文本视图，自带滚动条
         self.right_output_container = ttk.Frame(self.right_output_frame)
         self.right_output_container.pack(fill=tk.BOTH, expand=True)
         
-        # ScrolledText已经包含了滚动条，不需要额外添加
-        self.right_output_text = scrolledtext.ScrolledText(self.right_output_container, wrap=tk.WORD, bg="#fafafa", relief=tk.FLAT, bd=1)
+        # 大文件只渲染可见部分，滚动时按需读取
+        self.right_output_text = VirtualTextView(self.right_output_container, wrap=tk.WORD, font=self.text_font,
+                                                 bg="#fafafa", relief=tk.FLAT, bd=1,
+                                                 document_cache=self.document_cache)
         self.right_output_text.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
         
         # 根据配置设置初始视图模式
@@ -371,8 +934,37 @@ class TestPointViewer(tk.Tk):
         
         # 初始化数据
         self.testpoint_data = {}
+        self.source_testpoint_names = {}  # JSON文件和压缩包来源 -> 从中加载的测试点名称，重新解析时用来找出消失的测试点
+        self.content_store = ContentStore()  # 立即加载的测试点内容按内容去重保存
         self.current_file = None
-        self.open_tabs = {}  # 存储已打开的标签页 {tab_id: {"name": display_name, "original_name": original_name}}
+        self.load_executor = None  # 后台加载使用的线程池
+        self.load_operation = None  # 后台加载的性能记录
+        self.load_queue = queue.Queue()  # 工作线程完成的加载结果，由主线程定时取出
+        self.load_cancelled = threading.Event()
+        self.load_total = 0
+        self.load_done = 0
+        self.export_thread = None  # 正在进行导出的后台线程
+        self.export_cancelled = threading.Event()
+        self.judge_thread = None  # 正在进行本地评测的后台线程
+        self.judge_cancelled = threading.Event()
+        self.judge_results = {}  # 原始名称 -> 评测结果
+        self.search_cancelled = threading.Event()
+        self.search_queue = None  # 当前搜索的结果队列，开始新的搜索时替换
+        self.search_hits = []  # 与搜索结果列表逐行对应
+        self.stats_thread = None  # 正在统计测试点的后台线程
+        self.stats_cancelled = threading.Event()
+        self.stats_queue = None
+        self.stats_values = {}  # 原始名称 -> 统计面板中各列的数值，用于排序
+        self.stats_sort = ("name", False)  # 当前排序的列和是否降序
+        
+        # 测试点列表模型：与列表行一一对应的原始名称，以及缓存的显示名称
+        self.listbox_keys = []  # 第i行对应的原始测试点名称
+        self.listbox_rows = {}  # 原始名称 -> 所在的行
+        self.shown_testpoints = set()  # 已显示在列表中的原始测试点名称
+        self.display_names = {}  # 原始名称 -> 显示名称（只计算一次）
+        self.open_tabs = {}  # 存储已打开的标签页 {tab_id: {"name": display_name, "original_name": original_name, ...}}
+        self.tab_pool = []  # 已关闭、可以复用的标签页组件
+        self.loaded_tabs = OrderedDict()  # 已加载内容的标签页，按最近查看的顺序排列
         
         # 设置文本框字体大小
         self.update_font_size(self.config_manager.get_font_size())
@@ -380,6 +972,16 @@ class TestPointViewer(tk.Tk):
         # 加载上次保存的测试点列表
         self.load_saved_testpoints()
         
+        # 监视测试点来源所在的目录，文件变化时自动重新加载对应的测试点
+        self.watch_queue = queue.Queue()
+        self.watched_sources = []
+        self.watcher = None
+        if self.config_manager.get_auto_reload():
+            self.watcher = DirectoryWatcher(self.collect_changed_testpoints)
+            self.update_watched_sources()
+            self.watcher.start()
+            self.after(200, self.process_watch_changes)
+        
         # 设置分隔窗口位置
         try:
             saved_position = self.config_manager.get_sash_position()
@@ -392,7 +994,9 @@ class TestPointViewer(tk.Tk):
         """选择测试点文件"""
         file_path = filedialog.askopenfilename(
             title="选择测试点文件",
-            filetypes=[("所有文件", "*.*"), ("文本文件", "*.txt"), ("JSON文件", "*.json")]
+            filetypes=[("所有文件", "*.*"), ("文本文件", "*.txt"), ("JSON文件", "*.json"),
+                       ("压缩的JSON文件", "*.json.gz *.json.xz"),
+                       ("测试数据压缩包", "*.zip *.tar *.tar.gz *.tgz *.tar.xz *.tar.bz2")]
         )
         
         if file_path:
@@ -400,8 +1004,51 @@ class TestPointViewer(tk.Tk):
             self.current_file = file_path
             self.load_testpoints(file_path)
     
+    def select_folder(self):
+        """选择测试点数据文件夹，批量导入其中的全部测试点"""
+        dir_path = filedialog.askdirectory(title="选择测试点文件夹")
+        if not dir_path:
+            return
+        
+        recursive = messagebox.askyesno("提示", "是否同时导入子文件夹中的测试点？")
+        self.load_testpoint_folder(dir_path, recursive)
+    
+    @profiled("加载文件夹")
+    def load_testpoint_folder(self, dir_path, recursive=False):
+        """导入文件夹中的全部测试点，整个文件夹作为一个来源保存到testpoints.json"""
+        try:
+            spec = make_source_spec(os.path.normpath(dir_path), recursive)
+            self.profiler.annotate(spec)
+            testpoint_paths = self.config_manager.load_testpoint_paths()
+            if spec in testpoint_paths:
+                messagebox.showinfo("提示", "已加载相同测试点数据")
+                return
+            
+            parsed = self.parse_testpoint_file(spec, operation=self.profiler.current())
+            new_names = self.merge_parsed_testpoints(parsed)
+            if not new_names:
+                messagebox.showinfo("提示", "未找到新的测试点数据")
+                return
+            
+            # 一次性加入列表，并选择第一个新添加的测试点
+            new_index = self.testpoint_listbox.size()
+            self.append_listbox_testpoints(new_names)
+            self.testpoint_listbox.selection_clear(0, tk.END)
+            self.testpoint_listbox.selection_set(new_index)
+            self.testpoint_listbox.see(new_index)
+            self.testpoint_listbox.event_generate("<<ListboxSelect>>")
+            
+            # 保存文件夹来源
+            self.current_file = spec
+            self.file_path_var.set(f"已加载: {dir_path} (共 {self.testpoint_listbox.size()} 个测试点)")
+            self.save_testpoints_data()
+        except Exception as e:
+            messagebox.showerror("错误", f"加载测试点文件夹失败: {str(e)}")
+    
+    @profiled("加载文件")
     def load_testpoints(self, file_path):
         """加载测试点数据，追加到现有列表中"""
+        self.profiler.annotate(file_path)
         try:
             # 检查文件是否已经加载过
             testpoint_paths = self.config_manager.load_testpoint_paths()
@@ -413,12 +1060,12 @@ class TestPointViewer(tk.Tk):
                 return
                 
             # 获取当前文件的基本名称（不含扩展名）
-            current_file_base = os.path.splitext(os.path.basename(file_path))[0]
+            current_file_base = source_dedupe_key(file_path)
             
             # 检查是否已存在相同基本名称的测试点文件
             is_duplicate = False
             for existing_path in testpoint_paths:
-                existing_base = os.path.splitext(os.path.basename(existing_path))[0]
+                existing_base = source_dedupe_key(existing_path)
                 if current_file_base == existing_base:
                     is_duplicate = True
                     break
@@ -428,27 +1075,34 @@ class TestPointViewer(tk.Tk):
                 testpoint_paths.append(file_path)
                 self.config_manager.save_testpoint_paths(testpoint_paths)
             
-            # 保存当前测试点数据的副本
-            current_data = self.testpoint_data.copy()
+            # 先解析到单独的字典中，再通过内容池合并到测试点数据
+            loaded = {}
+            with self.profiler.stage("读取", os.path.getsize(file_path) if self.profiler.enabled else 0):
+                if is_archive_source(file_path):
+                    # 处理压缩包中的测试点文件，压缩包本身就包含了配对的输入输出文件
+                    self.load_archive_testpoints(file_path, loaded)
+                elif is_json_source(file_path):
+                    # 处理JSON格式的测试点文件
+                    self.load_json_testpoints(file_path, loaded)
+                else:
+                    # 处理普通文本格式的测试点文件
+                    self.load_text_testpoints(file_path, loaded)
             
-            # 根据文件类型处理
-            file_ext = os.path.splitext(file_path)[1].lower()
+            if not is_archive_source(file_path):
+                # 尝试查找与当前文件相关的测试点文件（同名不同扩展名）
+                with self.profiler.stage("配对"):
+                    self.find_related_testpoints(file_path, loaded)
+            self.record_source_testpoints(file_path, loaded)
             
-            if file_ext == ".json":
-                # 处理JSON格式的测试点文件
-                self.load_json_testpoints(file_path)
-            else:
-                # 处理普通文本格式的测试点文件
-                self.load_text_testpoints(file_path)
-                
-            # 尝试查找与当前文件相关的测试点文件（同名不同扩展名）
-            self.find_related_testpoints(file_path)
+            # 已有的测试点（例如重新添加或重新配对的文件）按变化处理：释放原来的内容并刷新显示
+            replaced = {name: data for name, data in loaded.items() if name in self.testpoint_data}
+            if replaced:
+                self.apply_testpoint_changes(replaced)
             
-            # 获取新添加的测试点
-            new_testpoints = {}
-            for name, data in self.testpoint_data.items():
-                if name not in current_data:
-                    new_testpoints[name] = data
+            # 新添加的测试点，内容登记到内容池中
+            new_testpoints = {name: data for name, data in loaded.items() if name not in replaced}
+            for name, data in new_testpoints.items():
+                self.testpoint_data[name] = self.content_store.acquire_testpoint(data)
             
             # 如果没有新的测试点，提示用户
             if not new_testpoints:
@@ -456,10 +1110,7 @@ class TestPointViewer(tk.Tk):
                 return
                 
             # 更新测试点列表，只添加新的测试点
-            for tp_name in sorted(new_testpoints.keys()):
-                # 移除文件扩展名显示
-                display_name = self.format_testpoint_name(tp_name)
-                self.testpoint_listbox.insert(tk.END, display_name)
+            self.append_listbox_testpoints(sorted(new_testpoints.keys()))
                 
             # 如果有测试点，默认选择第一个新添加的测试点
             if self.testpoint_listbox.size() > 0:
@@ -479,226 +1130,39 @@ class TestPointViewer(tk.Tk):
         except Exception as e:
             messagebox.showerror("错误", f"加载测试点数据失败: {str(e)}")
     
-    def load_json_testpoints(self, file_path):
-        """加载JSON格式的测试点文件"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-            # 创建临时字典存储新的测试点
-            new_testpoints = {}
-            
-            # 尝试解析不同格式的JSON测试点
-            if isinstance(data, dict):
-                # 如果是字典格式，可能是洛谷的测试点格式
-                if 'testCases' in data:
-                    # 洛谷格式
-                    for i, test_case in enumerate(data['testCases']):
-                        # 使用文件名作为前缀，避免与其他文件的测试点冲突
-                        base_name = os.path.basename(file_path)
-                        name = f"{base_name}_测试点_{i+1}"
-                        new_testpoints[name] = {
-                            'input': test_case.get('input', ''),
-                            'output': test_case.get('output', '')
-                        }
-                else:
-                    # 其他字典格式，假设键是测试点名称
-                    base_name = os.path.basename(file_path)
-                    for name, content in data.items():
-                        if isinstance(content, dict):
-                            # 添加文件名前缀
-                            prefixed_name = f"{base_name}_{name}"
-                            new_testpoints[prefixed_name] = {
-                                'input': content.get('input', ''),
-                                'output': content.get('output', '')
-                            }
-            elif isinstance(data, list):
-                # 如果是列表格式
-                base_name = os.path.basename(file_path)
-                for i, item in enumerate(data):
-                    if isinstance(item, dict):
-                        item_name = item.get('name', f"测试点_{i+1}")
-                        name = f"{base_name}_{item_name}"
-                        new_testpoints[name] = {
-                            'input': item.get('input', ''),
-                            'output': item.get('output', '')
-                        }
-            
-            # 将新的测试点添加到现有测试点数据中
-            self.testpoint_data.update(new_testpoints)
+    def loader_options(self):
+        """按当前配置生成传给核心加载函数的参数"""
+        return {"lazy": self.config_manager.get_lazy_loading(), "content_store": self.content_store}
     
-    def load_text_testpoints(self, file_path):
-        """加载文本格式的测试点文件"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            
-            # 创建临时字典存储新的测试点
-            new_testpoints = {}
-            
-            # 尝试识别测试点格式
-            # 1. 检查是否是输入文件 (.in) 或输出文件 (.out/.ans)
-            base_name = os.path.basename(file_path)
-            # 获取不带扩展名的文件名作为测试点标识符的基础
-            name_without_ext = os.path.splitext(base_name)[0]
-            # 生成唯一的测试点名称，使用目录哈希和不带扩展名的文件名
-            dir_hash = str(abs(hash(os.path.dirname(file_path))) % 10000)
-            unique_name = f"{dir_hash}_{name_without_ext}"
-            
-            # 检查是否已经存在这个测试点
-            if unique_name in self.testpoint_data:
-                # 如果已存在，则更新现有测试点而不是创建新的
-                if re.match(r'.*\.(in|input)$', base_name, re.IGNORECASE):
-                    # 这是一个输入文件，更新输入内容
-                    self.testpoint_data[unique_name]['input'] = content
-                elif re.match(r'.*\.(out|ans|output)$', base_name, re.IGNORECASE):
-                    # 这是一个输出文件，更新输出内容
-                    self.testpoint_data[unique_name]['output'] = content
-                else:
-                    # 不是标准的测试点文件，更新输入内容
-                    self.testpoint_data[unique_name]['input'] = content
-                return
-            
-            if re.match(r'.*\.(in|input)$', base_name, re.IGNORECASE):
-                # 这是一个输入文件，尝试查找对应的输出文件
-                output_file = re.sub(r'\.(in|input)$', '.out', file_path, flags=re.IGNORECASE)
-                if not os.path.exists(output_file):
-                    output_file = re.sub(r'\.(in|input)$', '.ans', file_path, flags=re.IGNORECASE)
-                
-                if os.path.exists(output_file):
-                    with open(output_file, 'r', encoding='utf-8', errors='ignore') as out_f:
-                        output_content = out_f.read()
-                    new_testpoints[unique_name] = {
-                        'input': content,
-                        'output': output_content
-                    }
-                else:
-                    new_testpoints[unique_name] = {
-                        'input': content,
-                        'output': '未找到对应的输出文件'
-                    }
-            elif re.match(r'.*\.(out|ans|output)$', base_name, re.IGNORECASE):
-                # 这是一个输出文件，尝试查找对应的输入文件
-                input_file = re.sub(r'\.(out|ans|output)$', '.in', file_path, flags=re.IGNORECASE)
-                if not os.path.exists(input_file):
-                    input_file = re.sub(r'\.(out|ans|output)$', '.input', file_path, flags=re.IGNORECASE)
-                
-                if os.path.exists(input_file):
-                    with open(input_file, 'r', encoding='utf-8', errors='ignore') as in_f:
-                        input_content = in_f.read()
-                    new_testpoints[unique_name] = {
-                        'input': input_content,
-                        'output': content
-                    }
-                else:
-                    new_testpoints[unique_name] = {
-                        'input': '未找到对应的输入文件',
-                        'output': content
-                    }
-            else:
-                # 不是标准的测试点文件，将整个内容作为一个测试点
-                new_testpoints[unique_name] = {
-                    'input': content,
-                    'output': ''
-                }
-                
-            # 将新的测试点添加到现有测试点数据中
-            self.testpoint_data.update(new_testpoints)
-    
-    def find_related_testpoints(self, file_path):
-        """查找同目录下的相关测试点文件"""
-        dir_path = os.path.dirname(file_path)
-        files = os.listdir(dir_path)
-        
-        # 创建临时字典存储新的测试点
-        new_testpoints = {}
-        
-        # 生成目录的唯一标识符，用于避免不同目录下的同名文件冲突
-        # 使用与load_text_testpoints方法相同的哈希生成逻辑
-        dir_hash = str(abs(hash(dir_path)) % 10000)
-        
-        # 获取当前文件的名称（不含扩展名）
-        current_file_name = os.path.splitext(os.path.basename(file_path))[0]
-        
-        # 查找与当前文件相关的测试点文件
-        related_files = []
-        for f in files:
-            name_without_ext = os.path.splitext(f)[0]
-            # 只处理与当前文件名相同的文件
-            if name_without_ext == current_file_name:
-                related_files.append(f)
-        
-        # 分类相关文件
-        input_files = [f for f in related_files if re.match(r'.*\.(in|input)$', f, re.IGNORECASE)]
-        output_files = [f for f in related_files if re.match(r'.*\.(out|ans|output)$', f, re.IGNORECASE)]
-        
-        # 创建输入文件名到文件的映射
-        input_map = {}
-        for in_file in input_files:
-            name_without_ext = os.path.splitext(in_file)[0]
-            input_map[name_without_ext] = in_file
-        
-        # 创建输出文件名到文件的映射
-        output_map = {}
-        for out_file in output_files:
-            name_without_ext = os.path.splitext(out_file)[0]
-            output_map[name_without_ext] = out_file
-        
-        # 处理相关测试点
-        processed_names = set()
-        
-        # 首先处理有输入文件的测试点
-        for base_name in input_map.keys():
-            # 创建唯一的测试点名称
-            unique_name = f"{dir_hash}_{base_name}"
-            
-            # 检查是否已经存在这个测试点或已处理过
-            if unique_name in self.testpoint_data or base_name in processed_names:
-                continue
-                
-            processed_names.add(base_name)
-            
-            # 读取输入文件内容
-            in_path = os.path.join(dir_path, input_map[base_name])
-            with open(in_path, 'r', encoding='utf-8', errors='ignore') as f:
-                input_content = f.read()
-            
-            # 查找对应的输出文件
-            output_content = '未找到对应的输出文件'
-            if base_name in output_map:
-                out_path = os.path.join(dir_path, output_map[base_name])
-                with open(out_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    output_content = f.read()
-            
-            new_testpoints[unique_name] = {
-                'input': input_content,
-                'output': output_content
-            }
-        
-        # 处理只有输出文件的测试点
-        for base_name in output_map.keys():
-            if base_name in processed_names or base_name in input_map:
-                continue  # 已处理过或有对应的输入文件
-            
-            # 创建唯一的测试点名称
-            unique_name = f"{dir_hash}_{base_name}"
-            
-            # 检查是否已经存在这个测试点
-            if unique_name in self.testpoint_data:
-                continue
-            
-            # 读取输出文件内容
-            out_path = os.path.join(dir_path, output_map[base_name])
-            with open(out_path, 'r', encoding='utf-8', errors='ignore') as f:
-                output_content = f.read()
-            
-            new_testpoints[unique_name] = {
-                'input': '未找到对应的输入文件',
-                'output': output_content
-            }
-        
-        # 将新的测试点添加到现有测试点数据中
-        self.testpoint_data.update(new_testpoints)
+    def load_json_testpoints(self, file_path, testpoints=None, batch_callback=None):
+        """流式加载JSON格式的测试点文件，testpoints为存放结果的字典，默认为self.testpoint_data"""
+        if testpoints is None:
+            testpoints = self.testpoint_data
+        return load_json_testpoints(file_path, testpoints, self.config_manager.get_lazy_loading(), batch_callback)
     
-
+    def load_text_testpoints(self, file_path, testpoints=None):
+        """加载文本格式的测试点文件，testpoints为存放结果的字典，默认为self.testpoint_data"""
+        if testpoints is None:
+            testpoints = self.testpoint_data
+        return load_text_testpoints(file_path, testpoints, **self.loader_options())
+    
+    def find_related_testpoints(self, file_path, testpoints=None):
+        """查找同目录下的相关测试点文件，testpoints为存放结果的字典，默认为self.testpoint_data"""
+        if testpoints is None:
+            testpoints = self.testpoint_data
+        return find_related_testpoints(file_path, testpoints, **self.loader_options())
+    
+    def scan_testpoint_folder(self, dir_path, recursive=False, testpoints=None):
+        """扫描文件夹中的测试点文件，testpoints为存放结果的字典，默认为self.testpoint_data"""
+        if testpoints is None:
+            testpoints = self.testpoint_data
+        return scan_testpoint_folder(dir_path, recursive, testpoints, **self.loader_options())
+    
+    def load_archive_testpoints(self, archive_path, testpoints=None):
+        """加载压缩包中的测试点，testpoints为存放结果的字典，默认为self.testpoint_data"""
+        if testpoints is None:
+            testpoints = self.testpoint_data
+        return load_archive_testpoints(archive_path, testpoints, self.config_manager.get_lazy_loading())
     
     def increase_font_size(self):
         """增加字体大小"""
@@ -725,15 +1189,8 @@ class TestPointViewer(tk.Tk):
     def update_font_size(self, size):
         """更新字体大小"""
         self.font_size_var.set(str(size))
-        font = (self.font_family, size)
-        # 更新所有文本组件的字体
-        self.left_input_text.configure(font=font)
-        self.right_output_text.configure(font=font)
-        
-        # 更新已打开标签页中的文本组件字体
-        for tab_id, tab_info in self.open_tabs.items():
-            tab_frame = tab_info["frame"]
-            self._update_font_in_frame(tab_frame, font)
+        # 所有文本组件（包括已打开的标签页）都使用同一个字体对象，只需修改一次
+        self.text_font.configure(size=size)
     
     def on_font_size_change(self, event):
         """字体大小输入框变化时的处理函数"""
@@ -749,6 +1206,25 @@ class TestPointViewer(tk.Tk):
             # 如果输入的不是数字，恢复原来的值
             self.font_size_var.set(str(self.config_manager.get_font_size()))
     
+    def show_profile_status(self, operation):
+        """在状态栏显示刚结束的操作各阶段的耗时（开启性能记录时）"""
+        text = operation.summary()
+        if operation.detail:
+            text += f"  [{operation.detail}]"
+        self.profile_status_var.set(text)
+    
+    def update_memory_status(self):
+        """刷新状态栏中的内存占用：内容缓存的大小和命中次数，以及进程的物理内存，每2秒刷新一次"""
+        cache = self.document_cache
+        lookups = cache.hits + cache.misses
+        text = (f"缓存 {format_size(cache.total_bytes)}/{format_size(cache.max_bytes)}"
+                f"（{len(cache)}个，命中 {cache.hits}/{lookups}）")
+        rss = process_rss()
+        if rss is not None:
+            text += f"  内存 {format_size(rss)}"
+        self.memory_status_var.set(text)
+        self.memory_status_job = self.after(2000, self.update_memory_status)
+    
     def show_font_tip(self, event):
         """显示字体大小提示"""
         self.font_tip_label.pack(side=tk.LEFT, padx=5)
@@ -774,6 +1250,107 @@ class TestPointViewer(tk.Tk):
         
         return base_name
     
+    def get_display_name(self, tp_name):
+        """获取测试点的显示名称，计算结果会被缓存"""
+        display_name = self.display_names.get(tp_name)
+        if display_name is None:
+            display_name = self.format_testpoint_name(tp_name)
+            self.display_names[tp_name] = display_name
+        return display_name
+    
+    def get_listbox_testpoint(self, index):
+        """获取列表第index行对应的原始测试点名称"""
+        if 0 <= index < len(self.listbox_keys):
+            return self.listbox_keys[index]
+        return None
+    
+    def append_listbox_testpoints(self, tp_names):
+        """把测试点追加到列表末尾（一次性批量插入），并同步更新列表模型"""
+        display_names = [self.get_display_name(tp_name) for tp_name in tp_names]
+        if not display_names:
+            return
+        with self.profiler.stage("列表"):
+            self.listbox_rows.update((tp_name, row) for row, tp_name in enumerate(tp_names, len(self.listbox_keys)))
+            self.listbox_keys.extend(tp_names)
+            self.shown_testpoints.update(tp_names)
+            self.testpoint_listbox.insert(tk.END, *display_names)
+            self.refresh_judge_column()
+    
+    def remove_listbox_rows(self, indices):
+        """删除列表中的若干行，并同步更新列表模型"""
+        removed = set(indices)
+        for index in sorted(removed, reverse=True):
+            self.testpoint_listbox.delete(index)
+        
+        removed_keys = [self.listbox_keys[index] for index in removed if index < len(self.listbox_keys)]
+        self.listbox_keys = [tp_name for index, tp_name in enumerate(self.listbox_keys) if index not in removed]
+        self.listbox_rows = {tp_name: row for row, tp_name in enumerate(self.listbox_keys)}
+        self.shown_testpoints.difference_update(removed_keys)
+        self.refresh_judge_column()
+        for tp_name in removed_keys:
+            self.stats_values.pop(tp_name, None)
+            if self.stats_tree.exists(tp_name):
+                self.stats_tree.delete(tp_name)
+            self.display_names.pop(tp_name, None)
+    
+    def clear_listbox_testpoints(self):
+        """清空测试点列表及列表模型"""
+        self.testpoint_listbox.delete(0, tk.END)
+        self.listbox_keys = []
+        self.listbox_rows = {}
+        self.shown_testpoints = set()
+        self.display_names = {}
+        self.judge_results = {}
+        self.refresh_judge_column()
+        self.stats_values = {}
+    
+    def scroll_testpoint_list(self, *args):
+        """滚动条拖动时同时滚动测试点列表和评测结果列"""
+        self.testpoint_listbox.yview(*args)
+        if self.judge_listbox.winfo_manager():
+            self.judge_listbox.yview(*args)
+    
+    def on_testpoint_list_scroll(self, first, last):
+        """测试点列表滚动时更新滚动条，并让评测结果列保持对齐"""
+        self.testpoint_scrollbar.set(first, last)
+        if self.judge_listbox.winfo_manager():
+            self.judge_listbox.yview_moveto(first)
+    
+    def on_judge_column_click(self, event):
+        """点击评测结果时选中对应的测试点，并显示错误信息（例如第一个不同之处）"""
+        index = self.judge_listbox.nearest(event.y)
+        if 0 <= index < self.testpoint_listbox.size():
+            self.testpoint_listbox.selection_clear(0, tk.END)
+            self.testpoint_listbox.selection_set(index)
+            self.testpoint_listbox.event_generate("<<ListboxSelect>>")
+            tp_name = self.get_listbox_testpoint(index)
+            result = self.judge_results.get(tp_name)
+            if result is not None and result.message:
+                self.file_path_var.set(f"{self.get_display_name(tp_name)} {result.verdict}: {result.message.splitlines()[-1]}")
+        return "break"
+    
+    def refresh_judge_column(self):
+        """按测试点列表的顺序重新填充评测结果列，没有评测结果时隐藏该列"""
+        if not self.judge_results and self.judge_thread is None:
+            self.judge_listbox.pack_forget()
+            return
+        rows = []
+        for tp_name in self.listbox_keys:
+            result = self.judge_results.get(tp_name)
+            rows.append(result.summary() if result is not None else "")
+        self.judge_listbox.delete(0, tk.END)
+        if rows:
+            self.judge_listbox.insert(tk.END, *rows)
+        for index, tp_name in enumerate(self.listbox_keys):
+            result = self.judge_results.get(tp_name)
+            if result is not None:
+                color = "#2e7d32" if result.verdict == AC else "#808080" if result.verdict == SKIP else "#c62828"
+                self.judge_listbox.itemconfig(index, foreground=color)
+        if not self.judge_listbox.winfo_manager():
+            self.judge_listbox.pack(side=tk.RIGHT, fill=tk.Y, after=self.testpoint_scrollbar)
+        self.judge_listbox.yview_moveto(self.testpoint_listbox.yview()[0])
+    
+    @profiled("显示测试点")
     def on_testpoint_select(self, event):
         """选择测试点时的处理函数"""
         selection = self.testpoint_listbox.curselection()
@@ -783,24 +1360,15 @@ class TestPointViewer(tk.Tk):
         # 如果只选择了一个测试点，更新当前视图
         if len(selection) == 1:
             index = selection[0]
-            display_name = self.testpoint_listbox.get(index)
-            
-            # 查找对应的原始测试点名称
-            original_name = None
-            for tp_name in self.testpoint_data.keys():
-                if self.format_testpoint_name(tp_name) == display_name:
-                    original_name = tp_name
-                    break
+            # 列表模型与列表行一一对应，直接取出原始测试点名称
+            original_name = self.get_listbox_testpoint(index)
             
             if original_name and original_name in self.testpoint_data:
-                input_data = self.testpoint_data[original_name]['input']
-                output_data = self.testpoint_data[original_name]['output']
-                
-                # 更新并排视图的文本框
-                self.left_input_text.delete(1.0, tk.END)
-                self.left_input_text.insert(tk.END, input_data)
-                self.right_output_text.delete(1.0, tk.END)
-                self.right_output_text.insert(tk.END, output_data)
+                # 更新并排视图的文本框，只渲染可见部分
+                data = self.testpoint_data[original_name]
+                with self.profiler.stage("渲染", content_bytes(data['input']) + content_bytes(data['output'])):
+                    self.left_input_text.set_source(data['input'])
+                    self.right_output_text.set_source(data['output'])
     
     def on_testpoint_double_click(self, event):
         """双击测试点时的处理函数，与单击行为相同"""
@@ -832,8 +1400,11 @@ class TestPointViewer(tk.Tk):
     def copy_text(self, text_widget):
         """复制文本框内容到剪贴板"""
         try:
-            # 获取文本内容
-            content = text_widget.get(1.0, tk.END).strip()
+            # 获取文本内容，虚拟化视图返回完整内容而不只是已渲染的部分
+            if isinstance(text_widget, VirtualTextView):
+                content = text_widget.get_text().strip()
+            else:
+                content = text_widget.get(1.0, tk.END).strip()
             if content:
                 # 清除剪贴板当前内容
                 self.clipboard_clear()
@@ -846,8 +1417,8 @@ class TestPointViewer(tk.Tk):
         except Exception as e:
             messagebox.showerror("错误", f"复制失败: {str(e)}")
     
-    def create_new_tab(self, display_name, original_name):
-        """创建新的测试点标签页"""
+    def _build_tab(self):
+        """创建一个标签页的全部组件，返回标签页信息（尚未填充测试点内容）"""
         # 创建新的标签页框架
         tab_frame = ttk.Frame(self.multi_tab_notebook)
         tab_id = str(id(tab_frame))  # 使用框架的id作为唯一标识符
@@ -874,24 +1445,16 @@ class TestPointViewer(tk.Tk):
             input_btn_frame = ttk.Frame(input_text_frame)
             input_btn_frame.pack(side=tk.TOP, fill=tk.X, pady=2)
             
-            input_copy_btn = ttk.Button(input_btn_frame, text="复制", width=4, 
-                                       command=lambda tf=input_text_frame: self.copy_text(tf.winfo_children()[-1]))
+            input_copy_btn = ttk.Button(input_btn_frame, text="复制", width=4)
             input_copy_btn.pack(side=tk.RIGHT, padx=5)
             
-            # 创建带滚动条的文本框
-            input_text_container = ttk.Frame(input_text_frame)
-            input_text_container.pack(fill=tk.BOTH, expand=True)
-            
-            input_scrollbar = ttk.Scrollbar(input_text_container)
-            input_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            input_text = scrolledtext.ScrolledText(input_text_container, wrap=tk.WORD, 
-                                                  font=("TkDefaultFont", self.config_manager.get_font_size()),
-                                                  bg="#fafafa", relief=tk.FLAT, bd=1)
-            input_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            input_text.config(yscrollcommand=input_scrollbar.set)
-            input_scrollbar.config(command=input_text.yview)
+            # 创建虚拟化文本视图（自带滚动条）
+            input_text = VirtualTextView(input_text_frame, wrap=tk.WORD, 
+                                         font=self.text_font,
+                                         bg="#fafafa", relief=tk.FLAT, bd=1,
+                                         document_cache=self.document_cache)
+            input_text.pack(fill=tk.BOTH, expand=True)
+            input_copy_btn.configure(command=lambda view=input_text: self.copy_text(view))
             
             # 创建输出文本框和复制按钮框架
             output_text_frame = ttk.Frame(output_frame)
@@ -901,31 +1464,16 @@ class TestPointViewer(tk.Tk):
             output_btn_frame = ttk.Frame(output_text_frame)
             output_btn_frame.pack(side=tk.TOP, fill=tk.X, pady=2)
             
-            output_copy_btn = ttk.Button(output_btn_frame, text="复制", width=4, 
-                                        command=lambda tf=output_text_frame: self.copy_text(tf.winfo_children()[-1]))
+            output_copy_btn = ttk.Button(output_btn_frame, text="复制", width=4)
             output_copy_btn.pack(side=tk.RIGHT, padx=5)
             
-            # 创建带滚动条的文本框
-            output_text_container = ttk.Frame(output_text_frame)
-            output_text_container.pack(fill=tk.BOTH, expand=True)
-            
-            output_scrollbar = ttk.Scrollbar(output_text_container)
-            output_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            output_text = scrolledtext.ScrolledText(output_text_container, wrap=tk.WORD, 
-                                                   font=("TkDefaultFont", self.config_manager.get_font_size()),
-                                                   bg="#fafafa", relief=tk.FLAT, bd=1)
-            output_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            output_text.config(yscrollcommand=output_scrollbar.set)
-            output_scrollbar.config(command=output_text.yview)
-            
-            # 填充数据
-            input_data = self.testpoint_data[original_name]['input']
-            output_data = self.testpoint_data[original_name]['output']
-            
-            input_text.insert(tk.END, input_data)
-            output_text.insert(tk.END, output_data)
+            # 创建虚拟化文本视图（自带滚动条）
+            output_text = VirtualTextView(output_text_frame, wrap=tk.WORD, 
+                                          font=self.text_font,
+                                          bg="#fafafa", relief=tk.FLAT, bd=1,
+                                          document_cache=self.document_cache)
+            output_text.pack(fill=tk.BOTH, expand=True)
+            output_copy_btn.configure(command=lambda view=output_text: self.copy_text(view))
             
         else:  # side_by_side 模式
             # 创建并排显示的框架
@@ -948,24 +1496,15 @@ class TestPointViewer(tk.Tk):
             left_btn_frame = ttk.Frame(left_input_frame)
             left_btn_frame.pack(side=tk.TOP, fill=tk.X, pady=2)
             
-            left_input_copy_btn = ttk.Button(left_btn_frame, text="复制", width=4, 
-                                           command=lambda tf=left_input_frame: self.copy_text(tf.winfo_children()[-1]))
+            left_input_copy_btn = ttk.Button(left_btn_frame, text="复制", width=4)
             left_input_copy_btn.pack(side=tk.RIGHT, padx=5)
             
-            # 创建带滚动条的文本框
-            left_input_container = ttk.Frame(left_input_frame)
-            left_input_container.pack(fill=tk.BOTH, expand=True)
-            
-            left_input_scrollbar = ttk.Scrollbar(left_input_container)
-            left_input_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            left_input_text = scrolledtext.ScrolledText(left_input_container, wrap=tk.WORD, 
-                                                      font=("TkDefaultFont", self.config_manager.get_font_size()),
-                                                      bg="#fafafa", relief=tk.FLAT, bd=1)
-            left_input_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            left_input_text.config(yscrollcommand=left_input_scrollbar.set)
-            left_input_scrollbar.config(command=left_input_text.yview)
+            # 创建虚拟化文本视图（自带滚动条），使用共享的字体对象
+            left_input_text = VirtualTextView(left_input_frame, wrap=tk.WORD, font=self.text_font,
+                                              bg="#fafafa", relief=tk.FLAT, bd=1,
+                                              document_cache=self.document_cache)
+            left_input_text.pack(fill=tk.BOTH, expand=True)
+            left_input_copy_btn.configure(command=lambda view=left_input_text: self.copy_text(view))
             
             # 创建右侧输出文本框和复制按钮框架
             right_output_frame = ttk.Frame(right_frame)
@@ -975,48 +1514,44 @@ class TestPointViewer(tk.Tk):
             right_btn_frame = ttk.Frame(right_output_frame)
             right_btn_frame.pack(side=tk.TOP, fill=tk.X, pady=2)
             
-            right_output_copy_btn = ttk.Button(right_btn_frame, text="复制", width=4, 
-                                             command=lambda tf=right_output_frame: self.copy_text(tf.winfo_children()[-1]))
+            right_output_copy_btn = ttk.Button(right_btn_frame, text="复制", width=4)
             right_output_copy_btn.pack(side=tk.RIGHT, padx=5)
             
-            # 创建带滚动条的文本框
-            right_output_container = ttk.Frame(right_output_frame)
-            right_output_container.pack(fill=tk.BOTH, expand=True)
-            
-            right_output_scrollbar = ttk.Scrollbar(right_output_container)
-            right_output_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            
-            right_output_text = scrolledtext.ScrolledText(right_output_container, wrap=tk.WORD, 
-                                                        font=("TkDefaultFont", self.config_manager.get_font_size()),
-                                                        bg="#fafafa", relief=tk.FLAT, bd=1)
-            right_output_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            
-            right_output_text.config(yscrollcommand=right_output_scrollbar.set)
-            right_output_scrollbar.config(command=right_output_text.yview)
-            
-            # 填充数据
-            input_data = self.testpoint_data[original_name]['input']
-            output_data = self.testpoint_data[original_name]['output']
-            
-            # 确保使用统一的字体样式
-            font = (self.font_family, self.config_manager.get_font_size())
-            left_input_text.configure(font=font)
-            right_output_text.configure(font=font)
-            
-            # 填充数据
-            left_input_text.delete(1.0, tk.END)
-            left_input_text.insert(tk.END, input_data)
-            right_output_text.delete(1.0, tk.END)
-            right_output_text.insert(tk.END, output_data)
-        
-        # 添加标签页 - 显示测试点名称
-        self.multi_tab_notebook.add(tab_frame, text=display_name + "  ")
+            # 创建虚拟化文本视图（自带滚动条）
+            right_output_text = VirtualTextView(right_output_frame, wrap=tk.WORD, font=self.text_font,
+                                                bg="#fafafa", relief=tk.FLAT, bd=1,
+                                                document_cache=self.document_cache)
+            right_output_text.pack(fill=tk.BOTH, expand=True)
+            right_output_copy_btn.configure(command=lambda view=right_output_text: self.copy_text(view))
+            input_text, output_text = left_input_text, right_output_text
         
         # 创建关闭按钮
         close_button = ttk.Button(self.multi_tab_notebook, text="×", width=2, 
                                  command=lambda tid=tab_id: self.close_tab(tid),
                                  style="Tab.TButton")
         
+        return {
+            "frame": tab_frame,
+            "close_button": close_button,
+            "input_view": input_text,
+            "output_view": output_text,
+            "view_mode": self.current_view_mode,
+            "loaded": False
+        }
+    
+    def create_new_tab(self, display_name, original_name):
+        """创建新的测试点标签页，优先复用已关闭标签页的组件"""
+        tab_info = next((info for info in self.tab_pool if info["view_mode"] == self.current_view_mode), None)
+        if tab_info is not None:
+            self.tab_pool.remove(tab_info)
+        else:
+            tab_info = self._build_tab()
+        tab_frame = tab_info["frame"]
+        tab_id = str(id(tab_frame))
+        
+        # 添加标签页 - 显示测试点名称
+        self.multi_tab_notebook.add(tab_frame, text=display_name + "  ")
+        
         # 创建关闭按钮样式
         self.style.configure("Tab.TButton", font=("Arial", 8, "bold"), padding=0)
         
@@ -1030,12 +1565,9 @@ class TestPointViewer(tk.Tk):
         self.after(100, self.update_close_buttons)
         
         # 存储标签页信息
-        self.open_tabs[tab_id] = {
-            "name": display_name,
-            "original_name": original_name,
-            "frame": tab_frame,
-            "close_button": close_button
-        }
+        tab_info["name"] = display_name
+        tab_info["original_name"] = original_name
+        self.open_tabs[tab_id] = tab_info
         
         # 绑定标签页选择事件，用于显示/隐藏关闭按钮
         self.multi_tab_notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
@@ -1043,8 +1575,56 @@ class TestPointViewer(tk.Tk):
         # 显示关闭按钮
         self.update_close_buttons()
         
-        # 选择新创建的标签页
+        # 选择新创建的标签页，并加载其内容
         self.multi_tab_notebook.select(tab_index)
+        self.activate_tab(tab_id)
+    
+    def activate_tab(self, tab_id):
+        """切换到标签页时加载其内容，并按最近查看的顺序卸载较早标签页的内容"""
+        tab_info = self.open_tabs.get(tab_id)
+        if tab_info is None:
+            return
+        if not tab_info["loaded"]:
+            self.load_tab_content(tab_id)
+        self.loaded_tabs.move_to_end(tab_id)
+        
+        # 超过数量或内存上限时，从最久未查看的标签页开始卸载（当前标签页除外）
+        max_tabs = self.config_manager.get_max_loaded_tabs()
+        budget = self.config_manager.get_tab_memory_budget()
+        total = sum(self.tab_memory_size(loaded_id) for loaded_id in self.loaded_tabs)
+        for loaded_id in list(self.loaded_tabs):
+            if len(self.loaded_tabs) <= max_tabs and total <= budget:
+                break
+            if loaded_id == tab_id:
+                continue
+            total -= self.tab_memory_size(loaded_id)
+            self.unload_tab_content(loaded_id)
+    
+    def load_tab_content(self, tab_id):
+        """把测试点内容填入标签页，只渲染可见部分"""
+        tab_info = self.open_tabs[tab_id]
+        original_name = tab_info["original_name"]
+        if original_name in self.testpoint_data:
+            tab_info["input_view"].set_source(self.testpoint_data[original_name]['input'])
+            tab_info["output_view"].set_source(self.testpoint_data[original_name]['output'])
+        tab_info["loaded"] = True
+        self.loaded_tabs[tab_id] = None
+    
+    def unload_tab_content(self, tab_id):
+        """清空标签页内容，只保留组件，再次切换到该标签页时重新加载"""
+        tab_info = self.open_tabs.get(tab_id)
+        if tab_info is not None:
+            tab_info["input_view"].clear()
+            tab_info["output_view"].clear()
+            tab_info["loaded"] = False
+        self.loaded_tabs.pop(tab_id, None)
+    
+    def tab_memory_size(self, tab_id):
+        """标签页内容占用的内存字节数"""
+        tab_info = self.open_tabs.get(tab_id)
+        if tab_info is None:
+            return 0
+        return tab_info["input_view"].memory_size() + tab_info["output_view"].memory_size()
     
     def close_tab(self, tab_id):
         """关闭标签页"""
@@ -1055,10 +1635,17 @@ class TestPointViewer(tk.Tk):
             # 获取标签页索引
             try:
                 tab_index = self.multi_tab_notebook.index(tab_frame)
-                # 移除标签页
+                # 移除标签页并清空内容，释放文本视图占用的文档
                 self.multi_tab_notebook.forget(tab_index)
-                # 移除标签页信息
+                tab_info["close_button"].place_forget()
+                self.unload_tab_content(tab_id)
+                # 移除标签页信息，组件放回池中供下次打开标签页时复用
                 del self.open_tabs[tab_id]
+                if len(self.tab_pool) < self.TAB_POOL_SIZE:
+                    self.tab_pool.append(tab_info)
+                else:
+                    tab_info["close_button"].destroy()
+                    tab_frame.destroy()
                 # 更新关闭按钮
                 self.update_close_buttons()
             except:
@@ -1067,6 +1654,11 @@ class TestPointViewer(tk.Tk):
     def on_tab_changed(self, event):
         """标签页切换事件处理函数"""
         self.update_close_buttons()
+        try:
+            current_tab = self.nametowidget(self.multi_tab_notebook.select())
+        except (KeyError, tk.TclError):
+            return
+        self.activate_tab(str(id(current_tab)))
     
     def update_close_buttons(self):
         """更新所有标签页的关闭按钮"""
@@ -1110,8 +1702,8 @@ class TestPointViewer(tk.Tk):
         
         # 如果是并排视图模式，清空文本框
         if self.current_view_mode == "side_by_side":
-            self.left_input_text.delete(1.0, tk.END)
-            self.right_output_text.delete(1.0, tk.END)
+            self.left_input_text.clear()
+            self.right_output_text.clear()
     
     def open_selected_testpoints(self):
         """打开选中的测试点"""
@@ -1122,14 +1714,9 @@ class TestPointViewer(tk.Tk):
         
         # 遍历所有选中的测试点
         for index in selection:
-            display_name = self.testpoint_listbox.get(index)
-            
-            # 查找对应的原始测试点名称
-            original_name = None
-            for tp_name in self.testpoint_data.keys():
-                if self.format_testpoint_name(tp_name) == display_name:
-                    original_name = tp_name
-                    break
+            # 列表模型与列表行一一对应，直接取出原始测试点名称
+            original_name = self.get_listbox_testpoint(index)
+            display_name = self.get_display_name(original_name) if original_name else None
             
             if original_name and original_name in self.testpoint_data:
                 # 检查是否已经打开了这个测试点
@@ -1161,24 +1748,13 @@ class TestPointViewer(tk.Tk):
         selection = self.testpoint_listbox.curselection()
         if selection:
             index = selection[0]
-            display_name = self.testpoint_listbox.get(index)
-            
-            # 查找对应的原始测试点名称
-            original_name = None
-            for tp_name in self.testpoint_data.keys():
-                if self.format_testpoint_name(tp_name) == display_name:
-                    original_name = tp_name
-                    break
+            # 列表模型与列表行一一对应，直接取出原始测试点名称
+            original_name = self.get_listbox_testpoint(index)
             
             if original_name and original_name in self.testpoint_data:
-                input_data = self.testpoint_data[original_name]['input']
-                output_data = self.testpoint_data[original_name]['output']
-                
-                # 清空并更新文本框内容
-                self.left_input_text.delete(1.0, tk.END)
-                self.left_input_text.insert(tk.END, input_data)
-                self.right_output_text.delete(1.0, tk.END)
-                self.right_output_text.insert(tk.END, output_data)
+                # 更新文本框内容
+                self.left_input_text.set_source(self.testpoint_data[original_name]['input'])
+                self.right_output_text.set_source(self.testpoint_data[original_name]['output'])
         
         # 确保复制按钮可见
         self.left_btn_frame.lift()
@@ -1187,94 +1763,464 @@ class TestPointViewer(tk.Tk):
         # 保存视图模式设置
         self.config_manager.set_view_mode(self.current_view_mode)
         
-    def update_tab_content(self, tab_frame, original_name):
-        """更新标签页内容"""
-        if original_name in self.testpoint_data:
-            input_data = self.testpoint_data[original_name]['input']
-            output_data = self.testpoint_data[original_name]['output']
-            
-            # 查找标签页中的文本框
-            for child in tab_frame.winfo_children():
-                if isinstance(child, ttk.Notebook):
-                    tab_notebook = child
-                    # 获取输入和输出选项卡
-                    if len(tab_notebook.winfo_children()) >= 2:
-                        input_frame = tab_notebook.winfo_children()[0]
-                        output_frame = tab_notebook.winfo_children()[1]
-                        
-                        # 更新输入文本框
-                        self._update_text_widget(input_frame, input_data)
-                        
-                        # 更新输出文本框
-                        self._update_text_widget(output_frame, output_data)
-                elif isinstance(child, ttk.Frame):
-                    # 处理并排视图
-                    for frame in child.winfo_children():
-                        if isinstance(frame, ttk.LabelFrame):
-                            if "输入" in frame["text"]:
-                                # 输入框架
-                                self._update_text_widget(frame, input_data)
-                            elif "输出" in frame["text"]:
-                                # 输出框架
-                                self._update_text_widget(frame, output_data)
-    
-    def _update_text_widget(self, parent_frame, content):
-        """递归查找并更新文本框内容"""
-        # 递归查找文本框
-        for child in parent_frame.winfo_children():
-            if isinstance(child, scrolledtext.ScrolledText):
-                child.delete(1.0, tk.END)
-                child.insert(tk.END, content)
-                return True
-            elif hasattr(child, 'winfo_children'):
-                if self._update_text_widget(child, content):
-                    return True
-        return False
-        
-    def _update_font_in_frame(self, parent_frame, font):
-        """递归查找并更新文本框字体"""
-        # 递归查找文本框
-        for child in parent_frame.winfo_children():
-            if isinstance(child, scrolledtext.ScrolledText):
-                child.configure(font=font)
-            elif hasattr(child, 'winfo_children'):
-                self._update_font_in_frame(child, font)
-        
+    def update_tab_content(self, tab_id):
+        """更新标签页内容，未加载内容的标签页在切换到它时才会读取最新数据"""
+        tab_info = self.open_tabs.get(tab_id)
+        if tab_info is not None and tab_info["loaded"]:
+            self.load_tab_content(tab_id)
+    
     def export_testpoints_to_json(self):
-        """将测试点数据导出为JSON文件"""
+        """将测试点数据导出为JSON文件，在后台线程中逐个测试点写入"""
         if not self.testpoint_data:
             messagebox.showinfo("提示", "没有测试点数据可导出")
             return
+        if self.export_thread is not None or self.load_executor is not None or self.judge_thread is not None:
+            messagebox.showinfo("提示", "请等待当前的加载、导出或评测完成")
+            return
             
-        # 选择保存路径
+        # 选择保存路径，扩展名为.json.gz或.json.xz时压缩导出
         file_path = filedialog.asksaveasfilename(
             title="保存测试点数据",
             defaultextension=".json",
-            filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")]
+            filetypes=[("JSON文件", "*.json"), ("gzip压缩的JSON文件", "*.json.gz"),
+                       ("xz压缩的JSON文件", "*.json.xz"), ("所有文件", "*.*")]
         )
         
         if not file_path:
             return
-            
+        
+        compact = messagebox.askyesno("导出格式", "是否使用紧凑格式导出？\n紧凑格式不缩进，文件更小、导出更快")
+        
+        # 导出过程中测试点数据可能变化，先取快照（只包含引用，不复制内容）
+        items = list(self.testpoint_data.items())
+        self.export_cancelled = threading.Event()
+        self.export_count = 0
+        self.export_queue = queue.Queue()
+        self.export_operation = self.profiler.start("导出JSON", file_path)
+        
+        def run_export():
+            try:
+                with self.export_operation.stage("导出") as stage:
+                    completed = self.profiler.run("导出JSON", write_testpoints_json, items, file_path, compact,
+                                                  lambda count: setattr(self, "export_count", count),
+                                                  self.export_cancelled)
+                    stage.nbytes = os.path.getsize(file_path) if completed and self.profiler.enabled else 0
+                self.export_queue.put((completed, None))
+            except Exception as e:
+                self.export_queue.put((False, e))
+        
+        # 显示进度条和取消按钮
+        self.load_progress.configure(maximum=len(items), value=0)
+        self.cancel_load_btn.configure(text="取消导出", command=self.cancel_export)
+        self.cancel_load_btn.pack(side=tk.RIGHT, padx=5)
+        self.load_progress.pack(side=tk.RIGHT, padx=5)
+        
+        self.export_thread = threading.Thread(target=run_export, daemon=True)
+        self.export_thread.start()
+        self.after(100, self.process_export_progress, file_path, len(items))
+    
+    def process_export_progress(self, file_path, total):
+        """定时更新导出进度，导出结束后提示结果"""
+        self.load_progress.configure(value=self.export_count)
         try:
-            # 准备导出数据
-            export_data = {}
-            for name, data in self.testpoint_data.items():
-                export_data[name] = {
-                    "input": data["input"],
-                    "output": data["output"]
-                }
-                
-            # 写入JSON文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
-                
+            completed, error = self.export_queue.get_nowait()
+        except queue.Empty:
+            self.after(100, self.process_export_progress, file_path, total)
+            return
+        
+        self.export_thread = None
+        self.profiler.finish(self.export_operation)
+        self.load_progress.pack_forget()
+        self.cancel_load_btn.pack_forget()
+        self.cancel_load_btn.configure(text="取消加载", command=self.cancel_loading)
+        
+        if error is not None:
+            messagebox.showerror("错误", f"导出测试点数据失败: {str(error)}")
+        elif completed:
             messagebox.showinfo("成功", f"测试点数据已成功导出到:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("错误", f"导出测试点数据失败: {str(e)}")
+        else:
+            messagebox.showinfo("提示", "已取消导出")
+    
+    def cancel_export(self):
+        """取消正在进行的导出"""
+        if self.export_thread is not None:
+            self.export_cancelled.set()
+    
+    def start_search(self):
+        """在后台线程中搜索所有测试点的输入和输出，结果逐条显示在搜索结果列表中"""
+        query = self.search_var.get()
+        if not query:
+            return
+        if not self.testpoint_data:
+            messagebox.showinfo("提示", "没有可以搜索的测试点")
+            return
+        
+        # 取消上一次尚未完成的搜索
+        self.search_cancelled.set()
+        self.search_cancelled = threading.Event()
+        self.search_queue = queue.Queue()
+        self.search_hits = []
+        self.search_result_listbox.delete(0, tk.END)
+        self.search_status_var.set("正在搜索...")
+        if not self.search_result_frame.winfo_manager():
+            self.search_result_frame.pack(fill=tk.BOTH, padx=5, pady=(0, 5))
+        
+        items = [(tp_name, self.testpoint_data[tp_name]) for tp_name in self.listbox_keys
+                 if tp_name in self.testpoint_data]
+        regex = self.search_regex_var.get()
+        search_queue = self.search_queue
+        cancel_event = self.search_cancelled
+        
+        def run_search():
+            try:
+                search_testpoints(items, query, regex, result_callback=search_queue.put, cancel_event=cancel_event)
+                search_queue.put(None)
+            except Exception as e:
+                search_queue.put(e)
+        
+        threading.Thread(target=run_search, daemon=True).start()
+        self.after(100, self.process_search_results, search_queue, time.monotonic())
+    
+    def process_search_results(self, search_queue, start_time):
+        """定时取出找到的结果并追加到列表，搜索结束后显示结果数量和用时"""
+        if search_queue is not self.search_queue:
+            return  # 已经开始了新的搜索
+        finished = False
+        error = None
+        rows = []
+        while True:
+            try:
+                hit = search_queue.get_nowait()
+            except queue.Empty:
+                break
+            if hit is None or isinstance(hit, Exception):
+                finished = True
+                error = hit
+                break
+            self.search_hits.append(hit)
+            side = "输入" if hit.side == INPUT_SIDE else "输出"
+            rows.append(f"{self.get_display_name(hit.name)} {side} 第{hit.line}行: {hit.text}")
+        if rows:
+            self.search_result_listbox.insert(tk.END, *rows)
+        
+        if not finished:
+            self.search_status_var.set(f"正在搜索... 已找到 {len(self.search_hits)} 处")
+            self.after(100, self.process_search_results, search_queue, start_time)
+            return
+        self.search_queue = None
+        if error is not None:
+            self.search_status_var.set("搜索失败")
+            messagebox.showerror("错误", f"搜索失败: {str(error)}")
+            return
+        limit_note = "（已达上限）" if len(self.search_hits) >= MAX_RESULTS else ""
+        self.search_status_var.set(f"找到 {len(self.search_hits)} 处{limit_note}，用时 {time.monotonic() - start_time:.1f} 秒")
+    
+    def on_search_result_select(self, event):
+        """点击搜索结果时选中对应的测试点，并滚动到匹配的行"""
+        selection = self.search_result_listbox.curselection()
+        if not selection or selection[0] >= len(self.search_hits):
+            return
+        hit = self.search_hits[selection[0]]
+        index = self.listbox_rows.get(hit.name)
+        if index is None:
+            messagebox.showinfo("提示", "该测试点已从列表中删除")
+            return
+        self.testpoint_listbox.selection_clear(0, tk.END)
+        self.testpoint_listbox.selection_set(index)
+        self.testpoint_listbox.see(index)
+        self.testpoint_listbox.event_generate("<<ListboxSelect>>")
+        view = self.left_input_text if hit.side == INPUT_SIDE else self.right_output_text
+        view.scroll_to_line(hit.line - 1)
+    
+    def close_search_results(self):
+        """取消正在进行的搜索并隐藏搜索结果"""
+        self.search_cancelled.set()
+        self.search_queue = None
+        self.search_hits = []
+        self.search_result_listbox.delete(0, tk.END)
+        self.search_result_frame.pack_forget()
+    
+    def compare_selected_outputs(self):
+        """对比输出：选中两个测试点时对比它们的输出，选中一个时与选择的输出文件对比"""
+        selection = self.testpoint_listbox.curselection()
+        names = [self.get_listbox_testpoint(index) for index in selection]
+        names = [tp_name for tp_name in names if tp_name in self.testpoint_data]
+        if len(names) == 2:
+            left_source = self.testpoint_data[names[0]]['output']
+            right_source = self.testpoint_data[names[1]]['output']
+            left_title = self.get_display_name(names[0])
+            right_title = self.get_display_name(names[1])
+        elif len(names) == 1:
+            file_path = filedialog.askopenfilename(
+                title="选择要与答案对比的输出文件",
+                filetypes=[("输出文件", "*.out *.ans *.txt"), ("所有文件", "*.*")]
+            )
+            if not file_path:
+                return
+            try:
+                right_source = FileContent(file_path)
+            except OSError as e:
+                messagebox.showerror("错误", f"无法读取文件: {str(e)}")
+                return
+            left_source = self.testpoint_data[names[0]]['output']
+            left_title = f"{self.get_display_name(names[0])} 的答案"
+            right_title = os.path.basename(file_path)
+        else:
+            messagebox.showinfo("提示", "请选择一个测试点（与输出文件对比）或两个测试点（对比它们的输出）")
+            return
+        
+        diff_window = DiffWindow(self, left_title, right_title, self.text_font)
+        diff_window.start(left_source, right_source)
+    
+    def judge_testpoints(self):
+        """用选择的程序在后台并行评测列表中的所有测试点，结果显示在测试点列表旁"""
+        if not self.testpoint_data:
+            messagebox.showinfo("提示", "没有可以评测的测试点")
+            return
+        if self.export_thread is not None or self.load_executor is not None or self.judge_thread is not None:
+            messagebox.showinfo("提示", "请等待当前的加载、导出或评测完成")
+            return
+        
+        program, time_limit, memory_limit_mb = self.config_manager.get_judge_settings()
+        program = filedialog.askopenfilename(
+            title="选择要评测的程序",
+            initialdir=os.path.dirname(program) or None,
+            initialfile=os.path.basename(program)
+        )
+        if not program:
+            return
+        time_limit = simpledialog.askfloat("时间限制", "每个测试点的时间限制（秒）:", parent=self,
+                                           initialvalue=time_limit, minvalue=0.1)
+        if time_limit is None:
+            return
+        memory_limit_mb = simpledialog.askinteger("内存限制", "每个测试点的内存限制（MB）:", parent=self,
+                                                  initialvalue=memory_limit_mb, minvalue=1)
+        if memory_limit_mb is None:
+            return
+        self.config_manager.set_judge_settings(program, time_limit, memory_limit_mb)
+        
+        # 按列表顺序评测，只传递测试点数据的引用
+        items = [(tp_name, self.testpoint_data[tp_name]) for tp_name in self.listbox_keys
+                 if tp_name in self.testpoint_data]
+        command = build_command(program)
+        compare_mode, eps = self.config_manager.get_judge_compare_mode()
+        self.judge_cancelled = threading.Event()
+        self.judge_queue = queue.Queue()
+        self.judge_results = {}
+        
+        def run_judge():
+            try:
+                judge_testpoints(command, items, time_limit, memory_limit_mb * 1024 * 1024,
+                                 result_callback=self.judge_queue.put, cancel_event=self.judge_cancelled,
+                                 compare_mode=compare_mode, eps=eps)
+                self.judge_queue.put(None)
+            except Exception as e:
+                self.judge_queue.put(e)
+        
+        # 显示进度条和取消按钮
+        self.load_progress.configure(maximum=len(items), value=0)
+        self.cancel_load_btn.configure(text="取消评测", command=self.cancel_judge)
+        self.cancel_load_btn.pack(side=tk.RIGHT, padx=5)
+        self.load_progress.pack(side=tk.RIGHT, padx=5)
+        self.file_path_var.set(f"正在评测: {program}")
+        
+        self.judge_thread = threading.Thread(target=run_judge, daemon=True)
+        self.judge_thread.start()
+        self.refresh_judge_column()
+        self.after(100, self.process_judge_results, program, len(items))
+    
+    def process_judge_results(self, program, total):
+        """定时取出已完成的评测结果并更新结果列，评测结束后显示汇总"""
+        finished = False
+        error = None
+        changed = False
+        while True:
+            try:
+                item = self.judge_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None or isinstance(item, Exception):
+                finished = True
+                error = item
+                break
+            self.judge_results[item.name] = item
+            changed = True
+        if changed:
+            self.refresh_judge_column()
+        self.load_progress.configure(value=len(self.judge_results))
+        if not finished:
+            self.after(100, self.process_judge_results, program, total)
+            return
+        
+        self.judge_thread = None
+        self.load_progress.pack_forget()
+        self.cancel_load_btn.pack_forget()
+        self.cancel_load_btn.configure(text="取消加载", command=self.cancel_loading)
+        self.refresh_judge_column()
+        
+        accepted = sum(1 for result in self.judge_results.values() if result.verdict == AC)
+        if error is not None:
+            self.file_path_var.set(f"评测失败: {program}")
+            messagebox.showerror("错误", f"运行程序失败: {str(error)}")
+        elif self.judge_cancelled.is_set():
+            self.file_path_var.set(f"已取消评测: 通过 {accepted}/{len(self.judge_results)} 个已评测的测试点")
+        else:
+            self.file_path_var.set(f"评测完成: 通过 {accepted}/{total} 个测试点")
+    
+    def cancel_judge(self):
+        """取消正在进行的评测，已经在运行的测试点会继续运行到结束"""
+        if self.judge_thread is not None:
+            self.judge_cancelled.set()
+    
+    def toggle_stats_panel(self):
+        """显示或隐藏测试点统计面板，显示时在后台统计尚未统计的测试点"""
+        if str(self.stats_frame) in self.paned_window.panes():
+            self.stats_cancelled.set()
+            self.stats_queue = None
+            self.paned_window.forget(self.stats_frame)
+            return
+        self.paned_window.insert(1, self.stats_frame, weight=2)
+        self.refresh_stats_panel()
+    
+    def refresh_stats_panel(self):
+        """按测试点列表重新填充统计面板，并在后台统计缺少结果的测试点（文件的统计结果会缓存）"""
+        self.stats_cancelled.set()
+        self.stats_values = {tp_name: values for tp_name, values in self.stats_values.items()
+                             if tp_name in self.testpoint_data}
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for tp_name in self.listbox_keys:
+            if tp_name in self.stats_values:
+                self.insert_stats_row(tp_name)
+        self.sort_stats_column(self.stats_sort[0], self.stats_sort[1])
+        
+        items = [(tp_name, self.testpoint_data[tp_name]) for tp_name in self.listbox_keys
+                 if tp_name in self.testpoint_data and tp_name not in self.stats_values]
+        if not items:
+            self.stats_status_var.set(f"共 {len(self.stats_values)} 个测试点")
+            self.stats_queue = None
+            return
+        self.stats_cancelled = threading.Event()
+        self.stats_queue = queue.Queue()
+        stats_queue = self.stats_queue
+        cancel_event = self.stats_cancelled
+        parse_cache = self.parse_cache
+        
+        def run_stats():
+            try:
+                stats_testpoints(items, parse_cache, cancel_event=cancel_event,
+                                 result_callback=lambda *result: stats_queue.put(result))
+                stats_queue.put(None)
+            except Exception as e:
+                stats_queue.put(e)
+        
+        self.stats_status_var.set(f"正在统计... 0/{len(items)}")
+        threading.Thread(target=run_stats, daemon=True).start()
+        self.after(100, self.process_stats_results, stats_queue, len(items))
+    
+    def process_stats_results(self, stats_queue, total, done=0):
+        """定时取出统计结果并加入统计面板，统计结束后按当前的列重新排序"""
+        if stats_queue is not self.stats_queue:
+            return  # 面板已经隐藏或重新开始了统计
+        finished = False
+        error = None
+        while True:
+            try:
+                item = stats_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None or isinstance(item, Exception):
+                finished = True
+                error = item
+                break
+            tp_name, input_stats, output_stats = item
+            done += 1
+            if tp_name not in self.testpoint_data:
+                continue  # 统计期间已被删除
+            self.stats_values[tp_name] = self.make_stats_values(tp_name, input_stats, output_stats)
+            self.insert_stats_row(tp_name)
+        
+        if not finished:
+            self.stats_status_var.set(f"正在统计... {done}/{total}")
+            self.after(100, self.process_stats_results, stats_queue, total, done)
+            return
+        self.stats_queue = None
+        self.sort_stats_column(self.stats_sort[0], self.stats_sort[1])
+        if error is not None:
+            self.stats_status_var.set("统计失败")
+            messagebox.showerror("错误", f"统计测试点失败: {str(error)}")
+            return
+        self.stats_status_var.set(f"共 {len(self.stats_values)} 个测试点")
+    
+    def make_stats_values(self, tp_name, input_stats, output_stats):
+        """把输入和输出的统计结果转换为统计面板各列的数值，缺少的值为None"""
+        def field(stats, name):
+            return getattr(stats, name) if stats is not None else None
+        values = [self.get_display_name(tp_name)]
+        values += [field(input_stats, name) for name in ("size", "lines", "tokens", "first_min", "first_max")]
+        values.append(field(input_stats, "first_sum") if input_stats is not None and input_stats.first_count else None)
+        values += [field(input_stats, name) for name in ("int_min", "int_max")]
+        values.append(field(input_stats, "int_sum") if input_stats is not None and input_stats.int_count else None)
+        values += [field(output_stats, "size"), field(output_stats, "lines")]
+        return values
+    
+    def insert_stats_row(self, tp_name):
+        """在统计面板末尾加入一行"""
+        values = self.stats_values[tp_name]
+        texts = []
+        for column, value in zip(self.STATS_COLUMNS, values):
+            if value is None:
+                texts.append("-")
+            elif column[0] in ("input_size", "output_size"):
+                texts.append(format_size(value))
+            else:
+                texts.append(str(value))
+        if self.stats_tree.exists(tp_name):
+            self.stats_tree.item(tp_name, values=texts)
+        else:
+            self.stats_tree.insert("", tk.END, iid=tp_name, values=texts)
+    
+    def sort_stats_column(self, column, descending=None):
+        """按列排序统计面板，再次点击同一列时反转顺序；没有数值的行总是排在最后"""
+        if descending is None:
+            descending = not self.stats_sort[1] if self.stats_sort[0] == column else False
+        self.stats_sort = (column, descending)
+        index = [name for name, _, _ in self.STATS_COLUMNS].index(column)
+        
+        present = []
+        missing = []
+        for tp_name in self.stats_tree.get_children():
+            value = self.stats_values[tp_name][index]
+            (missing if value is None else present).append((value, tp_name))
+        present.sort(reverse=descending)
+        for position, (_, tp_name) in enumerate(present + missing):
+            self.stats_tree.move(tp_name, "", position)
+        
+        for name, heading, _ in self.STATS_COLUMNS:
+            arrow = (" ▼" if descending else " ▲") if name == column else ""
+            self.stats_tree.heading(name, text=heading + arrow)
+    
+    def on_stats_row_select(self, event):
+        """点击统计面板中的一行时在测试点列表中选中对应的测试点"""
+        selection = self.stats_tree.selection()
+        if not selection:
+            return
+        index = self.listbox_rows.get(selection[0])
+        if index is None:
+            return
+        self.testpoint_listbox.selection_clear(0, tk.END)
+        self.testpoint_listbox.selection_set(index)
+        self.testpoint_listbox.see(index)
+        self.testpoint_listbox.event_generate("<<ListboxSelect>>")
     
     def on_closing(self):
         """窗口关闭事件处理函数"""
+        # 停止尚未完成的后台加载和导出
+        self.cancel_loading()
+        self.cancel_export()
+        self.cancel_judge()
+        self.search_cancelled.set()
+        self.stats_cancelled.set()
+        
         # 保存分隔窗口位置
         try:
             sash_position = self.paned_window.sashpos(0)
@@ -1283,78 +2229,172 @@ class TestPointViewer(tk.Tk):
         except Exception as e:
             pass
             
-        # 保存测试点文件路径
+        # 保存测试点文件路径，并写入所有尚未保存的配置
         self.save_testpoints_data()
+        self.config_manager.flush()
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.parse_cache is not None:
+            self.parse_cache.close()
+        self.after_cancel(self.memory_status_job)
+        self.document_cache.clear()
         self.destroy()
     
     def load_saved_testpoints(self):
-        """加载已保存的测试点文件路径列表，并从原始文件加载测试点数据"""
+        """加载已保存的测试点文件路径列表，并在后台线程池中从原始文件加载测试点数据"""
         self.testpoint_data = {}
-        self.testpoint_listbox.delete(0, tk.END)
+        self.source_testpoint_names = {}
+        self.content_store.clear()
+        self.clear_listbox_testpoints()
         
         # 加载已保存的测试点文件路径列表
         testpoint_paths = self.config_manager.load_testpoint_paths()
         if not testpoint_paths:
             return
         
-        # 从原始文件加载测试点数据
-        loaded_count = 0
+        # 每个文件交给线程池解析，完成后结果放入队列，由主线程分批加入列表
+        self.load_cancelled = threading.Event()
+        self.load_queue = queue.Queue()
+        self.load_total = len(testpoint_paths)
+        self.load_done = 0
+        self.load_executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4))
+        self.load_operation = self.profiler.start("恢复测试点", f"{self.load_total} 个来源")
         for file_path in testpoint_paths:
+            # 大文件在解析过程中分批送出已解析的测试点，future为None表示这是部分结果
+            batch_callback = lambda batch, path=file_path, q=self.load_queue: q.put((path, None, batch))
+            future = self.load_executor.submit(self.profiler.run, "恢复测试点", self.parse_testpoint_file,
+                                               file_path, batch_callback, self.load_operation)
+            future.add_done_callback(lambda f, path=file_path, q=self.load_queue: q.put((path, f, None)))
+        
+        # 显示进度条和取消按钮
+        self.load_progress.configure(maximum=self.load_total, value=0)
+        self.cancel_load_btn.pack(side=tk.RIGHT, padx=5)
+        self.load_progress.pack(side=tk.RIGHT, padx=5)
+        self.file_path_var.set(f"正在加载 {self.load_total} 个测试点文件...")
+        
+        self.after(50, self.process_load_results, self.load_queue)
+    
+    def parse_testpoint_file(self, file_path, batch_callback=None, operation=None):
+        """解析单个测试点来源，返回新的测试点字典（在工作线程中执行，不访问界面）"""
+        return parse_testpoint_source(file_path, parse_cache=self.parse_cache, batch_callback=batch_callback,
+                                      operation=operation, **self.loader_options())
+    
+    def process_load_results(self, load_queue):
+        """取出已完成的加载结果，分批加入测试点列表并更新进度"""
+        if load_queue is not self.load_queue or self.load_executor is None:
+            return  # 加载已结束或已开始新的加载，忽略旧的结果
+        with self.profiler.activate(self.load_operation):
+            self.merge_load_results(load_queue)
+        
+    def merge_load_results(self, load_queue):
+        """把队列中已完成的加载结果加入测试点列表，加载未结束时继续定时检查"""
+        had_testpoints = self.testpoint_listbox.size() > 0
+        new_names = []
+        batch_names = set()
+        while True:
             try:
-                if os.path.exists(file_path):
-                    self.current_file = file_path
-                    # 直接调用加载方法，不通过load_testpoints以避免弹窗
-                    self.load_testpoint_without_popup(file_path)
-                    loaded_count += 1
-            except Exception as e:
-                pass
-            
-        # 如果有测试点，更新文件路径显示
-        if self.testpoint_listbox.size() > 0:
-            if self.current_file:
-                self.file_path_var.set(f"已加载: {self.current_file} (共 {self.testpoint_listbox.size()} 个测试点)")
-            
-            # 默认选择第一个测试点
+                file_path, future, partial = load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if future is None:
+                # 尚未解析完的文件送来的一批测试点
+                if not self.load_cancelled.is_set():
+                    new_names.extend(self.merge_parsed_testpoints(partial, batch_names))
+                continue
+            self.load_done += 1
+            if self.load_cancelled.is_set() or future.cancelled() or future.exception() is not None:
+                continue
+            self.current_file = file_path
+            self.record_source_testpoints(file_path, future.result())
+            new_names.extend(self.merge_parsed_testpoints(future.result(), batch_names))
+        
+        # 每批结果只向列表插入一次
+        self.append_listbox_testpoints(new_names)
+        self.load_progress.configure(value=self.load_done)
+        
+        # 第一批测试点出现时默认选择第一个
+        if not had_testpoints and self.testpoint_listbox.size() > 0:
             self.testpoint_listbox.selection_clear(0, tk.END)
             self.testpoint_listbox.selection_set(0)
             self.testpoint_listbox.see(0)
             self.testpoint_listbox.event_generate("<<ListboxSelect>>")
+        
+        if self.load_done < self.load_total and not self.load_cancelled.is_set():
+            self.file_path_var.set(f"正在加载 {self.load_done}/{self.load_total} 个测试点文件 (已有 {self.testpoint_listbox.size()} 个测试点)")
+            self.after(50, self.process_load_results, load_queue)
+            return
+        
+        self.finish_loading()
+    
+    def finish_loading(self):
+        """后台加载结束（完成或取消）后的收尾工作"""
+        if self.load_executor is not None:
+            self.load_executor.shutdown(wait=False, cancel_futures=True)
+            self.load_executor = None
+        if self.load_operation is not None:
+            if self.load_cancelled.is_set():
+                self.load_operation.detail += "（已取消）"
+            self.profiler.finish(self.load_operation)
+            self.load_operation = None
+        self.load_progress.pack_forget()
+        self.cancel_load_btn.pack_forget()
+        if str(self.stats_frame) in self.paned_window.panes():
+            self.refresh_stats_panel()
+        
+        # 如果有测试点，更新文件路径显示
+        if self.testpoint_listbox.size() > 0:
+            status = "已取消加载" if self.load_cancelled.is_set() else "已加载"
+            if self.current_file:
+                self.file_path_var.set(f"{status}: {self.current_file} (共 {self.testpoint_listbox.size()} 个测试点)")
         else:
             self.file_path_var.set("未能加载任何测试点")
-            
-    def load_testpoint_without_popup(self, file_path):
-        """加载测试点数据，但不显示弹窗提示，用于程序启动时加载保存的测试点"""
+    
+    def cancel_loading(self):
+        """取消尚未完成的后台加载，已加载的测试点保留"""
+        if self.load_executor is None:
+            return
+        self.load_cancelled.set()
+        self.finish_loading()
+    
+    def load_testpoint_without_popup(self, file_path, parsed_testpoints=None):
+        """加载测试点数据，但不显示弹窗提示，用于程序启动时加载保存的测试点
+        
+        parsed_testpoints为后台线程已解析好的结果，为None时在当前线程解析
+        """
         try:
-            # 根据文件类型处理
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext == ".json":
-                # 处理JSON格式的测试点文件
-                self.load_json_testpoints(file_path)
-            else:
-                # 处理普通文本格式的测试点文件
-                self.load_text_testpoints(file_path)
-                
-            # 尝试查找与当前文件相关的测试点文件（同名不同扩展名）
-            self.find_related_testpoints(file_path)
+            if parsed_testpoints is None:
+                parsed_testpoints = self.parse_testpoint_file(file_path)
+            self.record_source_testpoints(file_path, parsed_testpoints)
             
-            # 更新测试点列表
-            for tp_name in sorted(self.testpoint_data.keys()):
-                # 检查测试点是否已经在列表中
-                display_name = self.format_testpoint_name(tp_name)
-                # 检查是否已存在于列表中
-                exists = False
-                for i in range(self.testpoint_listbox.size()):
-                    if self.testpoint_listbox.get(i) == display_name:
-                        exists = True
-                        break
-                # 只添加不存在的测试点
-                if not exists:
-                    self.testpoint_listbox.insert(tk.END, display_name)
+            # 更新测试点列表，一次性插入尚未显示的部分
+            self.append_listbox_testpoints(self.merge_parsed_testpoints(parsed_testpoints))
             
         except Exception as e:
             pass
     
+    def record_source_testpoints(self, spec, testpoints):
+        """记录JSON文件或压缩包来源中加载的测试点名称，其它来源不需要记录"""
+        source_path = split_source_spec(spec)[0]
+        if is_json_source(source_path) or is_archive_source(source_path):
+            self.source_testpoint_names[spec] = frozenset(testpoints)
+    
+    def merge_parsed_testpoints(self, parsed_testpoints, pending_names=None):
+        """把解析结果合并到测试点数据中，返回需要加入列表的新测试点名称（已排序）
+        
+        已存在的测试点保持不变；pending_names记录同一批中已经返回过的名称，避免重复插入
+        """
+        if pending_names is None:
+            pending_names = set()
+        new_names = []
+        # 只对本文件带来的测试点排序，不再重新排序全部测试点
+        for tp_name in sorted(parsed_testpoints):
+            if tp_name not in self.testpoint_data:
+                self.testpoint_data[tp_name] = self.content_store.acquire_testpoint(parsed_testpoints[tp_name])
+            if tp_name not in self.shown_testpoints and tp_name not in pending_names:
+                pending_names.add(tp_name)
+                new_names.append(tp_name)
+        return new_names
+    
     def delete_selected_testpoints(self):
         """删除选中的测试点"""
         selection = self.testpoint_listbox.curselection()
@@ -1372,35 +2412,30 @@ class TestPointViewer(tk.Tk):
             return
         
         # 获取所有选中的测试点名称
-        to_delete = []
-        for index in sorted(selection, reverse=True):
-            display_name = self.testpoint_listbox.get(index)
-            
-            # 查找对应的原始测试点名称
-            for tp_name in list(self.testpoint_data.keys()):
-                if self.format_testpoint_name(tp_name) == display_name:
-                    # 检查是否有打开的标签页
-                    for tab_id, tab_info in list(self.open_tabs.items()):
-                        if tab_info["original_name"] == tp_name:
-                            # 关闭对应的标签页
-                            self.close_tab(tab_id)
-                    
-                    # 从测试点数据中删除
-                    del self.testpoint_data[tp_name]
-                    to_delete.append(index)
-                    break
+        to_delete = set(self.get_listbox_testpoint(index) for index in selection)
+        to_delete.discard(None)
+        
+        # 关闭对应的标签页
+        for tab_id, tab_info in list(self.open_tabs.items()):
+            if tab_info["original_name"] in to_delete:
+                self.close_tab(tab_id)
+        
+        # 从测试点数据中删除，最后一个引用释放后内容也从内容池中删除
+        for tp_name in to_delete:
+            data = self.testpoint_data.pop(tp_name, None)
+            if data is not None:
+                self.content_store.release_testpoint(data)
         
         # 从列表中删除
-        for index in to_delete:
-            self.testpoint_listbox.delete(index)
+        self.remove_listbox_rows(selection)
         
         # 保存测试点数据
         self.save_testpoints_data()
         
         # 清空当前显示
         if self.current_view_mode == "side_by_side":
-            self.left_input_text.delete(1.0, tk.END)
-            self.right_output_text.delete(1.0, tk.END)
+            self.left_input_text.clear()
+            self.right_output_text.clear()
         
         # 更新文件路径显示
         if self.current_file:
@@ -1414,16 +2449,16 @@ class TestPointViewer(tk.Tk):
         testpoint_paths = self.config_manager.load_testpoint_paths()
         
         # 添加当前文件路径（如果存在且有效）
-        if self.current_file and os.path.exists(self.current_file):
+        if self.current_file and source_exists(self.current_file):
             # 检查是否已存在相同路径
             if self.current_file not in testpoint_paths:
                 # 获取当前文件的基本名称（不含扩展名）
-                current_file_base = os.path.splitext(os.path.basename(self.current_file))[0]
+                current_file_base = source_dedupe_key(self.current_file)
                 
                 # 检查是否已存在相同基本名称的测试点文件
                 is_duplicate = False
                 for existing_path in testpoint_paths:
-                    existing_base = os.path.splitext(os.path.basename(existing_path))[0]
+                    existing_base = source_dedupe_key(existing_path)
                     if current_file_base == existing_base:
                         is_duplicate = True
                         break
@@ -1437,14 +2472,142 @@ class TestPointViewer(tk.Tk):
         unique_bases = set()
         
         for path in testpoint_paths:
-            if os.path.exists(path):  # 确保文件存在
-                base_name = os.path.splitext(os.path.basename(path))[0]
+            if source_exists(path):  # 确保文件或文件夹存在
+                base_name = source_dedupe_key(path)
                 if base_name not in unique_bases:
                     unique_bases.add(base_name)
                     unique_paths.append(path)
         
         # 保存测试点文件路径列表
         self.config_manager.save_testpoint_paths(unique_paths)
+        self.update_watched_sources()
+    
+    def update_watched_sources(self):
+        """根据testpoints.json中的来源更新需要监视的目录"""
+        if getattr(self, 'watcher', None) is None:
+            return
+        self.watched_sources = self.config_manager.load_testpoint_paths()
+        directories = {}
+        for spec in self.watched_sources:
+            source_path, recursive = split_source_spec(spec)
+            if os.path.isdir(source_path):
+                directories[source_path] = directories.get(source_path, False) or recursive
+            else:
+                directories.setdefault(os.path.dirname(source_path) or os.curdir, False)
+        self.watcher.set_directories(directories)
+    
+    def collect_changed_testpoints(self, changed_paths):
+        """根据变化的文件重新读取受影响的测试点（在监视线程中执行，不访问界面）
+        
+        结果{测试点名称: 新的测试点数据}放入watch_queue，数据为None表示测试点的文件都已被删除。
+        """
+        changes = {}
+        sources = self.watched_sources
+        for file_path in changed_paths:
+            dir_path, file_name = os.path.split(file_path)
+            for spec in sources:
+                source_path, recursive = split_source_spec(spec)
+                try:
+                    if os.path.isdir(source_path):
+                        # 文件夹来源：只重新读取变化文件所在的这一组输入输出文件
+                        if dir_path == source_path or (recursive and dir_path.startswith(source_path + os.sep)):
+                            changes.update(self.read_testpoint_pair(file_path))
+                            break
+                    elif is_json_source(source_path) or is_archive_source(source_path):
+                        # JSON文件和压缩包整体就是一个来源，重新解析
+                        if file_path == source_path:
+                            changes.update(self.reparse_testpoint_source(spec))
+                            break
+                    elif dir_path == (os.path.dirname(source_path) or os.curdir) and \
+                            os.path.splitext(file_name)[0] == os.path.splitext(os.path.basename(source_path))[0]:
+                        # 文本文件来源：只关心与它同名的相关文件
+                        if file_path == source_path and os.path.exists(file_path) and not self.read_testpoint_pair(file_path):
+                            testpoints = {}
+                            self.load_text_testpoints(file_path, testpoints)
+                            changes.update(testpoints)
+                        else:
+                            changes.update(self.read_testpoint_pair(file_path))
+                        break
+                except Exception:
+                    continue  # 文件正在被改写等情况，等下一次变化时再读取
+        if changes:
+            self.watch_queue.put(changes)
+    
+    def reparse_testpoint_source(self, spec):
+        """重新解析JSON文件或压缩包来源，返回{测试点名称: 数据}（在监视线程中执行）
+        
+        来源中已经不存在的测试点对应None；来源文件被删除时解析结果为空，其中的测试点全部对应None。
+        """
+        parsed = self.parse_testpoint_file(spec)
+        changes = dict.fromkeys(self.source_testpoint_names.get(spec, frozenset()).difference(parsed))
+        changes.update(parsed)
+        self.source_testpoint_names[spec] = frozenset(parsed)
+        return changes
+    
+    def read_testpoint_pair(self, file_path):
+        """重新读取输入或输出文件所在的测试点，返回{测试点名称: 数据}"""
+        return read_testpoint_pair(file_path, **self.loader_options())
+    
+    def process_watch_changes(self):
+        """定期取出监视线程发现的变化并应用"""
+        changes = {}
+        while True:
+            try:
+                changes.update(self.watch_queue.get_nowait())
+            except queue.Empty:
+                break
+        if changes:
+            self.apply_testpoint_changes(changes)
+        self.after(200, self.process_watch_changes)
+    
+    def apply_testpoint_changes(self, changes):
+        """就地更新变化的测试点：刷新正在显示的内容，加入新的测试点，移除文件已被删除的测试点"""
+        selection = self.testpoint_listbox.curselection()
+        current_name = self.get_listbox_testpoint(selection[0]) if len(selection) == 1 else None
+        
+        new_names = []
+        updated = set()
+        removed = set()
+        for tp_name, data in changes.items():
+            self.judge_results.pop(tp_name, None)  # 数据变化后原来的评测结果不再有效
+            self.stats_values.pop(tp_name, None)
+            old_data = self.testpoint_data.pop(tp_name, None)
+            if old_data is not None:
+                self.content_store.release_testpoint(old_data)
+            if data is None:
+                if old_data is not None:
+                    removed.add(tp_name)
+            else:
+                if old_data is not None:
+                    updated.add(tp_name)
+                else:
+                    new_names.append(tp_name)
+                self.testpoint_data[tp_name] = self.content_store.acquire_testpoint(data)
+        
+        if removed:
+            for tab_id, tab_info in list(self.open_tabs.items()):
+                if tab_info["original_name"] in removed:
+                    self.close_tab(tab_id)
+            self.remove_listbox_rows([self.listbox_rows[tp_name] for tp_name in removed if tp_name in self.listbox_rows])
+            if current_name in removed:
+                self.left_input_text.clear()
+                self.right_output_text.clear()
+        self.append_listbox_testpoints(sorted(tp_name for tp_name in new_names if tp_name not in self.shown_testpoints))
+        
+        # 刷新正在显示的测试点
+        if current_name in updated:
+            self.left_input_text.set_source(self.testpoint_data[current_name]['input'])
+            self.right_output_text.set_source(self.testpoint_data[current_name]['output'])
+        for tab_id, tab_info in self.open_tabs.items():
+            if tab_info["original_name"] in updated:
+                self.update_tab_content(tab_id)
+        if updated:
+            self.refresh_judge_column()
+        if str(self.stats_frame) in self.paned_window.panes():
+            self.refresh_stats_panel()
+        
+        if (new_names or removed) and self.current_file and self.load_executor is None:
+            self.file_path_var.set(f"已加载: {self.current_file} (共 {self.testpoint_listbox.size()} 个测试点)")
 
 if __name__ == "__main__":
     app = TestPointViewer()
@@ -0,0 +1,365 @@
+"""洛谷测试点查看器的性能测试
+
+生成合成的测试点数据（大量小文件、少量大文件、testCases很大的洛谷JSON文件、多层嵌套的文件夹），
+在隐藏主窗口的独立子进程中执行加载、恢复、切换测试点、导出、调整字体和冷启动等操作，
+以JSON格式输出每项操作的用时和进程的内存峰值，便于比较不同版本的性能。
+每个子进程都使用新的空配置目录（通过CONFIG_DIR_ENV环境变量指定），不会读写用户的配置。
+在没有显示器的Linux上可以配合xvfb-run运行。
+
+示例：
+    python testpoint_bench.py -o before.json
+    python testpoint_bench.py --scale 0.1 --cases load_testpoints on_testpoint_select
+    python testpoint_bench.py --datasets huge_files --data-dir bench_data --repeat 3
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource  # Windows上没有resource模块，无法获取内存峰值
+except ImportError:
+    resource = None
+
+RESULT_PREFIX = "BENCH_RESULT "  # 子进程输出结果的行以此开头
+SELECT_SAMPLES = 200  # 测试切换测试点时最多选择的测试点数量
+FONT_SIZES = list(range(6, 31)) + list(range(29, 5, -1))  # 测试调整字体时依次设置的字体大小
+MB = 1024 * 1024
+
+def random_numbers_block(rnd, lines=50000):
+    """生成约1MB由随机整数组成的数据，生成大文件时重复写入"""
+    return "".join(f"{rnd.randint(1, 10 ** 9)} {rnd.randint(-10 ** 9, 10 ** 9)}\n" for _ in range(lines)).encode()
+
+def write_sized_file(path, size, block):
+    """重复写入block，直到文件大小不小于size"""
+    with open(path, 'wb') as f:
+        written = 0
+        while written < size:
+            f.write(block)
+            written += len(block)
+
+def write_small_pair(directory, name, rnd):
+    """写入一对只有几行的输入输出文件"""
+    n = rnd.randint(1, 20)
+    numbers = [rnd.randint(-1000, 1000) for _ in range(n)]
+    with open(os.path.join(directory, name + ".in"), 'w', encoding='utf-8', newline='\n') as f:
+        f.write(f"{n}\n{' '.join(map(str, numbers))}\n")
+    with open(os.path.join(directory, name + ".out"), 'w', encoding='utf-8', newline='\n') as f:
+        f.write(f"{sum(numbers)}\n")
+
+def make_small_pairs(directory, scale, rnd):
+    """大量很小的测试点文件"""
+    for index in range(1, max(1, int(5000 * scale)) + 1):
+        write_small_pair(directory, f"small{index}", rnd)
+
+def make_huge_files(directory, scale, rnd):
+    """少量很大的测试点文件"""
+    block = random_numbers_block(rnd)
+    for index in range(1, 4):
+        write_sized_file(os.path.join(directory, f"huge{index}.in"), int(64 * MB * scale), block)
+        write_sized_file(os.path.join(directory, f"huge{index}.out"), int(8 * MB * scale), block[:MB // 8])
+
+def make_luogu_json(directory, scale, rnd):
+    """洛谷格式的JSON文件，testCases中的每个输入都很大"""
+    block = random_numbers_block(rnd, 5000).decode()
+    repeat = max(1, int(40 * scale))
+    with open(os.path.join(directory, "P1000.json"), 'w', encoding='utf-8') as f:
+        f.write('{"pid": "P1000", "testCases": [')
+        for index in range(20):
+            if index:
+                f.write(', ')
+            json.dump({"input": block * repeat, "output": block[:1000]}, f)
+        f.write(']}')
+
+def make_deep_tree(directory, scale, rnd, depth=6, branches=3):
+    """多层嵌套的文件夹，每一层都有测试点"""
+    for index in range(max(1, int(2 * scale))):
+        write_small_pair(directory, f"depth{depth}_{index}", rnd)
+    if depth > 1:
+        for branch in range(branches):
+            child = os.path.join(directory, f"sub{branch}")
+            os.mkdir(child)
+            make_deep_tree(child, scale, rnd, depth - 1, branches)
+
+# 数据集名称 -> (加载方式, 相对于数据集目录的来源路径, 生成函数)
+# 加载方式：file为测试点文件，folder为文件夹，recursive为包含子文件夹的文件夹
+DATASETS = {
+    "small_pairs": ("folder", "", make_small_pairs),
+    "huge_files": ("folder", "", make_huge_files),
+    "luogu_json": ("file", "P1000.json", make_luogu_json),
+    "deep_tree": ("recursive", "", make_deep_tree),
+}
+
+def dataset_source(data_dir, name):
+    """返回数据集的(加载方式, 来源路径)"""
+    kind, relative_path, _ = DATASETS[name]
+    return kind, os.path.normpath(os.path.join(data_dir, name, relative_path))
+
+def prepare_datasets(data_dir, names, scale):
+    """生成尚不存在的数据集（已存在时直接复用），返回{名称: {"files": 文件数, "bytes": 总大小}}"""
+    info = {}
+    for name in names:
+        directory = os.path.join(data_dir, name)
+        if not os.path.isdir(directory):
+            print(f"正在生成数据集 {name}...", file=sys.stderr)
+            temp_directory = directory + ".tmp"
+            shutil.rmtree(temp_directory, ignore_errors=True)
+            os.makedirs(temp_directory)
+            DATASETS[name][2](temp_directory, scale, random.Random(name))
+            os.replace(temp_directory, directory)
+        files = 0
+        total = 0
+        for root, _, file_names in os.walk(directory):
+            for file_name in file_names:
+                files += 1
+                total += os.path.getsize(os.path.join(root, file_name))
+        info[name] = {"files": files, "bytes": total}
+    return info
+
+def peak_rss():
+    """当前进程的内存峰值（字节），无法获取时返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak * (1 if sys.platform == 'darwin' else 1024)  # Linux上的单位是KB
+
+def pump(app, done, timeout):
+    """处理界面事件，直到done()为真（后台加载和导出通过after定时检查结果）"""
+    deadline = time.monotonic() + timeout
+    while not done():
+        if time.monotonic() > deadline:
+            raise TimeoutError("等待操作完成超时")
+        app.update()
+        time.sleep(0.001)
+    app.update_idletasks()
+
+def load_dataset(app, kind, path):
+    """按界面中对应的操作加载数据集"""
+    if kind == "file":
+        app.load_testpoints(path)
+    else:
+        app.load_testpoint_folder(path, recursive=kind == "recursive")
+    app.update_idletasks()
+
+def case_load_testpoints(app, kind, path, timeout):
+    """选择测试点文件或文件夹后的加载（文件夹使用load_testpoint_folder）"""
+    start = time.perf_counter()
+    load_dataset(app, kind, path)
+    return {"wall": time.perf_counter() - start, "testpoints": app.testpoint_listbox.size()}
+
+def case_load_saved_testpoints(app, kind, path, timeout):
+    """启动时恢复已保存的测试点，分别测试没有解析缓存和有解析缓存的情况"""
+    from testpoint_core import make_source_spec
+    
+    source = path if kind == "file" else make_source_spec(path, kind == "recursive")
+    app.config_manager.save_testpoint_paths([source])
+    walls = []
+    for _ in range(2):
+        start = time.perf_counter()
+        app.load_saved_testpoints()
+        pump(app, lambda: app.load_executor is None, timeout)
+        walls.append(time.perf_counter() - start)
+    return {"wall": walls[0], "warm_wall": walls[1], "testpoints": app.testpoint_listbox.size()}
+
+def case_on_testpoint_select(app, kind, path, timeout):
+    """在列表中均匀选取若干测试点，逐个选中并显示内容"""
+    import tkinter as tk
+    
+    load_dataset(app, kind, path)
+    listbox = app.testpoint_listbox
+    total = listbox.size()
+    indices = list(range(0, total, max(1, total // SELECT_SAMPLES)))[:SELECT_SAMPLES]
+    times = []
+    for index in indices:
+        start = time.perf_counter()
+        listbox.selection_clear(0, tk.END)
+        listbox.selection_set(index)
+        listbox.event_generate("<<ListboxSelect>>")
+        app.update_idletasks()
+        times.append(time.perf_counter() - start)
+    return {"wall": sum(times), "count": len(times), "mean": statistics.mean(times) if times else 0.0,
+            "max": max(times, default=0.0)}
+
+def case_export_testpoints_to_json(app, kind, path, timeout):
+    """把全部测试点导出为JSON文件（保存位置对话框替换为配置目录中的临时文件）"""
+    import main
+    
+    load_dataset(app, kind, path)
+    output_path = str(app.config_manager.config_dir / "export.json")
+    main.filedialog.asksaveasfilename = lambda **options: output_path
+    start = time.perf_counter()
+    app.export_testpoints_to_json()
+    pump(app, lambda: app.export_thread is None, timeout)
+    return {"wall": time.perf_counter() - start, "bytes": os.path.getsize(output_path)}
+
+def case_font_resize(app, kind, path, timeout):
+    """显示一个测试点时反复调整字体大小"""
+    load_dataset(app, kind, path)
+    start = time.perf_counter()
+    for size in FONT_SIZES:
+        app.update_font_size(size)
+        app.update_idletasks()
+    wall = time.perf_counter() - start
+    return {"wall": wall, "count": len(FONT_SIZES), "mean": wall / len(FONT_SIZES)}
+
+# 测试项目名称 -> 测试函数；cold_startup不需要数据集，测量从导入到主窗口创建完成的时间
+CASES = {
+    "cold_startup": None,
+    "load_testpoints": case_load_testpoints,
+    "load_saved_testpoints": case_load_saved_testpoints,
+    "on_testpoint_select": case_on_testpoint_select,
+    "export_testpoints_to_json": case_export_testpoints_to_json,
+    "font_resize": case_font_resize,
+}
+
+def run_case(case, dataset, data_dir, timeout):
+    """在子进程中执行一项测试，结果以一行JSON输出到标准输出"""
+    start = time.perf_counter()
+    import main
+    
+    # 对话框会阻塞测试，改为记录消息；错误消息放入结果中
+    errors = []
+    main.messagebox.showinfo = lambda title, message, **options: None
+    main.messagebox.showwarning = lambda title, message, **options: None
+    main.messagebox.showerror = lambda title, message, **options: errors.append(message)
+    main.messagebox.askyesno = lambda title, message, **options: False
+    
+    app = main.TestPointViewer()
+    app.withdraw()
+    app.update()
+    startup = time.perf_counter() - start
+    try:
+        if CASES[case] is None:
+            result = {"wall": startup}
+        else:
+            kind, path = dataset_source(data_dir, dataset)
+            result = CASES[case](app, kind, path, timeout)
+    finally:
+        app.on_closing()
+    result["peak_rss"] = peak_rss()
+    if errors:
+        result["errors"] = errors
+    print(RESULT_PREFIX + json.dumps(result, ensure_ascii=False), flush=True)
+
+def run_in_subprocess(case, dataset, data_dir, timeout):
+    """在使用新配置目录的子进程中执行一项测试，返回结果字典（失败时包含error）"""
+    from main import CONFIG_DIR_ENV
+    
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", case, "--data-dir", data_dir,
+               "--timeout", str(timeout)]
+    if dataset is not None:
+        command += ["--dataset", dataset]
+    with tempfile.TemporaryDirectory(prefix="luogu_bench_") as config_dir:
+        env = dict(os.environ)
+        env[CONFIG_DIR_ENV] = config_dir
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run(command, env=env, capture_output=True, text=True, encoding='utf-8',
+                                       errors='replace', timeout=timeout * 2,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        except subprocess.TimeoutExpired:
+            return {"error": "超时"}
+        process_wall = time.perf_counter() - start
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+            result["process_wall"] = process_wall
+            return result
+    lines = completed.stderr.strip().splitlines()
+    return {"error": lines[-1] if lines else f"退出代码 {completed.returncode}"}
+
+def summarize_runs(case, dataset, runs):
+    """合并重复运行的结果：用时取中位数，内存峰值取最大值"""
+    entry = {"case": case, "dataset": dataset}
+    failed = [run for run in runs if "error" in run]
+    if failed:
+        entry["error"] = failed[0]["error"]
+        return entry
+    entry.update(runs[-1])
+    walls = [run["wall"] for run in runs]
+    entry["wall"] = statistics.median(walls)
+    entry["wall_min"] = min(walls)
+    peaks = [run["peak_rss"] for run in runs if run.get("peak_rss") is not None]
+    entry["peak_rss"] = max(peaks) if peaks else None
+    return entry
+
+def git_commit():
+    """当前代码的提交，不在git仓库中时返回None"""
+    try:
+        completed = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+def run_benchmarks(args, data_dir):
+    """生成数据集并依次执行所有测试，返回报告字典"""
+    datasets = prepare_datasets(data_dir, args.datasets, args.scale)
+    plan = [(case, None if CASES[case] is None else dataset)
+            for case in args.cases for dataset in (args.datasets if CASES[case] is not None else [None])]
+    results = []
+    for number, (case, dataset) in enumerate(plan, 1):
+        runs = [run_in_subprocess(case, dataset, data_dir, args.timeout) for _ in range(args.repeat)]
+        entry = summarize_runs(case, dataset, runs)
+        results.append(entry)
+        if "error" in entry:
+            summary = f"失败: {entry['error']}"
+        else:
+            memory = "-" if entry["peak_rss"] is None else f"{entry['peak_rss'] / MB:.1f} MB"
+            summary = f"{entry['wall']:.3f}s  {memory}"
+        print(f"[{number}/{len(plan)}] {case} {dataset or ''}: {summary}", file=sys.stderr)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "datasets": datasets,
+        "results": results,
+    }
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="洛谷测试点查看器的性能测试")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), help="要执行的测试，默认全部")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS),
+                        help="使用的数据集，默认全部")
+    parser.add_argument("--scale", type=float, default=1.0, help="数据集的规模系数，默认1（约0.3GB）")
+    parser.add_argument("--repeat", type=int, default=1, help="每项测试重复的次数，用时取中位数")
+    parser.add_argument("--data-dir", help="数据集保存的目录，已存在的数据集直接复用；默认使用临时目录并在结束后删除")
+    parser.add_argument("--timeout", type=float, default=600, help="每项操作的超时时间（秒），默认600")
+    parser.add_argument("-o", "--output", help="把JSON结果写入文件，默认输出到标准输出")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)  # 子进程内部使用
+    parser.add_argument("--dataset", help=argparse.SUPPRESS)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.run_case:
+        run_case(args.run_case, args.dataset, args.data_dir, args.timeout)
+        return 0
+    
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        report = run_benchmarks(args, os.path.abspath(args.data_dir))
+    else:
+        with tempfile.TemporaryDirectory(prefix="luogu_bench_data_") as data_dir:
+            report = run_benchmarks(args, data_dir)
+    
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if any("error" in entry for entry in report["results"]) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
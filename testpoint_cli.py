@@ -0,0 +1,190 @@
+"""洛谷测试点查看器的命令行工具，不导入tkinter，可以在没有显示器的环境中使用
+
+示例：
+    python testpoint_cli.py list data/ P1001.json
+    python testpoint_cli.py stats -r data/
+    python testpoint_cli.py stats data/ --detail
+    python testpoint_cli.py export data/ data.zip -o all.json.gz
+    python testpoint_cli.py convert P1001.json P1001.json.xz --compact
+    python testpoint_cli.py judge ./a.out data/ -t 1 -m 256
+    python testpoint_cli.py compare my.out P1001_1.out --mode float --eps 1e-6
+"""
+import argparse
+import os
+import sys
+
+from testpoint_compare import COMPARE_MODES, LINE_MODE, compare_outputs
+from testpoint_core import (MISSING_INPUT, MISSING_OUTPUT, FileContent, format_size, make_source_spec,
+                            parse_testpoint_source, read_content, write_testpoints_json)
+from testpoint_judge import AC, SKIP, build_command, judge_testpoints
+from testpoint_stats import stats_testpoints
+
+def load_sources(sources, recursive=False, eager=False):
+    """依次解析各个来源，返回合并后的测试点字典（名称相同时保留先出现的）"""
+    testpoints = {}
+    for source in sources:
+        path = os.path.normpath(source)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"找不到测试点来源: {source}")
+        spec = make_source_spec(path, recursive and os.path.isdir(path))
+        parsed = parse_testpoint_source(spec, lazy=not eager)
+        for name in sorted(parsed):
+            testpoints.setdefault(name, parsed[name])
+    return testpoints
+
+def content_size(value):
+    """测试点内容的字节数，普通文件直接使用文件大小，不读取内容；缺少输入或输出文件时返回None"""
+    if isinstance(value, str) and value in (MISSING_INPUT, MISSING_OUTPUT):
+        return None
+    if isinstance(value, FileContent) and value.RAW:
+        return value.size - value.offset if value.length is None else value.length
+    return len(read_content(value).encode('utf-8'))
+
+def format_content_size(value):
+    """content_size的显示形式，缺少文件时显示为"-"，与stats --detail一致"""
+    size = content_size(value)
+    return "-" if size is None else str(size)
+
+def command_list(args):
+    """列出测试点名称"""
+    testpoints = load_sources(args.sources, args.recursive, args.eager)
+    for name, data in testpoints.items():
+        if args.long:
+            print(f"{name}\t{format_content_size(data['input'])}\t{format_content_size(data['output'])}")
+        else:
+            print(name)
+    return 0
+
+def command_stats(args):
+    """输出测试点数量、缺少输入或输出的测试点数量以及数据总大小"""
+    testpoints = load_sources(args.sources, args.recursive, args.eager)
+    # 缺少的文件不计入总大小
+    input_sizes = [size for size in (content_size(data['input']) for data in testpoints.values()) if size is not None]
+    output_sizes = [size for size in (content_size(data['output']) for data in testpoints.values()) if size is not None]
+    print(f"测试点数量: {len(testpoints)}")
+    print(f"缺少输入文件: {sum(1 for data in testpoints.values() if data['input'] == MISSING_INPUT)}")
+    print(f"缺少输出文件: {sum(1 for data in testpoints.values() if data['output'] == MISSING_OUTPUT)}")
+    print(f"输入总大小: {format_size(sum(input_sizes))} (最大 {format_size(max(input_sizes, default=0))})")
+    print(f"输出总大小: {format_size(sum(output_sizes))} (最大 {format_size(max(output_sizes, default=0))})")
+    if args.detail:
+        print_testpoint_stats(testpoints, args.jobs)
+    return 0
+
+def print_testpoint_stats(testpoints, workers=None):
+    """按测试点逐行输出输入的行数、单词数和整数范围，以及输出的大小，各列以制表符分隔"""
+    def show(value):
+        return "-" if value is None else str(value)
+    
+    results = stats_testpoints(list(testpoints.items()), workers=workers)
+    print("名称\t输入大小\t行数\t单词数\t首行最小\t首行最大\t整数最小\t整数最大\t整数和\t输出大小")
+    for name in testpoints:
+        input_stats, output_stats = results[name]
+        if input_stats is None:
+            columns = ["-"] * 8
+        else:
+            columns = [input_stats.size, input_stats.lines, input_stats.tokens, input_stats.first_min,
+                       input_stats.first_max, input_stats.int_min, input_stats.int_max,
+                       input_stats.int_sum if input_stats.int_count else None]
+        columns.append(None if output_stats is None else output_stats.size)
+        print("\t".join([name] + [show(value) for value in columns]))
+
+def export_testpoints(sources, output, args):
+    """把来源中的测试点导出为JSON文件"""
+    testpoints = load_sources(sources, args.recursive, args.eager)
+    if not testpoints:
+        print("没有可以导出的测试点", file=sys.stderr)
+        return 1
+    write_testpoints_json(list(testpoints.items()), output, args.compact)
+    print(f"已导出 {len(testpoints)} 个测试点到: {output}")
+    return 0
+
+def command_export(args):
+    """合并多个来源导出为一个JSON文件"""
+    return export_testpoints(args.sources, args.output, args)
+
+def command_convert(args):
+    """把单个来源转换为JSON文件（可选紧凑格式和gzip、xz压缩）"""
+    return export_testpoints([args.source], args.output, args)
+
+def print_judge_result(result):
+    """输出一个测试点的评测结果，未通过时附上错误信息的最后一行"""
+    message = result.message.splitlines()[-1] if result.message and result.verdict != AC else ""
+    print(f"{result.name}\t{result.summary()}\t{message}".rstrip(), flush=True)
+
+def command_judge(args):
+    """用程序评测所有测试点，全部通过时返回0"""
+    testpoints = load_sources(args.sources, args.recursive, args.eager)
+    results = judge_testpoints(build_command(args.program), list(testpoints.items()),
+                               args.time_limit, args.memory_limit * 1024 * 1024, args.jobs,
+                               print_judge_result, compare_mode=args.mode, eps=args.eps)
+    judged = [result for result in results.values() if result.verdict != SKIP]
+    accepted = sum(1 for result in judged if result.verdict == AC)
+    print(f"通过 {accepted}/{len(judged)} 个测试点")
+    return 0 if accepted == len(judged) else 1
+
+def command_compare(args):
+    """比较输出文件与答案文件，相同时返回0"""
+    result = compare_outputs(args.output, args.answer, args.mode, args.eps)
+    print(result.describe())
+    return 0 if result else 1
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="洛谷测试点命令行工具")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-r", "--recursive", action="store_true", help="文件夹来源包含子文件夹")
+    common.add_argument("--eager", action="store_true", help="立即读取全部内容（默认只记录文件位置）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    list_parser = subparsers.add_parser("list", parents=[common], help="列出测试点")
+    list_parser.add_argument("sources", nargs="+", help="测试点文件、文件夹、JSON文件或压缩包")
+    list_parser.add_argument("-l", "--long", action="store_true", help="同时输出输入和输出的字节数")
+    list_parser.set_defaults(func=command_list)
+    
+    stats_parser = subparsers.add_parser("stats", parents=[common], help="统计测试点")
+    stats_parser.add_argument("sources", nargs="+", help="测试点文件、文件夹、JSON文件或压缩包")
+    stats_parser.add_argument("--detail", action="store_true", help="逐个输出测试点的行数、单词数和整数范围")
+    stats_parser.add_argument("-j", "--jobs", type=int, default=None, help="同时统计的测试点数量，默认为CPU核数")
+    stats_parser.set_defaults(func=command_stats)
+    
+    export_parser = subparsers.add_parser("export", parents=[common], help="合并导出为JSON文件")
+    export_parser.add_argument("sources", nargs="+", help="测试点文件、文件夹、JSON文件或压缩包")
+    export_parser.add_argument("-o", "--output", required=True, help="输出文件，以.gz或.xz结尾时压缩")
+    export_parser.add_argument("--compact", action="store_true", help="使用紧凑格式（不缩进）")
+    export_parser.set_defaults(func=command_export)
+    
+    convert_parser = subparsers.add_parser("convert", parents=[common], help="转换为JSON文件")
+    convert_parser.add_argument("source", help="测试点文件、文件夹、JSON文件或压缩包")
+    convert_parser.add_argument("output", help="输出文件，以.gz或.xz结尾时压缩")
+    convert_parser.add_argument("--compact", action="store_true", help="使用紧凑格式（不缩进）")
+    convert_parser.set_defaults(func=command_convert)
+    
+    judge_parser = subparsers.add_parser("judge", parents=[common], help="用程序评测测试点")
+    judge_parser.add_argument("program", help="编译好的程序或Python脚本")
+    judge_parser.add_argument("sources", nargs="+", help="测试点文件、文件夹、JSON文件或压缩包")
+    judge_parser.add_argument("-t", "--time-limit", type=float, default=1.0, help="时间限制（秒），默认1")
+    judge_parser.add_argument("-m", "--memory-limit", type=int, default=256, help="内存限制（MB），默认256")
+    judge_parser.add_argument("-j", "--jobs", type=int, default=None, help="同时评测的测试点数量，默认为CPU核数")
+    judge_parser.add_argument("--mode", choices=COMPARE_MODES, default=LINE_MODE, help="比较输出的方式，默认逐行比较")
+    judge_parser.add_argument("--eps", type=float, default=1e-6, help="float方式允许的误差，默认1e-6")
+    judge_parser.set_defaults(func=command_judge)
+    
+    compare_parser = subparsers.add_parser("compare", help="比较输出文件与答案文件")
+    compare_parser.add_argument("output", help="程序的输出文件")
+    compare_parser.add_argument("answer", help="答案文件")
+    compare_parser.add_argument("--mode", choices=COMPARE_MODES, default=LINE_MODE,
+                                help="line：逐行比较（默认）；token：按单词比较；float：按单词比较并允许误差")
+    compare_parser.add_argument("--eps", type=float, default=1e-6, help="float方式允许的绝对或相对误差，默认1e-6")
+    compare_parser.set_defaults(func=command_compare)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
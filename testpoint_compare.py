@@ -0,0 +1,592 @@
+"""洛谷测试点查看器的输出比较功能，不依赖图形界面
+
+两个文件都按块从磁盘读取，比较大小达到几百MB的输出时内存占用也保持不变。支持三种比较方式：
+    line   洛谷默认的逐行比较，忽略每行末尾的空白字符和文件末尾的空行
+    token  按空白字符分隔成单词逐个比较，忽略空白字符的数量和种类
+    float  与token相同，但两个单词都是数字时允许eps以内的绝对或相对误差
+
+另外提供逐行差异对比：先把每行内容转换为哈希值，去掉相同的开头和结尾后，
+只在发生变化的区域上运行线性空间的Myers差异算法。
+"""
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from itertools import compress
+
+from testpoint_core import FileBuffer, FileContent, MappedDocument, read_content
+
+LINE_MODE = "line"
+TOKEN_MODE = "token"
+FLOAT_MODE = "float"
+COMPARE_MODES = (LINE_MODE, TOKEN_MODE, FLOAT_MODE)
+
+CHUNK_SIZE = 1024 * 1024  # 逐行比较时每次读取并规范化的字节数
+SNIPPET_LENGTH = 40  # 报告不同之处时最多显示的字节数
+WHITESPACE = b" \t\r\n\f\v"
+TRAILING_SPACE = re.compile(rb"(?<![ \t\r\f\v])[ \t\r\f\v]+\n")  # 只从一段空白字符的开头尝试，很长的空白不会导致平方级的回溯
+SPACE_RUN = re.compile(rb"[ \t\r\f\v]*")
+TOKEN = re.compile(rb"\S+")
+DIFF_MAX_COST = 1000  # 单个区域的编辑距离超过该值时不再细分，整体作为修改处理
+
+class CompareResult:
+    """比较结果，不同时记录第一个不同之处在输出文件中的行号、列号（从1开始，按字节计算）和单词序号"""
+    __slots__ = ("equal", "line", "column", "token", "expected", "actual")
+    
+    def __init__(self, equal, line=0, column=0, token=None, expected="", actual=""):
+        self.equal = equal
+        self.line = line
+        self.column = column
+        self.token = token  # 逐行比较时为None
+        self.expected = expected
+        self.actual = actual
+    
+    def __bool__(self):
+        return self.equal
+    
+    def describe(self):
+        """生成一句描述比较结果的文字"""
+        if self.equal:
+            return "输出与答案一致"
+        where = f"第{self.line}行第{self.column}列"
+        if self.token is not None:
+            where += f"（第{self.token}个单词）"
+        return f"{where}不同：期望 {self.expected!r}，实际 {self.actual!r}"
+    
+    def __repr__(self):
+        if self.equal:
+            return "CompareResult(equal=True)"
+        return f"CompareResult(line={self.line}, column={self.column}, token={self.token}, " \
+               f"expected={self.expected!r}, actual={self.actual!r})"
+
+@contextmanager
+def open_buffer(source):
+    """把比较的来源打开为(缓冲区, 起始偏移, 结束偏移)
+    
+    来源可以是文件路径、以二进制方式打开的文件、延迟加载的测试点内容或bytes；
+    普通文件打开为FileBuffer按需读取（不使用内存映射，扫描过程中文件被截断也不会导致崩溃），
+    需要解码的测试点内容（JSON字符串、压缩包成员）才读入内存。
+    """
+    if isinstance(source, (bytes, bytearray)):
+        yield source, 0, len(source)
+        return
+    if isinstance(source, FileContent) and not source.RAW:
+        data = read_content(source).encode('utf-8')
+        yield data, 0, len(data)
+        return
+    
+    start, length = 0, None
+    if isinstance(source, FileContent):
+        start, length = source.offset, source.length
+        source = source.path
+    with FileBuffer(source) as buffer:
+        size = os.fstat(source.fileno()).st_size if hasattr(source, 'fileno') else os.path.getsize(source)
+        start = min(start, size)
+        yield buffer, start, size if length is None else min(size, start + length)
+
+def snippet(buffer, pos, end):
+    """获取pos开始到行末的一小段文字，用于报告不同之处"""
+    stop = min(end, pos + SNIPPET_LENGTH)
+    newline = buffer.find(b'\n', pos, stop)
+    if newline >= 0:
+        stop = newline
+    text = bytes(buffer[pos:stop]).rstrip(b'\r').decode('utf-8', errors='replace')
+    if text:
+        return text
+    return "<行末>" if pos < end else "<文件结束>"
+
+def locate(buffer, start, pos):
+    """计算pos在文件中的行号和列号（从1开始），按块统计换行符，不一次读入整个文件"""
+    line = 1
+    line_start = start
+    for chunk_start in range(start, pos, CHUNK_SIZE):
+        chunk = buffer[chunk_start:min(pos, chunk_start + CHUNK_SIZE)]
+        count = chunk.count(b'\n')
+        if count:
+            line += count
+            line_start = chunk_start + chunk.rfind(b'\n') + 1
+    return line, pos - line_start + 1
+
+def iter_normalized_chunks(buffer, start, end):
+    """按块生成删除了行末空白字符的内容（包括文件最后一行），每块尽量在换行处结束，块的边界不会落在行末的空白字符中间"""
+    pos = start
+    while pos < end:
+        stop = min(end, pos + CHUNK_SIZE)
+        if stop < end:
+            newline = buffer.rfind(b'\n', pos, stop)
+            if newline >= 0:
+                stop = newline + 1
+            else:
+                # 一行比块还长：在空白字符之前截断，留给下一块与后面的换行一起处理
+                chunk = buffer[pos:stop]
+                stop = pos + len(chunk.rstrip(b" \t\r\f\v"))
+                if stop == pos:
+                    # 整块都是空白字符：位于行末时直接跳过，否则原样保留
+                    run_end = pos
+                    while run_end < end:
+                        part = buffer[run_end:min(end, run_end + CHUNK_SIZE)]
+                        if not part:
+                            run_end = end  # 文件在读取过程中被截断
+                            break
+                        length = SPACE_RUN.match(part).end()
+                        run_end += length
+                        if length < len(part):
+                            break
+                    if run_end == end or buffer[run_end:run_end + 1] == b'\n':
+                        pos = run_end
+                        continue
+                    stop = min(run_end, pos + CHUNK_SIZE)
+        chunk = TRAILING_SPACE.sub(b'\n', buffer[pos:stop])
+        yield chunk.rstrip(b" \t\r\f\v") if stop == end else chunk
+        pos = stop
+
+def extend_chunk(data, pos, chunks):
+    """pos之后不足一个片段且没有换行时从后面的块补足，使报告的片段与块的边界无关"""
+    while len(data) - pos < SNIPPET_LENGTH and data.find(b'\n', pos) < 0:
+        more = next(chunks, None)
+        if more is None:
+            break
+        data += more
+    return data
+
+def compare_lines(actual, expected):
+    """逐行比较两个(缓冲区, 起始偏移, 结束偏移)，忽略行末空白字符和文件末尾的空行"""
+    actual_chunks = iter_normalized_chunks(*actual)
+    expected_chunks = iter_normalized_chunks(*expected)
+    actual_data = expected_data = b''
+    line, column = 1, 1
+    
+    while True:
+        if not actual_data:
+            actual_data = next(actual_chunks, None)
+        if not expected_data:
+            expected_data = next(expected_chunks, None)
+        if actual_data is None or expected_data is None:
+            break
+        
+        length = min(len(actual_data), len(expected_data))
+        if actual_data[:length] == expected_data[:length]:
+            diff = length
+        else:
+            diff = len(os.path.commonprefix([actual_data[:length], expected_data[:length]]))
+        
+        # 更新已经相同的部分对应的行号和列号
+        count = actual_data.count(b'\n', 0, diff)
+        if count:
+            line += count
+            column = diff - actual_data.rfind(b'\n', 0, diff)
+        else:
+            column += diff
+        
+        if diff < length:
+            expected_data = extend_chunk(expected_data, diff, expected_chunks)
+            actual_data = extend_chunk(actual_data, diff, actual_chunks)
+            return CompareResult(False, line, column, None,
+                                 snippet(expected_data, diff, len(expected_data)),
+                                 snippet(actual_data, diff, len(actual_data)))
+        actual_data = actual_data[length:]
+        expected_data = expected_data[length:]
+    
+    # 其中一个文件已经结束，另一个文件剩下的部分只能是空白字符（末尾的空行）
+    rest_data, rest_chunks, actual_rest = ((actual_data, actual_chunks, True) if actual_data is not None
+                                           else (expected_data, expected_chunks, False))
+    while rest_data is not None:
+        stripped = rest_data.lstrip(WHITESPACE)
+        if stripped:
+            diff = len(rest_data) - len(stripped)
+            count = rest_data.count(b'\n', 0, diff)
+            if count:
+                line += count
+                column = diff - rest_data.rfind(b'\n', 0, diff)
+            else:
+                column += diff
+            stripped = extend_chunk(stripped, 0, rest_chunks)
+            text = snippet(stripped, 0, len(stripped))
+            return CompareResult(False, line, column, None,
+                                 "<文件结束>" if actual_rest else text,
+                                 text if actual_rest else "<文件结束>")
+        count = rest_data.count(b'\n')
+        if count:
+            line += count
+            column = len(rest_data) - rest_data.rfind(b'\n')
+        else:
+            column += len(rest_data)
+        rest_data = next(rest_chunks, None)
+    return CompareResult(True)
+
+def tokens_equal(actual, expected, eps):
+    """比较两个单词，eps不为None时数字允许eps以内的绝对或相对误差"""
+    if actual == expected:
+        return True
+    if eps is None:
+        return False
+    try:
+        actual_value = float(actual)
+        expected_value = float(expected)
+    except ValueError:
+        return False
+    if actual_value != actual_value or expected_value != expected_value:  # NaN
+        return actual_value != actual_value and expected_value != expected_value
+    return abs(actual_value - expected_value) <= eps * max(1.0, abs(expected_value))
+
+def iter_tokens(buffer, start, end):
+    """按块生成(起始偏移, 单词)，块在单词中间结束时把没有读完的单词留给下一块"""
+    pos = start
+    while pos < end:
+        stop = min(end, pos + CHUNK_SIZE)
+        chunk = buffer[pos:stop]
+        while stop < end and len(chunk) == stop - pos:
+            cut = max(chunk.rfind(space) for space in (b' ', b'\n', b'\t', b'\r', b'\f', b'\v'))
+            if cut >= 0:
+                chunk = chunk[:cut + 1]
+                break
+            # 一个单词比块还长：继续读取直到单词结束
+            stop = min(end, stop + CHUNK_SIZE)
+            chunk += buffer[pos + len(chunk):stop]
+        if not chunk:
+            return  # 文件在读取过程中被截断
+        for match in TOKEN.finditer(chunk):
+            yield pos + match.start(), match.group()
+        pos += len(chunk)
+
+def compare_tokens(actual, expected, eps=None):
+    """按单词比较两个(缓冲区, 起始偏移, 结束偏移)"""
+    actual_buffer, actual_start, actual_end = actual
+    actual_tokens = iter_tokens(*actual)
+    expected_tokens = iter_tokens(*expected)
+    index = 0
+    
+    while True:
+        actual_token = next(actual_tokens, None)
+        expected_token = next(expected_tokens, None)
+        if actual_token is None and expected_token is None:
+            return CompareResult(True)
+        index += 1
+        if actual_token is not None and expected_token is not None \
+                and tokens_equal(actual_token[1], expected_token[1], eps):
+            continue
+        
+        pos = actual_token[0] if actual_token is not None else actual_end
+        line, column = locate(actual_buffer, actual_start, pos)
+        return CompareResult(False, line, column, index,
+                             expected_token[1].decode('utf-8', errors='replace')[:SNIPPET_LENGTH]
+                             if expected_token is not None else "<文件结束>",
+                             actual_token[1].decode('utf-8', errors='replace')[:SNIPPET_LENGTH]
+                             if actual_token is not None else "<文件结束>")
+
+def compare_outputs(actual, expected, mode=LINE_MODE, eps=1e-6):
+    """比较程序输出actual与答案expected，返回CompareResult（相同时为真）
+    
+    actual和expected可以是文件路径、以二进制方式打开的文件、延迟加载的测试点内容或bytes；
+    eps只在float模式下使用。
+    """
+    if mode not in COMPARE_MODES:
+        raise ValueError(f"未知的比较方式: {mode}")
+    with open_buffer(actual) as actual_range, open_buffer(expected) as expected_range:
+        if mode == LINE_MODE:
+            return compare_lines(actual_range, expected_range)
+        return compare_tokens(actual_range, expected_range, eps if mode == FLOAT_MODE else None)
+
+def hash_lines(buffer, start, end):
+    """计算每一行（忽略行末空白字符）的哈希值，行的划分与MappedDocument一致"""
+    hashes = array('q')
+    pos = start
+    while True:
+        stop = min(end, pos + CHUNK_SIZE)
+        if stop < end:
+            newline = buffer.rfind(b'\n', pos, stop)
+            if newline < 0:
+                newline = buffer.find(b'\n', stop, end)  # 一行比块还长时整行读取
+            stop = end if newline < 0 else newline + 1
+        chunk = TRAILING_SPACE.sub(b'\n', buffer[pos:stop])
+        if stop < end:
+            lines = chunk.split(b'\n')
+            lines.pop()  # 块在换行处结束，最后的空字符串不是一行
+        else:
+            lines = chunk.rstrip(b" \t\r\f\v").split(b'\n')
+        hashes.extend(map(hash, lines))
+        if stop >= end:
+            return hashes
+        pos = stop
+
+def common_prefix(a, b, i, j, limit):
+    """a[i:]和b[j:]相同开头的长度（不超过limit），先逐个比较，再按倍增的块长批量比较"""
+    length = 0
+    size = 1
+    while length < limit:
+        step = min(size, limit - length)
+        if a[i + length:i + length + step] == b[j + length:j + length + step]:
+            length += step
+            size *= 2
+        elif step == 1:
+            break
+        else:
+            size = 1
+    return length
+
+def common_suffix(a, b, i_end, j_end, limit):
+    """a[:i_end]和b[:j_end]相同结尾的长度（不超过limit）"""
+    length = 0
+    size = 1
+    while length < limit:
+        step = min(size, limit - length)
+        if a[i_end - length - step:i_end - length] == b[j_end - length - step:j_end - length]:
+            length += step
+            size *= 2
+        elif step == 1:
+            break
+        else:
+            size = 1
+    return length
+
+def middle_snake(a, b, a_start, a_end, b_start, b_end, max_cost):
+    """从两端同时搜索，找到最短编辑路径的中间点(x, y)；编辑距离超过2 * max_cost时返回None"""
+    n = a_end - a_start
+    m = b_end - b_start
+    max_d = min((n + m + 1) // 2, max_cost)
+    offset = max_d + 1
+    v_length = 2 * offset + 1
+    v1 = [-1] * v_length
+    v2 = [-1] * v_length
+    v1[offset + 1] = 0
+    v2[offset + 1] = 0
+    delta = n - m
+    front = delta % 2 != 0  # 总长度为奇数时在正向搜索中检测重叠
+    k1_start = k1_end = k2_start = k2_end = 0
+    
+    for d in range(max_d + 1):
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            if x1 < n and y1 < m:
+                x1 += common_prefix(a, b, a_start + x1, b_start + y1, min(n - x1, m - y1))
+                y1 = x1 - k1
+            v1[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < v_length and v2[k2_offset] != -1 and x1 >= n - v2[k2_offset]:
+                    return x1, y1
+        
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            if x2 < n and y2 < m:
+                x2 += common_suffix(a, b, a_end - x2, b_end - y2, min(n - x2, m - y2))
+                y2 = x2 - k2
+            v2[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < v_length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    if x1 >= n - x2:
+                        return x1, x1 - (k1_offset - offset)
+    return None
+
+def find_matches(a, b, a_start, a_end, b_start, b_end, max_cost, blocks):
+    """递归查找相同的行，按顺序把相同的块(i, j, 长度)追加到blocks"""
+    prefix = common_prefix(a, b, a_start, b_start, min(a_end - a_start, b_end - b_start))
+    if prefix:
+        blocks.append((a_start, b_start, prefix))
+        a_start += prefix
+        b_start += prefix
+    suffix = common_suffix(a, b, a_end, b_end, min(a_end - a_start, b_end - b_start))
+    a_end -= suffix
+    b_end -= suffix
+    
+    if a_start < a_end and b_start < b_end:
+        split = middle_snake(a, b, a_start, a_end, b_start, b_end, max_cost)
+        if split is not None:
+            x, y = split
+            find_matches(a, b, a_start, a_start + x, b_start, b_start + y, max_cost, blocks)
+            find_matches(a, b, a_start + x, a_end, b_start + y, b_end, max_cost, blocks)
+    if suffix:
+        blocks.append((a_end, b_end, suffix))
+
+def diff_hashes(a, b, max_cost=DIFF_MAX_COST):
+    """比较两个行哈希序列，返回与difflib相同格式的操作列表[(tag, i1, i2, j1, j2), ...]
+    
+    tag为equal、replace、delete或insert；编辑距离过大的区域不再细分，整体作为replace。
+    """
+    n = len(a)
+    m = len(b)
+    prefix = common_prefix(a, b, 0, 0, min(n, m))
+    suffix = common_suffix(a, b, n, m, min(n, m) - prefix)
+    
+    # 在另一侧从未出现的行不可能相同，先去掉这些行，只在剩下的行上运行差异算法
+    a_middle = a[prefix:n - suffix]
+    b_middle = b[prefix:m - suffix]
+    a_mask = list(map(set(b_middle).__contains__, a_middle))
+    b_mask = list(map(set(a_middle).__contains__, b_middle))
+    a_index = array('q', compress(range(prefix, n - suffix), a_mask))
+    b_index = array('q', compress(range(prefix, m - suffix), b_mask))
+    a_kept = array('q', compress(a_middle, a_mask))
+    b_kept = array('q', compress(b_middle, b_mask))
+    kept_blocks = []
+    find_matches(a_kept, b_kept, 0, len(a_kept), 0, len(b_kept), max_cost, kept_blocks)
+    
+    # 把相同的块换算回原来的行号，被去掉的行可能把一个块分成几段
+    blocks = [(0, 0, prefix)]
+    for i, j, size in kept_blocks:
+        while size:
+            # 二分查找两侧原来的行号都连续的最长一段
+            low, high = 1, size
+            while low < high:
+                middle = (low + high + 1) // 2
+                if a_index[i + middle - 1] - a_index[i] == middle - 1 and b_index[j + middle - 1] - b_index[j] == middle - 1:
+                    low = middle
+                else:
+                    high = middle - 1
+            i1, j1 = a_index[i], b_index[j]
+            last_i, last_j, last_size = blocks[-1]
+            if last_i + last_size == i1 and last_j + last_size == j1:
+                blocks[-1] = (last_i, last_j, last_size + low)
+            else:
+                blocks.append((i1, j1, low))
+            i += low
+            j += low
+            size -= low
+    blocks.append((n - suffix, m - suffix, suffix))
+    
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in blocks:
+        if i < block_i and j < block_j:
+            opcodes.append(('replace', i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(('delete', i, block_i, j, block_j))
+        elif j < block_j:
+            opcodes.append(('insert', i, block_i, j, block_j))
+        if size:
+            if opcodes and opcodes[-1][0] == 'equal':
+                opcodes[-1] = ('equal', opcodes[-1][1], block_i + size, opcodes[-1][3], block_j + size)
+            else:
+                opcodes.append(('equal', block_i, block_i + size, block_j, block_j + size))
+        i = block_i + size
+        j = block_j + size
+    return opcodes
+
+class DiffSide:
+    """差异对比中一侧的对齐视图，提供与MappedDocument相同的按行读取接口
+    
+    对齐后的每一行称为一个"行位置"：两侧行数不同的修改区域用空行补齐，使两侧的行位置一一对应。
+    """
+    
+    def __init__(self, document, opcodes, row_starts, left):
+        self.document = document
+        self.opcodes = opcodes
+        self.row_starts = row_starts
+        self.left = left
+        self.line_count = row_starts[-1]
+    
+    def _segments(self, first, last):
+        """按操作分段生成[first, last)范围内的(tag, 起始行位置, 结束行位置, 本侧起始行, 本侧行数)"""
+        index = max(0, bisect_right(self.row_starts, first) - 1)
+        while index < len(self.opcodes) and self.row_starts[index] < last:
+            tag, i1, i2, j1, j2 = self.opcodes[index]
+            row = self.row_starts[index]
+            line_start, line_count = (i1, i2 - i1) if self.left else (j1, j2 - j1)
+            yield tag, max(first, row), min(last, self.row_starts[index + 1]), line_start + max(0, first - row), \
+                max(0, min(line_count, last - row) - max(0, first - row))
+            index += 1
+    
+    def get_lines(self, first, last, max_line_bytes=20000):
+        """获取[first, last)行位置的文本，补齐用的行为空行"""
+        parts = []
+        for _, row_start, row_end, line, count in self._segments(first, last):
+            if count:
+                parts.append(self.document.get_lines(line, line + count, max_line_bytes))
+            if row_end - row_start > count:
+                parts.append('\n' * (row_end - row_start - count - 1))
+        return '\n'.join(parts)
+    
+    def line_tags(self, first, last):
+        """生成[first, last)范围内需要高亮的(标签, 起始行位置, 结束行位置)，标签为changed、removed、added或filler"""
+        for tag, row_start, row_end, _, count in self._segments(first, last):
+            if tag == 'equal':
+                continue
+            if count:
+                if tag == 'replace':
+                    name = 'changed'
+                else:
+                    name = 'removed' if self.left else 'added'
+                yield name, row_start, row_start + count
+            if row_end - row_start > count:
+                yield 'filler', row_start + count, row_end
+    
+    def source_line(self, row):
+        """行位置对应的本侧行号（从0开始），补齐用的行返回None"""
+        for _, row_start, _, line, count in self._segments(row, row + 1):
+            return line if count else None
+        return None
+    
+    def get_text(self):
+        return self.document.get_text()
+    
+    def memory_size(self):
+        return self.document.memory_size()
+    
+    def close(self):
+        self.document.close()
+
+class DiffDocument:
+    """两个测试点内容的逐行差异，left和right是两侧对齐后的视图"""
+    
+    def __init__(self, left_source, right_source, max_cost=DIFF_MAX_COST):
+        left_document = MappedDocument(left_source)
+        try:
+            right_document = MappedDocument(right_source)
+        except Exception:
+            left_document.close()
+            raise
+        try:
+            left_hashes = hash_lines(left_document.buffer, left_document.start, left_document.end)
+            right_hashes = hash_lines(right_document.buffer, right_document.start, right_document.end)
+        finally:
+            # 文件只在读取时打开
+            left_document.close()
+            right_document.close()
+        self.opcodes = diff_hashes(left_hashes, right_hashes, max_cost)
+        
+        # 每个操作占用的行位置数为两侧行数的较大值
+        self.row_starts = array('q', [0])
+        for _, i1, i2, j1, j2 in self.opcodes:
+            self.row_starts.append(self.row_starts[-1] + max(i2 - i1, j2 - j1))
+        self.changes = [self.row_starts[index] for index, opcode in enumerate(self.opcodes) if opcode[0] != 'equal']
+        self.left = DiffSide(left_document, self.opcodes, self.row_starts, True)
+        self.right = DiffSide(right_document, self.opcodes, self.row_starts, False)
+    
+    def next_change(self, row):
+        """row之后第一处差异的行位置，没有时返回None"""
+        index = bisect_right(self.changes, row)
+        return self.changes[index] if index < len(self.changes) else None
+    
+    def previous_change(self, row):
+        """row之前最后一处差异的行位置，没有时返回None"""
+        index = bisect_right(self.changes, row - 1) - 1
+        return self.changes[index] if index >= 0 else None
+    
+    def change_index(self, row):
+        """行位置为row的差异是第几处（从0开始），row不是差异的开头时返回None"""
+        index = bisect_left(self.changes, row)
+        return index if index < len(self.changes) and self.changes[index] == row else None
+    
+    def close(self):
+        self.left.close()
+        self.right.close()
@@ -0,0 +1,1708 @@
+"""洛谷测试点查看器的核心功能，不依赖图形界面
+
+包括测试点来源的解析与配对、JSON流式解析与导出、解析缓存、内容池和文件监视，
+可以在没有显示器的环境（例如CI脚本和批处理任务）中使用。
+"""
+import os
+import sys
+import json
+import re
+import posixpath
+import time
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import nullcontext
+
+# 压缩、数据库等较重的模块在用到时才导入，保持命令行工具的启动速度
+
+RECURSIVE_MARKER = "**"  # 保存在testpoints.json中的文件夹路径以此结尾时表示包含子文件夹
+MISSING_INPUT = '未找到对应的输入文件'  # 只有输出文件的测试点用这段文字作为输入
+MISSING_OUTPUT = '未找到对应的输出文件'  # 只有输入文件的测试点用这段文字作为输出
+
+def make_source_spec(path, recursive=False):
+    """生成保存在testpoints.json中的测试点来源：文件、文件夹或包含子文件夹的文件夹"""
+    return os.path.join(path, RECURSIVE_MARKER) if recursive else path
+
+def split_source_spec(spec):
+    """解析测试点来源，返回(实际路径, 是否包含子文件夹)"""
+    if os.path.basename(spec) == RECURSIVE_MARKER:
+        return os.path.dirname(spec), True
+    return spec, False
+
+def stable_dir_hash(dir_path):
+    """生成目录的稳定标识：规范化后的绝对路径的BLAKE2哈希（16位十六进制）
+    
+    与内置hash()不同，每次运行结果都相同，可以作为测试点名称的一部分用于缓存和会话恢复。
+    """
+    import hashlib
+    normalized = os.path.normcase(os.path.abspath(dir_path))
+    return hashlib.blake2b(normalized.encode('utf-8', errors='surrogatepass'), digest_size=8).hexdigest()
+
+def source_exists(spec):
+    """检查测试点来源是否存在"""
+    return os.path.exists(split_source_spec(spec)[0])
+
+def source_dedupe_key(spec):
+    """获取用于去重的来源标识：文件按基本文件名（不含扩展名），文件夹和压缩包按完整路径"""
+    path, recursive = split_source_spec(spec)
+    if recursive or os.path.isdir(path) or is_archive_source(path):
+        return os.path.normcase(os.path.abspath(spec))
+    return os.path.splitext(os.path.basename(path))[0]
+
+def is_json_source(path):
+    """判断是否为JSON测试点文件（包括gzip、xz压缩的JSON）"""
+    return path.lower().endswith(('.json', '.json.gz', '.json.xz'))
+
+def open_json_file(path):
+    """以二进制方式打开JSON测试点文件，压缩文件透明解压"""
+    import gzip
+    import lzma
+    lower_path = path.lower()
+    if lower_path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if lower_path.endswith('.xz'):
+        return lzma.open(path, 'rb')
+    return open(path, 'rb')
+
+def is_archive_source(path):
+    """判断是否为压缩包形式的测试数据（zip、tar及其gzip、xz、bzip2压缩格式）"""
+    return path.lower().endswith(('.zip', '.tar', '.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tbz2'))
+
+def open_tar_stream(path):
+    """以二进制方式打开tar包，压缩的tar包透明解压"""
+    import bz2
+    import gzip
+    import lzma
+    lower_path = path.lower()
+    if lower_path.endswith(('.gz', '.tgz')):
+        return gzip.open(path, 'rb')
+    if lower_path.endswith(('.xz', '.txz')):
+        return lzma.open(path, 'rb')
+    if lower_path.endswith(('.bz2', '.tbz2')):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+def decode_text(data):
+    """把字节内容解码为文本，换行符处理与文本模式打开文件一致"""
+    text = data.decode('utf-8', errors='ignore')
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+def format_size(size):
+    """把字节数格式化为便于阅读的形式"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def process_rss():
+    """当前进程占用的物理内存（字节），无法获取时返回None"""
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+        
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+        
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        kernel32.K32GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+        if kernel32.K32GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        # Linux：第二项是驻留内存的页数
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def list_archive_members(archive_path):
+    """列出压缩包中的全部普通文件，返回[(成员名, 解压后的数据偏移, 大小)]，不解压文件内容"""
+    import tarfile
+    import zipfile
+    if archive_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as archive:
+            return [(info.filename, 0, info.file_size) for info in archive.infolist() if not info.is_dir()]
+    with tarfile.open(archive_path, 'r:*') as archive:
+        return [(info.name, info.offset_data, info.size) for info in archive if info.isfile()]
+
+def read_archive_members(archive_path, members):
+    """按压缩包中的存放顺序一次读取指定成员的文本内容，返回{成员名: 内容}"""
+    import tarfile
+    import zipfile
+    wanted = set(members)
+    contents = {}
+    if archive_path.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_path) as archive:
+            for name in wanted:
+                contents[name] = decode_text(archive.read(name))
+        return contents
+    with tarfile.open(archive_path, 'r:*') as archive:
+        for info in archive:
+            if info.isfile() and info.name in wanted:
+                contents[info.name] = decode_text(archive.extractfile(info).read())
+    return contents
+
+class FileContent:
+    """延迟加载的测试点内容，只记录来源文件路径、大小和修改时间，需要显示时才从磁盘读取"""
+    __slots__ = ("path", "size", "mtime_ns", "offset", "length")
+    FIELDS = __slots__  # 保存到缓存中的字段，子类在此基础上扩展
+    KIND = "file"
+    RAW = True  # 字节内容就是文本本身，可以直接按偏移从文件读取显示
+    
+    def __init__(self, path, offset=0, length=None, stat=None):
+        if stat is None:
+            stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.offset = offset
+        self.length = length  # None表示一直读到文件末尾
+    
+    def _open(self):
+        return open(self.path, 'rb')
+    
+    def read_bytes(self):
+        """读取原始字节内容"""
+        with self._open() as f:
+            if self.offset:
+                f.seek(self.offset)
+            if self.length is None:
+                return f.read()
+            return f.read(self.length)
+    
+    def iter_bytes(self, chunk_size=1024 * 1024):
+        """分块读取原始字节内容"""
+        with self._open() as f:
+            if self.offset:
+                f.seek(self.offset)
+            remaining = self.length
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+    
+    def read(self):
+        """读取并解码内容，换行符处理与文本模式打开文件一致"""
+        return decode_text(self.read_bytes())
+    
+    def to_dict(self):
+        """转换为可以保存到缓存中的字典"""
+        data = {"kind": self.KIND}
+        for name in self.FIELDS:
+            data[name] = getattr(self, name)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        """从缓存的字典恢复，不访问文件"""
+        for content_class in (JsonStringContent, ArchiveMemberContent):
+            if data.get("kind") == content_class.KIND:
+                cls = content_class
+        content = cls.__new__(cls)
+        for name in cls.FIELDS:
+            setattr(content, name, data[name])
+        return content
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.path!r}, size={self.size})"
+
+class JsonStringContent(FileContent):
+    """JSON文件中某个字符串值的延迟引用，offset和length是字符串字面量（含引号）的字节范围"""
+    __slots__ = ()
+    KIND = "json"
+    RAW = False  # 需要先按JSON字符串解码
+    
+    def _open(self):
+        # 压缩文件中的偏移是解压后的偏移，定位时需要从头解压
+        return open_json_file(self.path)
+    
+    def read(self):
+        """读取字符串字面量并按JSON解码"""
+        return json.loads(self.read_bytes())
+
+class ArchiveMemberContent(FileContent):
+    """压缩包中某个成员文件的延迟引用，size和mtime_ns记录的是压缩包本身的信息
+    
+    zip包按成员名打开；tar包的offset和length是成员数据在解压后的数据流中的位置。
+    """
+    __slots__ = ("member",)
+    FIELDS = FileContent.FIELDS + __slots__
+    KIND = "archive"
+    RAW = False  # 需要先解压，不能直接按偏移读取
+    
+    def __init__(self, path, member, offset=0, length=None, stat=None):
+        super().__init__(path, offset, length, stat)
+        self.member = member
+    
+    def _open(self):
+        import zipfile
+        if self.path.lower().endswith('.zip'):
+            # 关闭ZipFile后，已经打开的成员文件仍然可以继续读取
+            with zipfile.ZipFile(self.path) as archive:
+                return archive.open(self.member)
+        # 压缩的tar包定位时需要从头解压
+        return open_tar_stream(self.path)
+
+def read_content(value):
+    """获取测试点内容的文本，延迟加载的内容在此时才读取"""
+    if isinstance(value, FileContent):
+        return value.read()
+    return value
+
+class JsonEventReader:
+    """增量读取JSON文件的事件流，按块读取文件，内存占用与文件大小无关
+    
+    产生的事件为(类型, 值)：start_map、end_map、start_array、end_array、key、string、scalar。
+    string事件的值为(字节偏移, 字节长度, 解码后的值)，字符串超过decode_limit字节时解码值为None，
+    decode_limit为None时总是解码。
+    """
+    CHUNK_SIZE = 1024 * 1024
+    SCALAR_PATTERN = re.compile(rb'[^\s,:\[\]{}"]+')
+    
+    def __init__(self, f, decode_limit=4096):
+        self.f = f
+        self.decode_limit = decode_limit
+        self.buf = b''
+        self.base = 0  # buf[0]在文件中的字节偏移
+        self.pos = 0
+        self.eof = False
+    
+    def _more(self, drop):
+        """丢弃buf中drop之前的内容并读入下一块，文件结束时返回False"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[drop:] + chunk
+        self.base += drop
+        self.pos -= drop
+        return True
+    
+    def _peek(self):
+        """跳过空白，返回下一个字符（整数），文件结束时返回None"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in b' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more(self.pos):
+                return None
+    
+    def _read_string(self, decode_limit):
+        """读取从当前位置开始的字符串字面量，长字符串只扫描不保留"""
+        start = self.pos  # 开始引号在buf中的位置
+        start_offset = self.base + start
+        keep = True  # 是否仍保留完整的字面量用于解码
+        scan = start + 1
+        while True:
+            end = self.buf.find(b'"', scan)
+            if end < 0:
+                if keep and decode_limit is not None and len(self.buf) - start > decode_limit:
+                    keep = False
+                # 末尾连续的反斜杠需要保留，用于判断下一块开头的引号是否被转义
+                tail = len(self.buf)
+                while tail > max(start + 1, 0) and self.buf[tail - 1] == 0x5C:
+                    tail -= 1
+                drop = start if keep else tail
+                scan = len(self.buf) - drop
+                start -= drop
+                if not self._more(drop):
+                    raise ValueError(f"JSON字符串在偏移 {start_offset} 处未结束")
+                continue
+            backslashes = 0
+            index = end - 1
+            while index >= max(start + 1, 0) and self.buf[index] == 0x5C:
+                backslashes += 1
+                index -= 1
+            if backslashes % 2:
+                scan = end + 1
+                continue
+            length = self.base + end + 1 - start_offset
+            value = None
+            if keep and (decode_limit is None or length <= decode_limit):
+                value = json.loads(self.buf[start:end + 1])
+            self.pos = end + 1
+            return start_offset, length, value
+    
+    def _read_scalar(self):
+        """读取数字、true、false或null"""
+        while True:
+            match = self.SCALAR_PATTERN.match(self.buf, self.pos)
+            if match is None:
+                raise ValueError(f"JSON格式错误，偏移 {self.base + self.pos}")
+            if match.end() < len(self.buf) or not self._more(self.pos):
+                self.pos = match.end()
+                return json.loads(match.group())
+    
+    def events(self):
+        """逐个产生JSON事件"""
+        stack = []
+        expect_key = False
+        while True:
+            c = self._peek()
+            if c is None:
+                if stack:
+                    raise ValueError("JSON文件意外结束")
+                return
+            if c == 0x7B:  # {
+                self.pos += 1
+                stack.append(c)
+                expect_key = True
+                yield 'start_map', None
+            elif c == 0x7D:  # }
+                self.pos += 1
+                stack.pop()
+                expect_key = False
+                yield 'end_map', None
+            elif c == 0x5B:  # [
+                self.pos += 1
+                stack.append(c)
+                yield 'start_array', None
+            elif c == 0x5D:  # ]
+                self.pos += 1
+                stack.pop()
+                yield 'end_array', None
+            elif c == 0x2C:  # ,
+                self.pos += 1
+                expect_key = bool(stack) and stack[-1] == 0x7B
+            elif c == 0x3A:  # :
+                self.pos += 1
+            elif c == 0x22:  # "
+                if expect_key:
+                    expect_key = False
+                    yield 'key', self._read_string(None)[2]
+                else:
+                    yield 'string', self._read_string(self.decode_limit)
+            else:
+                yield 'scalar', self._read_scalar()
+
+def iter_json_testpoints(file_path, decode_limit=4096):
+    """流式解析JSON测试点文件，逐个产生(测试点名称, 输入, 输出)
+    
+    支持洛谷testCases格式、以测试点名称为键的字典格式和列表格式。
+    超过decode_limit字节的字符串不解码，以JsonStringContent记录其在文件中的位置。
+    """
+    base_name = os.path.basename(file_path)
+    stat = os.stat(file_path)
+    
+    with open_json_file(file_path) as f:
+        events = JsonEventReader(f, decode_limit).events()
+        
+        def read_value(event, value):
+            """把一个JSON值转换为测试点内容，嵌套的对象或数组会被跳过"""
+            if event == 'string':
+                offset, length, text = value
+                if text is None:
+                    return JsonStringContent(file_path, offset, length, stat=stat)
+                return text if isinstance(text, str) else str(text)
+            if event == 'scalar':
+                return '' if value is None else str(value)
+            depth = 1
+            for event, value in events:
+                if event in ('start_map', 'start_array'):
+                    depth += 1
+                elif event in ('end_map', 'end_array'):
+                    depth -= 1
+                    if depth == 0:
+                        break
+            return ''
+        
+        def read_testcase():
+            """读取一个测试点对象的字段（已读过start_map）"""
+            fields = {}
+            for event, value in events:
+                if event == 'end_map':
+                    break
+                key = value
+                fields[key] = read_value(*next(events))
+            return fields
+        
+        event, value = next(events, (None, None))
+        if event == 'start_map':
+            # 字典格式：有testCases时为洛谷格式，否则键是测试点名称
+            candidates = []
+            has_test_cases = False
+            for event, key in events:
+                if event == 'end_map':
+                    break
+                event, value = next(events)
+                if key == 'testCases' and event == 'start_array':
+                    has_test_cases = True
+                    index = 0
+                    for event, value in events:
+                        if event == 'end_array':
+                            break
+                        index += 1
+                        if event == 'start_map':
+                            test_case = read_testcase()
+                            # 使用文件名作为前缀，避免与其他文件的测试点冲突
+                            yield f"{base_name}_测试点_{index}", test_case.get('input', ''), test_case.get('output', '')
+                        else:
+                            read_value(event, value)
+                elif event == 'start_map':
+                    content = read_testcase()
+                    if not has_test_cases:
+                        candidates.append((f"{base_name}_{key}", content.get('input', ''), content.get('output', '')))
+                else:
+                    read_value(event, value)
+            if not has_test_cases:
+                yield from candidates
+        elif event == 'start_array':
+            # 列表格式
+            index = 0
+            for event, value in events:
+                if event == 'end_array':
+                    break
+                index += 1
+                if event == 'start_map':
+                    item = read_testcase()
+                    item_name = read_content(item.get('name', f"测试点_{index}"))
+                    yield f"{base_name}_{item_name}", item.get('input', ''), item.get('output', '')
+                else:
+                    read_value(event, value)
+
+def write_json_string(out, value):
+    """把测试点内容作为JSON字符串写入二进制文件对象，文件内容分块转义，不会整体读入内存"""
+    import codecs
+    if isinstance(value, JsonStringContent):
+        # 来源本身就是JSON字符串字面量，直接复制
+        for chunk in value.iter_bytes():
+            out.write(chunk)
+        return
+    if not isinstance(value, FileContent):
+        out.write(json.dumps(read_content(value), ensure_ascii=False).encode('utf-8'))
+        return
+    
+    # 增量解码并转义，换行符处理与read()一致；块末尾的\r留到下一块，以便识别跨块的\r\n
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    pending = ''
+    out.write(b'"')
+    chunks = value.iter_bytes()
+    while True:
+        chunk = next(chunks, None)
+        text = pending + decoder.decode(chunk if chunk is not None else b'', final=chunk is None)
+        pending = ''
+        if chunk is not None and text.endswith('\r'):
+            pending = '\r'
+            text = text[:-1]
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        out.write(json.dumps(text, ensure_ascii=False)[1:-1].encode('utf-8'))
+        if chunk is None:
+            break
+    out.write(b'"')
+
+def write_testpoints_json(items, file_path, compact=False, progress_callback=None, cancel_event=None):
+    """逐个测试点流式导出为JSON（以测试点名称为键的字典格式），可以被load_json_testpoints重新加载
+    
+    items为(名称, 测试点数据)的列表；文件名以.gz或.xz结尾时进行压缩。
+    先写入临时文件，完成后再替换目标文件；被取消时删除临时文件并返回False。
+    """
+    import gzip
+    import lzma
+    temp_path = file_path + ".part"
+    lower_path = file_path.lower()
+    if lower_path.endswith('.gz'):
+        out = gzip.open(temp_path, 'wb')
+    elif lower_path.endswith('.xz'):
+        out = lzma.open(temp_path, 'wb')
+    else:
+        out = open(temp_path, 'wb')
+    
+    try:
+        with out:
+            out.write(b'{')
+            for index, (name, data) in enumerate(items):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                separator = b',' if index else b''
+                key = json.dumps(name, ensure_ascii=False).encode('utf-8')
+                if compact:
+                    out.write(separator + key + b':{"input":')
+                    write_json_string(out, data['input'])
+                    out.write(b',"output":')
+                    write_json_string(out, data['output'])
+                    out.write(b'}')
+                else:
+                    # 与json.dump(..., indent=2)的格式一致
+                    out.write(separator + b'\n  ' + key + b': {\n    "input": ')
+                    write_json_string(out, data['input'])
+                    out.write(b',\n    "output": ')
+                    write_json_string(out, data['output'])
+                    out.write(b'\n  }')
+                if progress_callback is not None:
+                    progress_callback(index + 1)
+            out.write(b'\n}' if items and not compact else b'}')
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    
+    if cancel_event is not None and cancel_event.is_set():
+        os.remove(temp_path)
+        return False
+    os.replace(temp_path, file_path)
+    return True
+
+class ParseCache:
+    """测试点解析结果的磁盘缓存（SQLite）
+    
+    按源文件保存测试点名称、输入输出配对和文件信息，以(路径, 大小, 修改时间)判断是否失效，
+    总大小超过上限时按最近最少使用的顺序淘汰。
+    """
+    SCHEMA_VERSION = 2  # 版本变化时丢弃旧的缓存；2：测试点名称改用稳定的目录哈希
+    MAX_STATS = 100000  # 最多保存的测试点统计结果数量
+    
+    def __init__(self, db_path, max_bytes=64 * 1024 * 1024):
+        import sqlite3
+        self.db_path = str(db_path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()  # 工作线程共用同一个连接
+        try:
+            self._conn = self._connect()
+        except sqlite3.DatabaseError:
+            # 缓存文件损坏时直接重建
+            os.remove(self.db_path)
+            self._conn = self._connect()
+    
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS parse_cache")
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        conn.execute("""CREATE TABLE IF NOT EXISTS parse_cache (
+                            path TEXT PRIMARY KEY,
+                            size INTEGER NOT NULL,
+                            mtime_ns INTEGER NOT NULL,
+                            deps TEXT NOT NULL,
+                            payload TEXT NOT NULL,
+                            payload_size INTEGER NOT NULL,
+                            last_used REAL NOT NULL)""")
+        # 测试点内容的统计结果，键中包含文件的大小和修改时间，文件变化后自然失效
+        conn.execute("""CREATE TABLE IF NOT EXISTS content_stats (
+                            key TEXT PRIMARY KEY,
+                            payload TEXT NOT NULL,
+                            last_used REAL NOT NULL)""")
+        conn.commit()
+        return conn
+    
+    @staticmethod
+    def _stat_key(path):
+        """获取用于判断缓存是否失效的(大小, 修改时间)，文件不存在时返回None"""
+        try:
+            stat = os.stat(split_source_spec(path)[0])
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def get(self, path):
+        """获取文件的解析结果，缓存不存在或已失效时返回None"""
+        import sqlite3
+        stat_key = self._stat_key(path)
+        if stat_key is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, deps, payload FROM parse_cache WHERE path = ?", (path,)).fetchone()
+                if row is None:
+                    return None
+                # 源文件及其相关文件、所在目录有任何变化都视为失效
+                valid = [row[0], row[1]] == stat_key
+                for dep_path, dep_key in json.loads(row[2]) if valid else []:
+                    current = self._stat_key(dep_path)
+                    if current is None or (dep_key[0] is not None and current[0] != dep_key[0]) or current[1] != dep_key[1]:
+                        valid = False
+                        break
+                if not valid:
+                    self._conn.execute("DELETE FROM parse_cache WHERE path = ?", (path,))
+                    self._conn.commit()
+                    return None
+                self._conn.execute("UPDATE parse_cache SET last_used = ? WHERE path = ?", (time.time(), path))
+                self._conn.commit()
+                payload = row[3]
+        except sqlite3.Error:
+            return None
+        
+        testpoints = {}
+        for name, data in json.loads(payload).items():
+            testpoints[name] = {field: FileContent.from_dict(value) if isinstance(value, dict) else value
+                                for field, value in data.items()}
+        return testpoints
+    
+    def put(self, path, testpoints):
+        """保存文件的解析结果，单条结果过大时不缓存"""
+        import sqlite3
+        stat_key = self._stat_key(path)
+        if stat_key is None:
+            return
+        
+        # 记录所有引用到的文件及其所在目录（目录修改时间在增删文件时变化）
+        source_path = split_source_spec(path)[0]
+        deps = {source_path if os.path.isdir(source_path) else os.path.dirname(os.path.abspath(source_path)): None}
+        serialized = {}
+        for name, data in testpoints.items():
+            entry = {}
+            for field, value in data.items():
+                if isinstance(value, FileContent):
+                    deps[value.path] = [value.size, value.mtime_ns]
+                    deps.setdefault(os.path.dirname(value.path), None)
+                    entry[field] = value.to_dict()
+                else:
+                    entry[field] = value
+            serialized[name] = entry
+        dep_list = []
+        for dep_path, dep_key in deps.items():
+            if dep_key is None:
+                current = self._stat_key(dep_path)
+                if current is None:
+                    continue
+                dep_key = [None, current[1]]  # 目录大小在不同文件系统上不可靠，只比较修改时间
+            dep_list.append([dep_path, dep_key])
+        
+        payload = json.dumps(serialized, ensure_ascii=False)
+        payload_size = len(payload.encode('utf-8'))
+        if payload_size > self.max_bytes // 8:
+            return
+        
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO parse_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, stat_key[0], stat_key[1], json.dumps(dep_list, ensure_ascii=False),
+                     payload, payload_size, time.time()))
+                self._evict()
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+    
+    def get_stats(self, key):
+        """获取测试点内容的统计结果（字典），没有缓存时返回None"""
+        import sqlite3
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT payload FROM content_stats WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE content_stats SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0])
+    
+    def put_stats(self, key, stats):
+        """保存测试点内容的统计结果，数量超过上限时淘汰最久未使用的条目"""
+        import sqlite3
+        # 整数的和可能超过SQLite能保存的范围，因此和测试点一样序列化为JSON
+        payload = json.dumps(stats)
+        try:
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO content_stats VALUES (?, ?, ?)", (key, payload, time.time()))
+                self._conn.execute("""DELETE FROM content_stats WHERE key IN (
+                                          SELECT key FROM content_stats ORDER BY last_used DESC LIMIT -1 OFFSET ?)""",
+                                   (self.MAX_STATS,))
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+    
+    def _evict(self):
+        """总大小超过上限时淘汰最久未使用的条目"""
+        total = self._conn.execute("SELECT COALESCE(SUM(payload_size), 0) FROM parse_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT path, payload_size FROM parse_cache ORDER BY last_used").fetchall()
+        for path, payload_size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM parse_cache WHERE path = ?", (path,))
+            total -= payload_size
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+class StoredText(str):
+    """内容池中的文本，可以像普通字符串一样使用，另外记录了内容摘要"""
+
+class ContentStore:
+    """按内容寻址的测试点内容池：相同的输入输出只保存一份，按引用计数释放
+    
+    文件内容按原始字节分块计算摘要，池中已有相同内容时丢弃读取的字节、不再解码，直接返回已有的文本；
+    其他字符串按UTF-8编码计算摘要。两种摘要使用不同的personalization，互不混淆。
+    """
+    CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(self):
+        self._blobs = {}  # 摘要 -> [文本, 引用计数]
+    
+    @staticmethod
+    def _text_digest(text):
+        import hashlib
+        return hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=16, person=b'text').digest()
+    
+    def read_file(self, path):
+        """读取文本文件，返回的文本尚未登记引用（可以在工作线程中调用）
+        
+        文件只读取一次：计算摘要时保留读到的块，池中没有相同内容时拼接后解码，有时直接丢弃。
+        """
+        import hashlib
+        hasher = hashlib.blake2b(digest_size=16, person=b'file')
+        chunks = []
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                hasher.update(chunk)
+                chunks.append(chunk)
+        digest = hasher.digest()
+        blob = self._blobs.get(digest)
+        if blob is not None:
+            return blob[0]
+        text = StoredText(decode_text(b''.join(chunks)))
+        text.digest = digest
+        return text
+    
+    def acquire(self, value):
+        """登记一次引用，返回应当保存到测试点中的值：相同的内容返回同一个对象"""
+        if not isinstance(value, str):
+            return value  # 延迟加载的文件引用本身很小，不需要去重
+        digest = value.digest if isinstance(value, StoredText) else self._text_digest(value)
+        blob = self._blobs.get(digest)
+        if blob is None:
+            if not isinstance(value, StoredText):
+                value = StoredText(value)
+                value.digest = digest
+            blob = self._blobs[digest] = [value, 0]
+        blob[1] += 1
+        return blob[0]
+    
+    def release(self, value):
+        """释放一次引用，最后一个引用释放后从内容池中删除"""
+        if not isinstance(value, StoredText):
+            return
+        blob = self._blobs.get(value.digest)
+        if blob is None or blob[0] is not value:
+            return
+        blob[1] -= 1
+        if blob[1] <= 0:
+            del self._blobs[value.digest]
+    
+    def acquire_testpoint(self, data):
+        """登记测试点的输入和输出，返回使用池中内容的测试点数据"""
+        return {field: self.acquire(value) for field, value in data.items()}
+    
+    def release_testpoint(self, data):
+        """释放测试点的输入和输出"""
+        for value in data.values():
+            self.release(value)
+    
+    def clear(self):
+        """清空内容池"""
+        self._blobs = {}
+    
+    def __len__(self):
+        return len(self._blobs)
+    
+    def total_chars(self):
+        """池中全部文本的字符数"""
+        return sum(len(blob[0]) for blob in self._blobs.values())
+
+class DirectoryWatcher:
+    """监视若干目录中文件的变化，在后台线程中把变化的文件路径分批交给回调函数
+    
+    Linux上使用inotify，只在文件写入完成、移动或删除时被唤醒，开销只与变化的文件数量有关；
+    其他平台定期用os.scandir比较文件的大小和修改时间。
+    """
+    SETTLE_DELAY = 0.2  # 发现变化后稍等片刻，把生成器连续写入的文件合并为一批
+    # inotify事件类型
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    
+    def __init__(self, callback, poll_interval=1.0):
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._directories = {}  # 目录 -> 是否包含子文件夹
+        self._lock = threading.Lock()
+        self._directories_changed = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def set_directories(self, directories):
+        """设置要监视的目录，directories为{目录: 是否包含子文件夹}"""
+        with self._lock:
+            self._directories = dict(directories)
+        self._directories_changed.set()
+    
+    def start(self):
+        """启动后台监视线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """停止监视"""
+        self._stop_event.set()
+    
+    @staticmethod
+    def _scan(directory, recursive, with_files=True):
+        """遍历目录，返回({文件路径: (大小, 修改时间)}, 遍历到的目录列表)"""
+        files = {}
+        directories = []
+        pending = [directory]
+        while pending:
+            current = pending.pop()
+            try:
+                with os.scandir(current) as it:
+                    directories.append(current)
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                pending.append(entry.path)
+                        elif with_files:
+                            try:
+                                stat = entry.stat()
+                            except OSError:
+                                continue
+                            files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return files, directories
+    
+    def _run(self):
+        try:
+            inotify = self._inotify_init()
+        except (OSError, AttributeError):
+            inotify = None  # 不支持inotify时使用轮询
+        if inotify is None:
+            self._run_polling()
+        else:
+            self._run_inotify(*inotify)
+    
+    @staticmethod
+    def _inotify_init():
+        """初始化inotify，返回(libc, 文件描述符)，当前平台不支持时返回None"""
+        if not sys.platform.startswith('linux'):
+            return None
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        return libc, fd
+    
+    def _run_inotify(self, libc, fd):
+        """inotify监视循环：只处理内核报告的事件"""
+        import select
+        import struct
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        watches = {}  # 监视描述符 -> 目录
+        watched = {}  # 目录 -> 监视描述符
+        first_round = True
+        try:
+            while not self._stop_event.is_set():
+                changed = set()
+                if self._directories_changed.is_set():
+                    # 重新计算需要监视的目录（包括新建的子文件夹）
+                    self._directories_changed.clear()
+                    with self._lock:
+                        roots = list(self._directories.items())
+                    wanted = set()
+                    for directory, recursive in roots:
+                        wanted.update(self._scan(directory, recursive, with_files=False)[1])
+                    for directory in list(watched):
+                        if directory not in wanted:
+                            wd = watched.pop(directory)
+                            watches.pop(wd, None)
+                            libc.inotify_rm_watch(fd, wd)
+                    for directory in wanted - set(watched):
+                        wd = libc.inotify_add_watch(fd, os.fsencode(directory), mask)
+                        if wd < 0:
+                            continue
+                        watches[wd] = directory
+                        watched[directory] = wd
+                        if not first_round:
+                            # 新建的子文件夹在开始监视之前可能已经写入了文件
+                            changed.update(self._scan(directory, False)[0])
+                    first_round = False
+                
+                if not changed:
+                    if not select.select([fd], [], [], self.poll_interval)[0]:
+                        continue
+                    time.sleep(self.SETTLE_DELAY)
+                while True:
+                    try:
+                        data = os.read(fd, 65536)
+                    except BlockingIOError:
+                        break
+                    pos = 0
+                    while pos < len(data):
+                        wd, event_mask, _, name_length = struct.unpack_from('iIII', data, pos)
+                        name = data[pos + 16:pos + 16 + name_length].rstrip(b'\0')
+                        pos += 16 + name_length
+                        if event_mask & self.IN_Q_OVERFLOW:
+                            # 事件队列溢出，所有监视目录中的文件都可能变化
+                            for directory in watched:
+                                changed.update(self._scan(directory, False)[0])
+                            continue
+                        if event_mask & self.IN_IGNORED:
+                            # 目录已被删除
+                            watched.pop(watches.pop(wd, None), None)
+                            continue
+                        directory = watches.get(wd)
+                        if directory is None or not name:
+                            continue
+                        if event_mask & self.IN_ISDIR:
+                            self._directories_changed.set()
+                            continue
+                        changed.add(os.path.join(directory, os.fsdecode(name)))
+                if changed:
+                    self.callback(changed)
+        finally:
+            os.close(fd)
+    
+    def _run_polling(self):
+        """轮询监视循环：定期比较文件的大小和修改时间"""
+        snapshots = {}  # (目录, 是否包含子文件夹) -> {文件路径: (大小, 修改时间)}
+        while not self._stop_event.wait(self.poll_interval):
+            with self._lock:
+                roots = list(self._directories.items())
+            self._directories_changed.clear()
+            
+            changed = set()
+            current_snapshots = {}
+            for root in roots:
+                files = self._scan(*root)[0]
+                old_files = snapshots.get(root)
+                if old_files is not None:
+                    # 新加入监视的目录只记录快照，不报告变化
+                    changed.update(path for path, key in files.items() if old_files.get(path) != key)
+                    changed.update(path for path in old_files if path not in files)
+                current_snapshots[root] = files
+            snapshots = current_snapshots
+            if changed:
+                self.callback(changed)
+
+class FileBuffer:
+    """按需从文件读取的只读缓冲区，支持切片、find()和rfind()，用来代替内存映射
+    
+    文件在读取过程中被截断时只会读到较少的内容，不会像访问内存映射那样使整个进程因SIGBUS退出，
+    在Windows上也不会阻止其他程序改写文件。最近读取的一块数据会保留下来，在附近连续查找时不必重复读取。
+    按路径创建时文件在读取时才打开，close()之后再次读取会重新打开。
+    """
+    WINDOW_SIZE = 1024 * 1024  # 查找时每次读取的字节数
+    
+    def __init__(self, source, window_size=None):
+        self.path = None
+        self._file = None
+        if hasattr(source, 'fileno'):
+            # 没有路径的文件（例如临时文件）复制一份文件描述符，保持打开直到close()
+            self._file = os.fdopen(os.dup(source.fileno()), 'rb')
+        else:
+            self.path = source
+        self.window_size = window_size or self.WINDOW_SIZE
+        self._window = (0, b'')  # (起始偏移, 内容)
+        self._lock = threading.Lock()
+    
+    def _read(self, start, length):
+        """读取从start开始的length个字节，超出文件末尾的部分不返回"""
+        if length <= 0:
+            return b''
+        with self._lock:
+            if self._file is None:
+                if self.path is None:
+                    raise ValueError("文件已经关闭")
+                self._file = open(self.path, 'rb')
+            if hasattr(os, 'pread'):
+                return os.pread(self._file.fileno(), length, start)
+            self._file.seek(start)  # Windows上没有pread
+            return self._file.read(length)
+    
+    def _window_at(self, pos, backward=False):
+        """获取包含pos的一块数据(起始偏移, 内容)，backward为True时这块数据在pos之后结束；pos超出文件末尾时内容为空"""
+        window_start, window = self._window
+        if not window_start <= pos < window_start + len(window):
+            window_start = max(0, pos + 1 - self.window_size) if backward else pos
+            window = self._read(window_start, self.window_size)
+            if not window_start <= pos < window_start + len(window):
+                return pos, b''
+            self._window = (window_start, window)
+        return window_start, window
+    
+    def __getitem__(self, index):
+        """读取buffer[start:stop]，只支持起止位置都不为负数的切片"""
+        start, stop = index.start or 0, index.stop
+        window_start, window = self._window
+        if window_start <= start and stop <= window_start + len(window):
+            return window[start - window_start:stop - window_start]
+        return self._read(start, stop - start)
+    
+    def find(self, sub, start, end):
+        """与bytes.find()相同，找不到时返回-1"""
+        overlap = max(0, len(sub) - 1)
+        pos = start
+        while pos < end:
+            window_start, window = self._window_at(pos)
+            if not window:
+                return -1
+            stop = min(end, window_start + len(window))
+            found = window.find(sub, pos - window_start, stop - window_start)
+            if found >= 0:
+                return window_start + found
+            if overlap and stop < end:
+                # 跨越两块边界的匹配
+                edge = max(pos, stop - overlap)
+                found = self[edge:min(end, stop + overlap)].find(sub)
+                if found >= 0:
+                    return edge + found
+            pos = stop
+        return -1
+    
+    def rfind(self, sub, start, end):
+        """与bytes.rfind()相同，找不到时返回-1"""
+        overlap = max(0, len(sub) - 1)
+        pos = end
+        while pos > start:
+            window_start, window = self._window_at(pos - 1, backward=True)
+            if not window:
+                return -1
+            first = max(start, window_start)
+            found = window.rfind(sub, first - window_start, pos - window_start)
+            if found >= 0:
+                return window_start + found
+            if overlap and first > start:
+                edge = max(start, first - overlap)
+                found = self[edge:min(pos, first + overlap)].rfind(sub)
+                if found >= 0:
+                    return edge + found
+            pos = first
+        return -1
+    
+    def close(self):
+        """关闭文件并丢弃保留的数据"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._window = (0, b'')
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class MappedDocument:
+    """按行随机访问的只读文档，维护稀疏的换行偏移索引
+    
+    普通文件不读入内存，每次按索引从文件中读取需要显示的部分，读完后立即关闭文件，显示中的文件也可以被其他程序改写；
+    文件被截断后只会读到较少的内容，不会导致程序崩溃。file_state记录建立索引时文件的(大小, 修改时间)。
+    """
+    BLOCK_SIZE = 16384  # 每个索引块覆盖的字节数
+    READ_SIZE = 64 * 1024  # 显示时每次从文件读取的字节数
+    
+    def __init__(self, source):
+        self.start = 0
+        self.file_state = None
+        
+        if isinstance(source, FileContent) and source.RAW:
+            stat = os.stat(source.path)
+            self.file_state = (stat.st_size, stat.st_mtime_ns)
+            self.buffer = FileBuffer(source.path, self.READ_SIZE)
+            self.start = min(source.offset, stat.st_size)
+            self.end = stat.st_size if source.length is None else min(stat.st_size, source.offset + source.length)
+        else:
+            # 普通字符串（例如提示信息）和JSON中的字符串解码后按同样方式索引
+            self.buffer = (read_content(source) or '').encode('utf-8')
+            self.end = len(self.buffer)
+        
+        try:
+            self._build_index()
+        finally:
+            self.close()
+    
+    def _build_index(self):
+        """建立换行索引：记录每个块之前的换行符数量，每次读取多个块"""
+        self.block_lines = array('q')
+        count = 0
+        step = self.BLOCK_SIZE * 64
+        for chunk_start in range(self.start, self.end, step):
+            chunk = self.buffer[chunk_start:min(chunk_start + step, self.end)]
+            for pos in range(0, min(step, self.end - chunk_start), self.BLOCK_SIZE):
+                self.block_lines.append(count)
+                count += chunk.count(b'\n', pos, pos + self.BLOCK_SIZE)
+        self.line_count = count + 1
+    
+    def line_start(self, line):
+        """获取指定行（从0开始）的起始字节偏移"""
+        if line <= 0:
+            return self.start
+        if line >= self.line_count:
+            return self.end
+        # 第line个换行符位于block_lines[b] < line <= block_lines[b + 1]的块中
+        block = bisect_left(self.block_lines, line) - 1
+        block_start = self.start + block * self.BLOCK_SIZE
+        data = self.buffer[block_start:min(block_start + self.BLOCK_SIZE, self.end)]
+        pos = 0
+        for _ in range(line - self.block_lines[block]):
+            newline = data.find(b'\n', pos)
+            if newline < 0:
+                return self.end  # 文件在建立索引之后被改写
+            pos = newline + 1
+        return block_start + pos
+    
+    def get_lines(self, first, last, max_line_bytes=20000):
+        """获取[first, last)范围内的行文本，过长的行会被截断显示"""
+        try:
+            pos = self.line_start(first)
+            parts = []
+            for _ in range(max(0, min(last, self.line_count) - first)):
+                newline = self.buffer.find(b'\n', pos, self.end)
+                stop = self.end if newline < 0 else newline
+                if stop - pos > max_line_bytes:
+                    line = self.buffer[pos:pos + max_line_bytes].decode('utf-8', errors='ignore')
+                    line += f" …（该行共 {stop - pos} 字节，已截断显示，复制可获取完整内容）"
+                else:
+                    line = self.buffer[pos:stop].decode('utf-8', errors='ignore')
+                parts.append(line[:-1] if line.endswith('\r') else line)
+                if newline < 0:
+                    break
+                pos = newline + 1
+            return '\n'.join(parts)
+        finally:
+            self.close()
+    
+    def get_text(self):
+        """获取完整文本内容"""
+        try:
+            text = self.buffer[self.start:self.end].decode('utf-8', errors='ignore')
+        finally:
+            self.close()
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+    
+    def memory_size(self):
+        """文档占用的内存字节数，包括换行索引（从文件读取的内容不常驻内存，不计算在内）"""
+        index_size = len(self.block_lines) * self.block_lines.itemsize
+        return index_size + (0 if isinstance(self.buffer, FileBuffer) else len(self.buffer))
+    
+    def close(self):
+        """关闭文件句柄；之后仍然可以读取，需要时重新打开文件"""
+        if isinstance(self.buffer, FileBuffer):
+            self.buffer.close()
+
+class DocumentCache:
+    """最近显示过的测试点文档的LRU缓存，再次显示时不必重新读取、解码和建立换行索引
+    
+    文档按测试点内容（文件信息或字符串对象）缓存并记录使用它的视图数量。普通文件的文档只保存换行索引和文件的大小、
+    修改时间，不保持文件打开。没有视图使用的文档在总大小超过max_bytes或数量超过max_documents时按最久未使用的顺序淘汰，
+    被淘汰的内容下次显示时重新从来源文件读取。来源文件的大小或修改时间变化后，缓存的文档不再使用。
+    """
+    
+    def __init__(self, max_bytes=256 * 1024 * 1024, max_documents=64):
+        self.max_bytes = max_bytes
+        self.max_documents = max_documents  # 很小的文档也有固定的开销，数量同样需要限制
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # 键 -> [文档, 使用它的视图数量, 大小, 字符串来源]
+        self._keys = {}  # id(文档) -> 键
+    
+    @staticmethod
+    def _key(source):
+        if isinstance(source, FileContent):
+            return (source.KIND,) + tuple(getattr(source, name) for name in source.FIELDS)
+        return ("str", id(source))  # 条目中保留字符串的引用，id在条目存在期间不会被复用
+    
+    @staticmethod
+    def _file_state(source):
+        """来源文件当前的(大小, 修改时间)，字符串内容返回None"""
+        if not isinstance(source, FileContent):
+            return None
+        stat = os.stat(source.path)
+        return (stat.st_size, stat.st_mtime_ns)
+    
+    def acquire(self, source):
+        """获取测试点内容的文档，并登记一次使用；用完后调用release()"""
+        key = self._key(source)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0].file_state is not None:
+            try:
+                changed = self._file_state(source) != entry[0].file_state
+            except OSError:
+                changed = True
+            if changed and entry[1] == 0:
+                self._remove(key)
+                entry = None
+            elif changed:
+                entry = None  # 正在显示的旧文档由视图释放后淘汰，这里创建新的文档
+        if entry is not None:
+            self.hits += 1
+            entry[1] += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+        
+        self.misses += 1
+        document = MappedDocument(source)
+        if key in self._entries:
+            # 同一内容的旧文档仍在显示，新文档不进入缓存，释放时直接关闭
+            return document
+        size = document.memory_size()
+        self._entries[key] = [document, 1, size, None if isinstance(source, FileContent) else source]
+        self._keys[id(document)] = key
+        self.total_bytes += size
+        self._evict()
+        return document
+    
+    def release(self, document):
+        """释放一次使用；不是从缓存获取的文档（例如错误信息、对比结果）直接关闭"""
+        key = self._keys.get(id(document))
+        entry = self._entries.get(key) if key is not None else None
+        if entry is None or entry[0] is not document:
+            document.close()
+            return
+        entry[1] -= 1
+        self._evict()
+    
+    def _remove(self, key):
+        document, _, size, _ = self._entries.pop(key)
+        del self._keys[id(document)]
+        self.total_bytes -= size
+        document.close()
+    
+    def _evict(self):
+        """按最久未使用的顺序淘汰没有视图使用的文档，直到总大小和数量都不超过上限"""
+        if self.total_bytes <= self.max_bytes and len(self._entries) <= self.max_documents:
+            return
+        for key in [key for key, entry in self._entries.items() if entry[1] <= 0]:
+            if self.total_bytes <= self.max_bytes and len(self._entries) <= self.max_documents:
+                break
+            self._remove(key)
+    
+    def clear(self):
+        """淘汰所有没有视图使用的文档"""
+        for key in [key for key, entry in self._entries.items() if entry[1] <= 0]:
+            self._remove(key)
+    
+    def __len__(self):
+        return len(self._entries)
+
+def make_content(file_path, lazy=True, content_store=None):
+    """创建测试点内容：延迟加载时只记录文件信息，否则立即读取全部内容（有内容池时按内容去重）"""
+    if lazy:
+        return FileContent(file_path)
+    if content_store is not None:
+        return content_store.read_file(file_path)
+    with open(file_path, 'rb') as f:
+        return decode_text(f.read())
+
+def load_json_testpoints(file_path, testpoints=None, lazy=True, batch_callback=None):
+    """流式加载JSON格式的测试点文件，结果存入并返回testpoints字典（为None时新建）
+    
+    延迟加载时较长的输入输出只记录在文件中的位置。batch_callback不为None时，
+    每解析一批测试点就以这一批的字典调用一次，用于在解析完成前逐步显示。
+    """
+    if testpoints is None:
+        testpoints = {}
+    
+    decode_limit = 4096 if lazy else None
+    batch = {}
+    for name, input_data, output_data in iter_json_testpoints(file_path, decode_limit):
+        batch[name] = {
+            'input': input_data,
+            'output': output_data
+        }
+        if batch_callback is not None and len(batch) >= 1000:
+            testpoints.update(batch)
+            batch_callback(batch)
+            batch = {}
+    
+    # 将新的测试点添加到现有测试点数据中
+    testpoints.update(batch)
+    if batch_callback is not None and batch:
+        batch_callback(batch)
+    return testpoints
+
+def load_text_testpoints(file_path, testpoints=None, lazy=True, content_store=None):
+    """加载文本格式的测试点文件，结果存入并返回testpoints字典（为None时新建）"""
+    if testpoints is None:
+        testpoints = {}
+    content = make_content(file_path, lazy, content_store)
+    
+    # 创建临时字典存储新的测试点
+    new_testpoints = {}
+    
+    # 尝试识别测试点格式
+    # 1. 检查是否是输入文件 (.in) 或输出文件 (.out/.ans)
+    base_name = os.path.basename(file_path)
+    # 获取不带扩展名的文件名作为测试点标识符的基础
+    name_without_ext = os.path.splitext(base_name)[0]
+    # 生成唯一的测试点名称，使用目录哈希和不带扩展名的文件名
+    dir_hash = stable_dir_hash(os.path.dirname(file_path))
+    unique_name = f"{dir_hash}_{name_without_ext}"
+    
+    # 检查是否已经存在这个测试点
+    if unique_name in testpoints:
+        # 如果已存在，则用更新后的副本替换现有测试点，不修改原来的字典（它可能已经登记在内容池中）
+        if re.match(r'.*\.(out|ans|output)$', base_name, re.IGNORECASE):
+            # 这是一个输出文件，更新输出内容
+            testpoints[unique_name] = dict(testpoints[unique_name], output=content)
+        else:
+            # 输入文件或不是标准的测试点文件，更新输入内容
+            testpoints[unique_name] = dict(testpoints[unique_name], input=content)
+        return testpoints
+    
+    if re.match(r'.*\.(in|input)$', base_name, re.IGNORECASE):
+        # 这是一个输入文件，尝试查找对应的输出文件
+        output_file = re.sub(r'\.(in|input)$', '.out', file_path, flags=re.IGNORECASE)
+        if not os.path.exists(output_file):
+            output_file = re.sub(r'\.(in|input)$', '.ans', file_path, flags=re.IGNORECASE)
+        
+        if os.path.exists(output_file):
+            output_content = make_content(output_file, lazy, content_store)
+            new_testpoints[unique_name] = {
+                'input': content,
+                'output': output_content
+            }
+        else:
+            new_testpoints[unique_name] = {
+                'input': content,
+                'output': MISSING_OUTPUT
+            }
+    elif re.match(r'.*\.(out|ans|output)$', base_name, re.IGNORECASE):
+        # 这是一个输出文件，尝试查找对应的输入文件
+        input_file = re.sub(r'\.(out|ans|output)$', '.in', file_path, flags=re.IGNORECASE)
+        if not os.path.exists(input_file):
+            input_file = re.sub(r'\.(out|ans|output)$', '.input', file_path, flags=re.IGNORECASE)
+        
+        if os.path.exists(input_file):
+            input_content = make_content(input_file, lazy, content_store)
+            new_testpoints[unique_name] = {
+                'input': input_content,
+                'output': content
+            }
+        else:
+            new_testpoints[unique_name] = {
+                'input': MISSING_INPUT,
+                'output': content
+            }
+    else:
+        # 不是标准的测试点文件，将整个内容作为一个测试点
+        new_testpoints[unique_name] = {
+            'input': content,
+            'output': ''
+        }
+        
+    # 将新的测试点添加到现有测试点数据中
+    testpoints.update(new_testpoints)
+    return testpoints
+
+def find_related_testpoints(file_path, testpoints=None, lazy=True, content_store=None):
+    """查找同目录下的相关测试点文件，结果存入并返回testpoints字典（为None时新建）"""
+    if testpoints is None:
+        testpoints = {}
+    dir_path = os.path.dirname(file_path)
+    files = os.listdir(dir_path)
+    
+    # 创建临时字典存储新的测试点
+    new_testpoints = {}
+    
+    # 生成目录的唯一标识符，用于避免不同目录下的同名文件冲突
+    # 使用与load_text_testpoints相同的哈希生成逻辑
+    dir_hash = stable_dir_hash(dir_path)
+    
+    # 获取当前文件的名称（不含扩展名）
+    current_file_name = os.path.splitext(os.path.basename(file_path))[0]
+    
+    # 查找与当前文件相关的测试点文件
+    related_files = []
+    for f in files:
+        name_without_ext = os.path.splitext(f)[0]
+        # 只处理与当前文件名相同的文件
+        if name_without_ext == current_file_name:
+            related_files.append(f)
+    
+    # 分类相关文件
+    input_files = [f for f in related_files if re.match(r'.*\.(in|input)$', f, re.IGNORECASE)]
+    output_files = [f for f in related_files if re.match(r'.*\.(out|ans|output)$', f, re.IGNORECASE)]
+    
+    # 创建输入文件名到文件的映射
+    input_map = {}
+    for in_file in input_files:
+        name_without_ext = os.path.splitext(in_file)[0]
+        input_map[name_without_ext] = in_file
+    
+    # 创建输出文件名到文件的映射
+    output_map = {}
+    for out_file in output_files:
+        name_without_ext = os.path.splitext(out_file)[0]
+        output_map[name_without_ext] = out_file
+    
+    # 处理相关测试点
+    processed_names = set()
+    
+    # 首先处理有输入文件的测试点
+    for base_name in input_map.keys():
+        # 创建唯一的测试点名称
+        unique_name = f"{dir_hash}_{base_name}"
+        
+        # 检查是否已经存在这个测试点或已处理过
+        if unique_name in testpoints or base_name in processed_names:
+            continue
+            
+        processed_names.add(base_name)
+        
+        # 读取输入文件内容（延迟加载时只记录文件信息）
+        in_path = os.path.join(dir_path, input_map[base_name])
+        input_content = make_content(in_path, lazy, content_store)
+        
+        # 查找对应的输出文件
+        output_content = MISSING_OUTPUT
+        if base_name in output_map:
+            out_path = os.path.join(dir_path, output_map[base_name])
+            output_content = make_content(out_path, lazy, content_store)
+        
+        new_testpoints[unique_name] = {
+            'input': input_content,
+            'output': output_content
+        }
+    
+    # 处理只有输出文件的测试点
+    for base_name in output_map.keys():
+        if base_name in processed_names or base_name in input_map:
+            continue  # 已处理过或有对应的输入文件
+        
+        # 创建唯一的测试点名称
+        unique_name = f"{dir_hash}_{base_name}"
+        
+        # 检查是否已经存在这个测试点
+        if unique_name in testpoints:
+            continue
+        
+        # 读取输出文件内容（延迟加载时只记录文件信息）
+        out_path = os.path.join(dir_path, output_map[base_name])
+        output_content = make_content(out_path, lazy, content_store)
+        
+        new_testpoints[unique_name] = {
+            'input': MISSING_INPUT,
+            'output': output_content
+        }
+    
+    # 将新的测试点添加到现有测试点数据中
+    testpoints.update(new_testpoints)
+    return testpoints
+
+def scan_testpoint_folder(dir_path, recursive=False, testpoints=None, lazy=True, content_store=None):
+    """扫描文件夹中的测试点文件（只遍历一次目录），按文件名配对输入和输出文件
+    
+    结果存入并返回testpoints字典（为None时新建）
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    if testpoints is None:
+        testpoints = {}
+    
+    # 一次遍历收集全部输入、输出文件：(所在目录, 不含扩展名的文件名) -> 目录项
+    input_entries = {}
+    output_entries = {}
+    pending_dirs = [dir_path]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        try:
+            with os.scandir(current_dir) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending_dirs.append(entry.path)
+                        continue
+                    stem, ext = os.path.splitext(entry.name)
+                    ext = ext.lower()
+                    if ext in ('.in', '.input'):
+                        input_entries.setdefault((current_dir, stem), entry)
+                    elif ext in ('.out', '.ans', '.output'):
+                        output_entries.setdefault((current_dir, stem), entry)
+        except OSError:
+            continue
+    
+    # 延迟加载时只记录文件信息（直接使用目录项中的stat）；否则并行读取文件内容
+    all_entries = list(input_entries.values()) + list(output_entries.values())
+    if lazy:
+        contents = {entry.path: FileContent(entry.path, stat=entry.stat()) for entry in all_entries}
+    else:
+        def read_file(entry):
+            return entry.path, make_content(entry.path, False, content_store)
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as executor:
+            contents = dict(executor.map(read_file, all_entries))
+    
+    new_testpoints = {}
+    dir_hashes = {}
+    for key in sorted(set(input_entries) | set(output_entries)):
+        current_dir, stem = key
+        # 与load_text_testpoints相同的命名方式：目录哈希加不带扩展名的文件名
+        if current_dir not in dir_hashes:
+            dir_hashes[current_dir] = stable_dir_hash(current_dir)
+        unique_name = f"{dir_hashes[current_dir]}_{stem}"
+        if unique_name in testpoints or unique_name in new_testpoints:
+            continue
+        
+        input_entry = input_entries.get(key)
+        output_entry = output_entries.get(key)
+        new_testpoints[unique_name] = {
+            'input': contents[input_entry.path] if input_entry else MISSING_INPUT,
+            'output': contents[output_entry.path] if output_entry else MISSING_OUTPUT
+        }
+    
+    # 将新的测试点添加到现有测试点数据中
+    testpoints.update(new_testpoints)
+    return testpoints
+
+def load_archive_testpoints(archive_path, testpoints=None, lazy=True):
+    """加载zip、tar压缩包中的测试点（不解压到磁盘），与文件夹相同按文件名配对输入和输出文件
+    
+    结果存入并返回testpoints字典（为None时新建）
+    """
+    if testpoints is None:
+        testpoints = {}
+    
+    # 收集全部输入、输出文件：(包内目录, 不含扩展名的文件名) -> (成员名, 偏移, 大小)
+    input_members = {}
+    output_members = {}
+    for member in list_archive_members(archive_path):
+        member_dir, member_name = posixpath.split(member[0])
+        stem, ext = os.path.splitext(member_name)
+        ext = ext.lower()
+        if ext in ('.in', '.input'):
+            input_members.setdefault((member_dir, stem), member)
+        elif ext in ('.out', '.ans', '.output'):
+            output_members.setdefault((member_dir, stem), member)
+    
+    # 延迟加载时只记录成员位置；否则按压缩包中的顺序一次读出全部内容
+    all_members = list(input_members.values()) + list(output_members.values())
+    if lazy:
+        stat = os.stat(archive_path)
+        is_plain_tar = archive_path.lower().endswith('.tar')
+        contents = {}
+        for name, offset, size in all_members:
+            if is_plain_tar:
+                # 未压缩的tar包中成员数据连续存放，和普通文件一样可以直接按偏移读取
+                contents[name] = FileContent(archive_path, offset, size, stat)
+            elif archive_path.lower().endswith('.zip'):
+                contents[name] = ArchiveMemberContent(archive_path, name, stat=stat)
+            else:
+                contents[name] = ArchiveMemberContent(archive_path, name, offset, size, stat)
+    else:
+        contents = read_archive_members(archive_path, [member[0] for member in all_members])
+    
+    new_testpoints = {}
+    dir_hashes = {}
+    for key in sorted(set(input_members) | set(output_members)):
+        member_dir, stem = key
+        # 与scan_testpoint_folder相同的命名方式：（压缩包内）目录哈希加不带扩展名的文件名
+        if member_dir not in dir_hashes:
+            dir_hashes[member_dir] = stable_dir_hash(os.path.join(archive_path, member_dir))
+        unique_name = f"{dir_hashes[member_dir]}_{stem}"
+        if unique_name in testpoints or unique_name in new_testpoints:
+            continue
+        
+        input_member = input_members.get(key)
+        output_member = output_members.get(key)
+        new_testpoints[unique_name] = {
+            'input': contents[input_member[0]] if input_member else MISSING_INPUT,
+            'output': contents[output_member[0]] if output_member else MISSING_OUTPUT
+        }
+    
+    # 将新的测试点添加到现有测试点数据中
+    testpoints.update(new_testpoints)
+    return testpoints
+
+def parse_testpoint_source(file_path, lazy=True, content_store=None, parse_cache=None, batch_callback=None,
+                           operation=None):
+    """解析单个测试点来源（文件及其相关文件、压缩包或文件夹），返回新的测试点字典
+    
+    parse_cache不为None时，延迟加载的解析结果会读写这个缓存。
+    operation不为None时，把查询缓存、读取和配对各阶段的耗时记录到其中（见testpoint_profile.Operation）。
+    """
+    def stage(name, nbytes=0):
+        return operation.stage(name, nbytes) if operation is not None else nullcontext()
+    
+    testpoints = {}
+    if not source_exists(file_path):
+        return testpoints
+    
+    # 延迟加载时测试点只包含文件信息，可以直接使用缓存的解析结果
+    use_cache = parse_cache is not None and lazy
+    if use_cache:
+        with stage("缓存"):
+            cached = parse_cache.get(file_path)
+        if cached is not None:
+            return cached
+    
+    # 根据来源类型处理
+    source_path, recursive = split_source_spec(file_path)
+    if os.path.isdir(source_path):
+        with stage("扫描配对"):
+            scan_testpoint_folder(source_path, recursive, testpoints, lazy, content_store)
+    else:
+        with stage("读取", os.path.getsize(source_path) if operation is not None else 0):
+            if is_archive_source(source_path):
+                load_archive_testpoints(source_path, testpoints, lazy)
+            elif is_json_source(file_path):
+                load_json_testpoints(file_path, testpoints, lazy, batch_callback)
+            else:
+                load_text_testpoints(file_path, testpoints, lazy, content_store)
+    
+    # 尝试查找与当前文件相关的测试点文件（同名不同扩展名）
+    if not os.path.isdir(source_path) and not is_archive_source(source_path):
+        with stage("配对"):
+            find_related_testpoints(file_path, testpoints, lazy, content_store)
+    
+    if use_cache:
+        with stage("缓存"):
+            parse_cache.put(file_path, testpoints)
+    return testpoints
+
+def read_testpoint_pair(file_path, lazy=True, content_store=None):
+    """重新读取输入或输出文件所在的测试点，返回{测试点名称: 数据}
+    
+    不是输入输出文件时返回空字典；对应的输入输出文件都已不存在时数据为None。
+    """
+    dir_path, file_name = os.path.split(file_path)
+    stem, ext = os.path.splitext(file_name)
+    ext = ext.lower()
+    if ext in ('.in', '.input'):
+        input_candidates = [file_path]
+        output_candidates = []
+    elif ext in ('.out', '.ans', '.output'):
+        input_candidates = []
+        output_candidates = [file_path]
+    else:
+        return {}
+    input_candidates += [os.path.join(dir_path, stem + suffix) for suffix in ('.in', '.input')]
+    output_candidates += [os.path.join(dir_path, stem + suffix) for suffix in ('.out', '.ans', '.output')]
+    input_path = next((path for path in input_candidates if os.path.isfile(path)), None)
+    output_path = next((path for path in output_candidates if os.path.isfile(path)), None)
+    
+    # 与scan_testpoint_folder相同的命名方式：目录哈希加不带扩展名的文件名
+    unique_name = f"{stable_dir_hash(dir_path)}_{stem}"
+    if input_path is None and output_path is None:
+        return {unique_name: None}
+    return {unique_name: {
+        'input': make_content(input_path, lazy, content_store) if input_path else MISSING_INPUT,
+        'output': make_content(output_path, lazy, content_store) if output_path else MISSING_OUTPUT
+    }}
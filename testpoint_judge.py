@@ -0,0 +1,289 @@
+"""洛谷测试点查看器的本地评测功能，不依赖图形界面
+
+用编译好的程序（或Python脚本）依次运行每个测试点：输入数据直接从来源文件流式写入子进程的标准输入，
+输出写入临时文件后用testpoint_compare与答案比较。多个测试点在线程池中并行评测，每个测试点是一个独立的子进程，
+在支持的平台上先设置CPU时间、内存和栈空间的限制再执行程序：Linux上通过prlimit(1)，
+其他平台通过一个很小的Python启动器（它本身的开销会从结果中扣除）。内存峰值取自wait4，其中包含启动子进程的进程在exec之前的内存，
+程序的峰值不超过这部分时结果中的内存为None。
+"""
+import os
+import shutil
+import sys
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+from testpoint_compare import LINE_MODE, compare_outputs
+from testpoint_core import MISSING_INPUT, MISSING_OUTPUT, FileContent, format_size, read_content
+
+try:
+    import resource  # Windows上没有resource模块，只能限制运行时间
+except ImportError:
+    resource = None
+
+AC = "AC"
+WA = "WA"
+TLE = "TLE"
+MLE = "MLE"
+RE = "RE"
+SKIP = "SKIP"  # 缺少输入或输出文件，没有运行
+
+WALL_TIME_FACTOR = 2  # 实际经过的时间超过时间限制的多少倍时强制结束（例如程序在等待输入）
+MLE_RATIO = 0.9  # 异常退出且内存峰值达到限制的这一比例时判为MLE（内存申请失败通常表现为崩溃）
+MEMORY_ERRORS = ("MemoryError", "bad_alloc")  # 虚拟内存超限时申请内存直接失败，只能从错误输出判断
+MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss的单位，Linux上是KB
+
+class JudgeResult:
+    """单个测试点的评测结果，time为CPU时间（秒），memory为内存峰值（字节，无法获取时为None）"""
+    __slots__ = ("name", "verdict", "time", "memory", "message")
+    
+    def __init__(self, name, verdict, time=0.0, memory=None, message=""):
+        self.name = name
+        self.verdict = verdict
+        self.time = time
+        self.memory = memory
+        self.message = message
+    
+    def summary(self):
+        """格式化为一行简短的结果，例如"AC  15ms  2.1 MB"，用于在测试点列表旁显示"""
+        if self.verdict == SKIP:
+            return SKIP
+        memory = "-" if self.memory is None else format_size(self.memory)
+        return f"{self.verdict:<3} {self.time * 1000:.0f}ms  {memory}"
+    
+    def __repr__(self):
+        return f"JudgeResult({self.name!r}, {self.verdict}, time={self.time:.3f}, memory={self.memory})"
+
+def build_command(program_path):
+    """根据程序路径生成运行命令，.py文件用当前的Python解释器运行"""
+    program_path = os.path.abspath(program_path)
+    if program_path.lower().endswith('.py'):
+        return [sys.executable, program_path]
+    return [program_path]
+
+# 设置资源限制后用exec执行评测程序的启动器。不使用preexec_fn：它在fork之后、exec之前的子进程中运行Python代码，
+# 多个线程同时启动子进程时可能死锁。prlimit(1)是原生程序，几乎不占用时间和内存，没有时才使用Python启动器
+PRLIMIT = shutil.which("prlimit") if resource is not None and sys.platform.startswith("linux") else None
+PRLIMIT_OPTIONS = {} if resource is None else {resource.RLIMIT_CPU: "--cpu", resource.RLIMIT_AS: "--as",
+                                               resource.RLIMIT_STACK: "--stack"}
+
+# Python启动器，参数为"限制:软限制:硬限制,..."和原来的命令
+LIMIT_LAUNCHER = """import os, resource, sys
+for item in sys.argv[1].split(','):
+    limit, soft, hard = map(int, item.split(':'))
+    try:
+        resource.setrlimit(limit, (soft, hard))
+    except (ValueError, OSError):
+        pass
+os.execv(sys.argv[2], sys.argv[2:])
+"""
+
+_launcher_overhead = None
+_launcher_overhead_lock = threading.Lock()
+
+def resource_limits(time_limit, memory_limit):
+    """评测程序的资源限制[(资源, 软限制, 硬限制)]，不超过当前进程的硬限制；没有resource模块时为空"""
+    if resource is None:
+        return []
+    
+    cpu_seconds = int(time_limit) + 1
+    limits = [(resource.RLIMIT_CPU, cpu_seconds, cpu_seconds + 1)]
+    if memory_limit:
+        limits.append((resource.RLIMIT_AS, memory_limit, memory_limit))
+        # 与洛谷一致，栈空间与内存限制相同，硬限制保持不变
+        limits.append((resource.RLIMIT_STACK, memory_limit, resource.RLIM_INFINITY))
+    result = []
+    for limit, soft, hard in limits:
+        current = resource.getrlimit(limit)[1]
+        if current != resource.RLIM_INFINITY:
+            soft, hard = min(soft, current), min(hard, current)
+        result.append((limit, soft, hard))
+    return result
+
+def limit_command(command, limits):
+    """在命令前加上设置资源限制的启动器，没有需要设置的限制时原样返回"""
+    if not limits:
+        return command
+    if PRLIMIT is not None:
+        def value(number):
+            return "unlimited" if number == resource.RLIM_INFINITY else str(number)
+        options = [f"{PRLIMIT_OPTIONS[limit]}={value(soft)}:{value(hard)}" for limit, soft, hard in limits]
+        return [PRLIMIT] + options + ["--"] + list(command)
+    spec = ",".join(f"{limit}:{soft}:{hard}" for limit, soft, hard in limits)
+    return [sys.executable, "-S", "-c", LIMIT_LAUNCHER, spec] + list(command)
+
+def launcher_overhead():
+    """Python启动器本身的(CPU时间, 内存峰值)，第一次调用时用它运行一个空程序测量，无法测量时为(0, 0)
+    
+    CPU时间和内存峰值在exec之后会延续下去，评测结果需要扣除这部分开销。
+    """
+    global _launcher_overhead
+    with _launcher_overhead_lock:
+        if _launcher_overhead is None:
+            _launcher_overhead = (0.0, 0)
+            true_path = shutil.which("true")
+            if true_path is not None and hasattr(os, 'wait4'):
+                try:
+                    process = subprocess.Popen(limit_command([true_path], resource_limits(1.0, 0)),
+                                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                               stderr=subprocess.DEVNULL)
+                    _, cpu_time, peak, _ = wait_process(process, 10)
+                    _launcher_overhead = (cpu_time, peak)
+                except OSError:
+                    pass
+        return _launcher_overhead
+
+def open_stdin(value):
+    """获取子进程的标准输入：普通文件直接作为标准输入，其他内容返回None，由调用方通过管道写入"""
+    if isinstance(value, FileContent) and value.RAW and value.offset == 0 and value.length is None:
+        return open(value.path, 'rb')
+    return None
+
+def feed_stdin(pipe, value):
+    """在后台线程中把测试点内容分块写入子进程的标准输入"""
+    try:
+        if isinstance(value, FileContent):
+            for chunk in value.iter_bytes():
+                pipe.write(chunk)
+        else:
+            pipe.write(read_content(value).encode('utf-8'))
+    except (BrokenPipeError, OSError):
+        pass  # 程序没有读完输入就退出了
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+def wait_process(process, wall_limit):
+    """等待子进程结束，超过wall_limit秒时强制结束，返回(退出状态, CPU时间, 内存峰值, 是否超时)"""
+    start = time.monotonic()
+    if not hasattr(os, 'wait4'):
+        # Windows：只能得到实际经过的时间
+        try:
+            process.wait(timeout=wall_limit)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            timed_out = True
+        return process.returncode, time.monotonic() - start, None, timed_out
+    
+    lock = threading.Lock()
+    state = {"done": False, "killed": False}
+    
+    def kill():
+        with lock:
+            if not state["done"]:
+                os.kill(process.pid, signal.SIGKILL)
+                state["killed"] = True
+    
+    timer = threading.Timer(wall_limit, kill)
+    timer.start()
+    try:
+        # 先等待子进程结束但不回收，确保强制结束时进程号不会已经被其他进程复用
+        if hasattr(os, 'waitid'):
+            os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        with lock:
+            state["done"] = True
+        _, status, usage = os.wait4(process.pid, 0)
+    finally:
+        timer.cancel()
+    process.returncode = os.waitstatus_to_exitcode(status)
+    
+    peak = usage.ru_maxrss * MAXRSS_UNIT
+    return process.returncode, usage.ru_utime + usage.ru_stime, peak, state["killed"]
+
+def run_testpoint(command, name, data, time_limit=1.0, memory_limit=256 * 1024 * 1024,
+                  compare_mode=LINE_MODE, eps=1e-6):
+    """运行一个测试点并返回评测结果，time_limit以秒为单位，memory_limit以字节为单位（0表示不限制）
+
+    compare_mode和eps是比较输出的方式，见testpoint_compare.compare_outputs。
+    """
+    if data['input'] == MISSING_INPUT or data['output'] == MISSING_OUTPUT:
+        return JudgeResult(name, SKIP, message="缺少输入或输出文件")
+    
+    limits = resource_limits(time_limit, memory_limit)
+    stdin_file = open_stdin(data['input'])
+    with tempfile.TemporaryFile() as output_file, tempfile.TemporaryFile() as error_file:
+        try:
+            process = subprocess.Popen(limit_command(command, limits),
+                                       stdin=stdin_file if stdin_file is not None else subprocess.PIPE,
+                                       stdout=output_file, stderr=error_file,
+                                       cwd=os.path.dirname(command[-1]) or None)
+        finally:
+            if stdin_file is not None:
+                stdin_file.close()
+        # exec时子进程的内存峰值从启动它的进程（本进程或Python启动器）继承，只有超过这部分的峰值才属于评测程序
+        spawn_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT if resource is not None else 0
+        
+        feeder = None
+        if process.stdin is not None:
+            feeder = threading.Thread(target=feed_stdin, args=(process.stdin, data['input']), daemon=True)
+            feeder.start()
+        returncode, cpu_time, peak, timed_out = wait_process(process, time_limit * WALL_TIME_FACTOR + 1)
+        if feeder is not None:
+            feeder.join()
+        if limits and PRLIMIT is None:
+            # 扣除Python启动器的开销
+            base_time, base_peak = launcher_overhead()
+            cpu_time = max(0.0, cpu_time - base_time)
+            spawn_peak = max(spawn_peak, base_peak)
+        if peak is not None and peak <= spawn_peak:
+            peak = None  # 内存峰值是各阶段的最大值，不超过继承的部分时无法得知程序自己的峰值
+        
+        # 只保留错误输出的最后一部分，异常信息通常在末尾
+        error_file.seek(max(0, os.fstat(error_file.fileno()).st_size - 1000))
+        message = error_file.read().decode('utf-8', errors='replace').strip()
+        
+        if timed_out or cpu_time > time_limit or (hasattr(signal, 'SIGXCPU') and returncode == -signal.SIGXCPU):
+            verdict = TLE
+        elif memory_limit and peak is not None and peak > memory_limit:
+            verdict = MLE
+        elif returncode != 0:
+            near_limit = memory_limit and peak is not None and peak >= memory_limit * MLE_RATIO
+            out_of_memory = memory_limit and any(error in message for error in MEMORY_ERRORS)
+            verdict = MLE if near_limit or out_of_memory else RE
+            if not message:
+                message = f"退出代码 {returncode}"
+        else:
+            expected = data['output']
+            if not isinstance(expected, FileContent):
+                expected = expected.encode('utf-8')
+            compared = compare_outputs(output_file, expected, compare_mode, eps)
+            verdict = AC if compared else WA
+            if not compared:
+                message = compared.describe()
+    return JudgeResult(name, verdict, cpu_time, peak, message)
+
+def judge_testpoints(command, items, time_limit=1.0, memory_limit=256 * 1024 * 1024,
+                     workers=None, result_callback=None, cancel_event=None, compare_mode=LINE_MODE, eps=1e-6):
+    """并行评测多个测试点，items为(名称, 测试点数据)列表，返回{名称: 评测结果}
+    
+    每评测完一个测试点调用一次result_callback(result)；cancel_event被设置后不再启动新的测试点。
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    def run(name, data):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        return run_testpoint(command, name, data, time_limit, memory_limit, compare_mode, eps)
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = [executor.submit(run, name, data) for name, data in items]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                results[result.name] = result
+                if result_callback is not None:
+                    result_callback(result)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return results
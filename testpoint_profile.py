@@ -0,0 +1,227 @@
+"""洛谷测试点查看器的性能记录功能，不依赖图形界面
+
+默认关闭。设置环境变量LUOGU_TESTPOINT_PROFILE（或config.json中的"profiling"）为1时，记录加载、配对、
+渲染和导出等操作中每个阶段的耗时和数据量；设置为cprofile时，还会用cProfile分析每次操作并保存.prof文件。
+记录写入配置目录下的profiles文件夹，用于排查"打开某个文件时卡住"一类的问题。
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from testpoint_core import format_size
+
+PROFILE_ENV = "LUOGU_TESTPOINT_PROFILE"
+PROFILE_OFF = "off"
+PROFILE_TIMING = "timing"  # 只记录各阶段的耗时和数据量
+PROFILE_CPROFILE = "cprofile"  # 同时保存cProfile的分析结果
+MAX_PROFILE_FILES = 50  # 最多保留的.prof文件数量，超过时删除最旧的
+TIMINGS_FILE = "timings.jsonl"  # 每次操作的记录追加到这个文件中，每行一个JSON对象
+
+def parse_profile_mode(value):
+    """把环境变量或配置中的值转换为记录模式：假值、"0"、"off"为关闭，"cprofile"为cProfile，其他真值只记录耗时"""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("", "0", "off", "false", "no"):
+            return PROFILE_OFF
+        return PROFILE_CPROFILE if value == PROFILE_CPROFILE else PROFILE_TIMING
+    return PROFILE_TIMING if value else PROFILE_OFF
+
+def content_bytes(value):
+    """测试点内容的大小，延迟加载的内容直接使用文件信息，字符串按字符数计算"""
+    length = getattr(value, "length", None)
+    if length is not None:
+        return length
+    if hasattr(value, "size") and hasattr(value, "offset"):
+        return value.size - value.offset
+    return len(value) if isinstance(value, str) else 0
+
+class Stage:
+    """正在记录的一个阶段，可以在with块中补充这一阶段处理的字节数"""
+    __slots__ = ("nbytes",)
+    
+    def __init__(self, nbytes=0):
+        self.nbytes = nbytes
+
+class Operation:
+    """一次操作（例如加载一个文件）的总耗时和各阶段的耗时、数据量，各阶段可以在不同的线程中记录
+    
+    关闭记录时stage()和add()什么也不做，调用方不需要判断是否开启。
+    """
+    
+    def __init__(self, name, detail="", enabled=True):
+        self.name = name
+        self.detail = detail
+        self.enabled = enabled
+        self.seconds = None  # 操作结束后才有值
+        self.stages = {}  # 阶段名称 -> [耗时, 字节数, 次数]，按第一次出现的顺序排列
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name, nbytes=0):
+        """记录with块的耗时，nbytes为这一阶段处理的字节数（也可以在with块中设置返回的Stage的nbytes）"""
+        stage = Stage(nbytes)
+        if not self.enabled:
+            yield stage
+            return
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            self.add(name, time.perf_counter() - start, stage.nbytes)
+    
+    def add(self, name, seconds, nbytes=0):
+        """累加一个阶段的耗时和字节数"""
+        if not self.enabled:
+            return
+        with self._lock:
+            record = self.stages.setdefault(name, [0.0, 0, 0])
+            record[0] += seconds
+            record[1] += nbytes
+            record[2] += 1
+    
+    def summary(self):
+        """格式化为一行，例如：加载文件 1.23s | 读取 0.80s 120.0 MB | 配对 0.10s×3"""
+        parts = [f"{self.name} {self.seconds or 0.0:.2f}s"]
+        with self._lock:
+            stages = list(self.stages.items())
+        for name, (seconds, nbytes, count) in stages:
+            part = f"{name} {seconds:.2f}s"
+            if nbytes:
+                part += f" {format_size(nbytes)}"
+            if count > 1:
+                part += f"×{count}"
+            parts.append(part)
+        return " | ".join(parts)
+    
+    def to_dict(self):
+        """转换为写入记录文件的字典"""
+        with self._lock:
+            stages = {name: {"seconds": seconds, "bytes": nbytes, "count": count}
+                      for name, (seconds, nbytes, count) in self.stages.items()}
+        return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "operation": self.name, "detail": self.detail,
+                "seconds": self.seconds, "stages": stages}
+
+DISABLED_OPERATION = Operation("", enabled=False)  # 没有正在记录的操作时使用，不记录任何内容
+
+class Profiler:
+    """创建和结束操作记录；开启时把结束的操作追加到记录文件，并通知listener(operation)（例如更新状态栏）
+    
+    每个线程有一个当前操作，stage()记录到当前操作中；在工作线程中记录时直接使用操作的stage()。
+    """
+    
+    def __init__(self, mode=PROFILE_OFF, dump_dir=None, listener=None):
+        self.mode = mode
+        self.dump_dir = str(dump_dir) if dump_dir is not None else None
+        self.listener = listener
+        self.last_operation = None
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if self.enabled and self.dump_dir is not None:
+            os.makedirs(self.dump_dir, exist_ok=True)
+    
+    @property
+    def enabled(self):
+        return self.mode != PROFILE_OFF
+    
+    def start(self, name, detail=""):
+        """开始一次操作，关闭记录时返回不记录任何内容的操作"""
+        return Operation(name, detail, self.enabled)
+    
+    def finish(self, operation):
+        """结束一次操作：计算总耗时、写入记录文件并通知listener，应在主线程中调用"""
+        if not operation.enabled or operation.seconds is not None:
+            return
+        operation.seconds = time.perf_counter() - operation._start
+        self.last_operation = operation
+        if self.dump_dir is not None:
+            try:
+                with open(os.path.join(self.dump_dir, TIMINGS_FILE), 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(operation.to_dict(), ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+        if self.listener is not None:
+            self.listener(operation)
+    
+    def current(self):
+        """当前线程正在记录的操作，没有时返回None"""
+        return getattr(self._local, "operation", None)
+    
+    @contextmanager
+    def activate(self, operation):
+        """在with块中把operation作为当前线程的操作（用于跨越多次事件处理的后台操作）"""
+        previous = self.current()
+        self._local.operation = operation
+        try:
+            yield operation
+        finally:
+            self._local.operation = previous
+    
+    def stage(self, name, nbytes=0):
+        """在当前线程的操作中记录一个阶段，没有正在记录的操作时什么也不做"""
+        return (self.current() or DISABLED_OPERATION).stage(name, nbytes)
+    
+    def annotate(self, detail):
+        """设置当前操作的说明（例如正在加载的文件）"""
+        operation = self.current()
+        if operation is not None:
+            operation.detail = detail
+    
+    @contextmanager
+    def measure(self, name, detail=""):
+        """记录with块作为一次完整的操作，cprofile模式下同时分析当前线程
+        
+        已经在记录其他操作时（例如加载文件后自动显示第一个测试点）作为那个操作的一部分，不单独记录。
+        """
+        current = self.current()
+        if current is not None or not self.enabled:
+            yield current or DISABLED_OPERATION
+            return
+        operation = self.start(name, detail)
+        profile = self._start_profile()
+        try:
+            with self.activate(operation):
+                yield operation
+        finally:
+            self._dump_profile(profile, name)
+            self.finish(operation)
+    
+    def run(self, name, func, *args, **kwargs):
+        """调用func(*args, **kwargs)，cprofile模式下分析这次调用（用于在工作线程中执行的部分）"""
+        profile = self._start_profile()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._dump_profile(profile, name)
+    
+    def _start_profile(self):
+        """cprofile模式下开始分析当前线程，不能同时运行多个分析器（Python 3.12及以上）时返回None"""
+        if self.mode != PROFILE_CPROFILE or self.dump_dir is None:
+            return None
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        return profile
+    
+    def _dump_profile(self, profile, name):
+        """停止分析并保存为.prof文件（可以用pstats或snakeviz查看），只保留最近的MAX_PROFILE_FILES个"""
+        if profile is None:
+            return
+        profile.disable()
+        with self._lock:
+            self._counter += 1
+            file_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._counter}-{name}.prof"
+        try:
+            profile.dump_stats(os.path.join(self.dump_dir, file_name))
+            files = sorted((entry for entry in os.scandir(self.dump_dir) if entry.name.endswith('.prof')),
+                           key=lambda entry: entry.stat().st_mtime)
+            for entry in files[:-MAX_PROFILE_FILES]:
+                os.remove(entry.path)
+        except OSError:
+            pass
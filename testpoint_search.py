@@ -0,0 +1,306 @@
+"""洛谷测试点查看器的全文搜索功能，不依赖图形界面
+
+在所有测试点的输入和输出中查找文字或正则表达式。普通文件按块从磁盘读取，不全部读入内存；
+多个文件在线程池中同时搜索，找到的结果通过回调逐条返回，可以随时取消（包括正在搜索的大文件）。
+正则表达式逐行匹配（与grep相同），匹配不会跨越换行符；内容按UTF-8解码后匹配，.和字符类等按字符而不是字节匹配。
+"""
+import os
+import re
+
+from testpoint_compare import open_buffer
+from testpoint_core import MISSING_INPUT, MISSING_OUTPUT, FileContent
+
+INPUT_SIDE = "input"
+OUTPUT_SIDE = "output"
+MAX_RESULTS = 1000  # 默认最多返回的结果数量，达到后停止搜索
+SNIPPET_LENGTH = 80  # 结果中显示的匹配行的最大字符数
+CHUNK_SIZE = 1024 * 1024  # 查找、运行正则表达式和统计行号时每次处理的字节数
+
+class SearchHit:
+    """一条搜索结果：测试点名称、输入或输出、行号（从1开始）、列号（从1开始，按字节计算）和所在行的文字"""
+    __slots__ = ("name", "side", "line", "column", "text")
+    
+    def __init__(self, name, side, line, column, text):
+        self.name = name
+        self.side = side
+        self.line = line
+        self.column = column
+        self.text = text
+    
+    def __repr__(self):
+        return f"SearchHit({self.name!r}, {self.side}, line={self.line}, column={self.column}, text={self.text!r})"
+
+def required_literal(pattern, flags):
+    """找出正则表达式的每个匹配中都一定包含的最长一段文字（UTF-8编码），找不到（或不确定）时返回None"""
+    try:
+        from re import _parser as sre_parse
+    except ImportError:
+        import sre_parse
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+        if parsed.state.flags & re.IGNORECASE:
+            return None
+        best = run = ''
+        for op, value in parsed:
+            if op == sre_parse.LITERAL:
+                run += chr(value)
+            else:
+                run = ''
+            if len(run) > len(best):
+                best = run
+        best = best.encode('utf-8')
+    except Exception:
+        return None
+    return best if len(best) >= 2 else None
+
+def iter_subpatterns(value):
+    """递归找出解析结果的参数中包含的子模式（分组、重复、分支等）"""
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_subpatterns(item)
+    elif hasattr(value, 'data'):
+        yield value
+
+def looks_past_line_end(pattern, flags):
+    """正则表达式是否包含\\Z或向前查找，这时单独一行中的匹配在整段内容中可能不成立（无法解析时返回True）"""
+    try:
+        from re import _parser as sre_parse
+    except ImportError:
+        import sre_parse
+    try:
+        pending = [sre_parse.parse(pattern, flags)]
+        while pending:
+            for op, value in pending.pop():
+                if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT) and value[0] > 0:
+                    return True
+                if op == sre_parse.AT and value == sre_parse.AT_END_STRING:
+                    return True
+                pending.extend(iter_subpatterns(value))
+    except Exception:
+        return True
+    return False
+
+def iter_line_chunks(buffer, start, end):
+    """按块读取buffer[start:end]，生成(起始偏移, 内容)，每块都在换行符之后结束（一行比块还长时整行读取）"""
+    pos = start
+    while pos < end:
+        stop = min(end, pos + CHUNK_SIZE)
+        if stop < end:
+            newline = buffer.rfind(b'\n', pos, stop)
+            if newline < 0:
+                newline = buffer.find(b'\n', stop, end)
+            stop = end if newline < 0 else newline + 1
+        chunk = buffer[pos:stop]
+        if not chunk:
+            return  # 文件在读取过程中被截断
+        yield pos, chunk
+        pos = stop
+
+def encoded_length(text):
+    """按UTF-8解码（surrogateescape）得到的文字重新编码后的字节数"""
+    return len(text.encode('utf-8', errors='surrogateescape'))
+
+class SearchQuery:
+    """编译后的查询：普通文字直接按字节查找；正则表达式能确定必须包含的文字时，
+    先按字节查找这段文字，只在包含它的行上运行正则表达式
+    
+    正则表达式对按UTF-8解码后的每一行单独匹配，.和字符类按字符匹配，^和$匹配行的开头和结尾，
+    \\s等也不会匹配换行符；格式错误时抛出ValueError。
+    """
+    
+    def __init__(self, query, regex=False, ignore_case=False):
+        if not query:
+            raise ValueError("搜索内容不能为空")
+        pattern = query.encode('utf-8')
+        self.ignore_case = ignore_case
+        self.compiled = None
+        self.line_by_line = False
+        self.needle = pattern.lower() if ignore_case else pattern
+        if regex:
+            flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+            try:
+                self.compiled = re.compile(query, flags)
+            except re.error as e:
+                raise ValueError(f"正则表达式格式错误: {e}")
+            self.needle = None if ignore_case else required_literal(query, flags)
+            # 对整段内容搜索可能漏掉只在单独一行中成立的匹配，这时只能逐行运行正则表达式
+            self.line_by_line = self.needle is None and looks_past_line_end(query, flags)
+    
+    def _find_needle(self, buffer, start, end, cancel_event=None):
+        """按块生成needle出现的位置，不区分大小写时把每块转换为小写后查找"""
+        needle = self.needle
+        # 每块多读len(needle) - 1个字节，保证跨越块边界的匹配也能找到，且只在起点所在的块中报告
+        for chunk_start in range(start, end, CHUNK_SIZE):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            chunk_end = min(end, chunk_start + CHUNK_SIZE)
+            chunk = buffer[chunk_start:min(end, chunk_end + len(needle) - 1)]
+            if self.ignore_case:
+                chunk = chunk.lower()
+            pos = chunk.find(needle)
+            while 0 <= pos < chunk_end - chunk_start:
+                yield chunk_start + pos
+                pos = chunk.find(needle, pos + 1)
+    
+    def _search_line(self, line):
+        """在一行（字节）中运行正则表达式，返回匹配的起始字节偏移，没有匹配时返回None"""
+        text = line.decode('utf-8', errors='surrogateescape')
+        match = self.compiled.search(text)
+        return None if match is None else encoded_length(text[:match.start()])
+        
+    def _match_needle_lines(self, chunk, cancel_event=None):
+        """在包含必须文字的行上运行正则表达式，生成chunk中匹配的起始字节偏移，每行最多一个"""
+        pos = 0  # 总是一行的开头
+        end = len(chunk)
+        while pos < end:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            candidate = chunk.find(self.needle, pos)
+            if candidate < 0:
+                return
+            line_start = chunk.rfind(b'\n', pos, candidate) + 1 or pos
+            line_end = chunk.find(b'\n', candidate)
+            if line_end < 0:
+                line_end = end
+            offset = self._search_line(chunk[line_start:line_end])
+            if offset is not None:
+                yield line_start + offset
+            pos = line_end + 1
+    
+    def _match_text_lines(self, chunk, cancel_event=None):
+        """把chunk解码后运行正则表达式，生成匹配的起始字节偏移，每行最多一个
+        
+        不是逐行运行时先对剩下的全部内容搜索，单独一行中的匹配在整段内容中一定也能找到（开始位置相同或更早），
+        跨越换行符的匹配之后再按行检查。
+        """
+        text = chunk.decode('utf-8', errors='surrogateescape')
+        pos = 0  # 总是一行的开头
+        end = len(text)
+        counted = counted_bytes = 0  # 已经换算为字节偏移的字符位置
+        while pos < end:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if self.line_by_line:
+                candidate = pos
+            else:
+                match = self.compiled.search(text, pos)
+                if match is None:
+                    return
+                candidate = match.start()
+            # 只在候选位置所在的这一行中运行正则表达式，与按必须文字查找的结果相同
+            line_start = text.rfind('\n', pos, candidate) + 1 or pos
+            line_end = text.find('\n', candidate)
+            if line_end < 0:
+                line_end = end
+            match = self.compiled.search(text, line_start, line_end)
+            if match is not None:
+                counted_bytes += encoded_length(text[counted:match.start()])
+                counted = match.start()
+                yield counted_bytes
+            pos = line_end + 1
+    
+    def iter_matches(self, buffer, start, end, cancel_event=None):
+        """生成buffer[start:end]中匹配的起始偏移（字节），正则表达式每行最多生成一个匹配
+        
+        cancel_event被设置后停止，大文件中途也能取消。
+        """
+        if self.compiled is None:
+            yield from self._find_needle(buffer, start, end, cancel_event)
+            return
+        # 正则表达式只能在内存中的数据上运行，按块读取，每块都由完整的行组成
+        match_lines = self._match_needle_lines if self.needle is not None else self._match_text_lines
+        for chunk_start, chunk in iter_line_chunks(buffer, start, end):
+            for pos in match_lines(chunk, cancel_event):
+                yield chunk_start + pos
+            if cancel_event is not None and cancel_event.is_set():
+                return
+
+def search_buffer(name, side, buffer, start, end, query, limit, cancel_event=None):
+    """在一个缓冲区中搜索，同一行的多个匹配只返回第一个，最多返回limit条结果"""
+    hits = []
+    line = 1
+    counted = start  # 已经统计过换行符的位置
+    line_start = start
+    for match_start in query.iter_matches(buffer, start, end, cancel_event):
+        if match_start < line_start:
+            continue  # 与上一条结果在同一行
+        # 分块统计上一次统计的位置到匹配位置之间的换行符
+        while counted < match_start:
+            if cancel_event is not None and cancel_event.is_set():
+                return hits
+            stop = min(match_start, counted + CHUNK_SIZE)
+            chunk = buffer[counted:stop]
+            count = chunk.count(b'\n')
+            if count:
+                line += count
+                line_start = counted + chunk.rfind(b'\n') + 1
+            counted = stop
+        line_end = buffer.find(b'\n', match_start, end)
+        if line_end < 0:
+            line_end = end
+        text = bytes(buffer[line_start:min(line_end, line_start + SNIPPET_LENGTH * 4)])
+        text = text.decode('utf-8', errors='replace').rstrip('\r')[:SNIPPET_LENGTH]
+        hits.append(SearchHit(name, side, line, match_start - line_start + 1, text))
+        # 跳过这一行剩下的部分
+        line += 1
+        counted = line_start = line_end + 1
+        if len(hits) >= limit or (cancel_event is not None and cancel_event.is_set()):
+            break
+    return hits
+
+def search_content(name, side, value, query, limit, cancel_event=None):
+    """在一个测试点的输入或输出中搜索"""
+    if value == MISSING_INPUT or value == MISSING_OUTPUT:
+        return []
+    if not isinstance(value, FileContent):
+        value = value.encode('utf-8')
+    with open_buffer(value) as (buffer, start, end):
+        return search_buffer(name, side, buffer, start, end, query, limit, cancel_event)
+
+class AnyEvent:
+    """任意一个事件被设置时is_set()为真，用于同时检查内部的停止标志和调用者的取消标志"""
+    
+    def __init__(self, *events):
+        self.events = [event for event in events if event is not None]
+    
+    def is_set(self):
+        return any(event.is_set() for event in self.events)
+
+def search_testpoints(items, query, regex=False, ignore_case=False, sides=(INPUT_SIDE, OUTPUT_SIDE),
+                      max_results=MAX_RESULTS, workers=None, result_callback=None, cancel_event=None):
+    """在多个测试点中搜索，items为(名称, 测试点数据)列表，返回搜索结果列表
+    
+    每个测试点的每一侧作为一个任务在线程池中搜索；搜索完一个任务后把它的结果依次传给result_callback(hit)。
+    结果数量达到max_results或cancel_event被设置后停止搜索。
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    query = SearchQuery(query, regex, ignore_case)
+    stop_event = threading.Event()
+    stopped = AnyEvent(stop_event, cancel_event)  # 正在搜索的文件也会在取消后中途停止
+    
+    def run(name, side, value):
+        if stopped.is_set():
+            return []
+        try:
+            return search_content(name, side, value, query, max_results, stopped)
+        except OSError:
+            return []  # 文件已被删除或无法读取
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4)) as executor:
+        futures = [executor.submit(run, name, side, data[side]) for name, data in items for side in sides]
+        for future in as_completed(futures):
+            for hit in future.result():
+                if len(results) >= max_results:
+                    break
+                results.append(hit)
+                if result_callback is not None:
+                    result_callback(hit)
+            if len(results) >= max_results or (cancel_event is not None and cancel_event.is_set()):
+                stop_event.set()
+                for pending in futures:
+                    pending.cancel()
+                break
+    return results
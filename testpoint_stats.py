@@ -0,0 +1,227 @@
+"""洛谷测试点查看器的测试点统计功能，不依赖图形界面
+
+统计测试点内容的大小、行数、单词数，以及第一行和全部内容中整数的最小值、最大值与和，
+用来快速判断"这是不是n最大的测试点"，而不必把几百MB的文件显示出来。
+安装了NumPy时把按块读取的字节批量解析为整数，否则使用纯Python实现，两者结果相同。
+"""
+import re
+
+from testpoint_compare import open_buffer
+from testpoint_core import MISSING_INPUT, MISSING_OUTPUT, FileContent
+
+CHUNK_SIZE = 1024 * 1024  # 每次解析的字节数，块的边界总是落在空白字符上
+MAX_DIGITS = 18  # 超过这个位数的数字（高精度数据）不作为整数统计，保证能用64位整数表示
+INT_TOKEN = re.compile(rb"-?[0-9]{1,%d}" % MAX_DIGITS)
+WHITESPACE = re.compile(rb"\s")
+
+class ContentStats:
+    """一段测试点内容的统计结果，没有整数时最小值、最大值为None"""
+    __slots__ = ("size", "lines", "tokens", "first_count", "first_min", "first_max", "first_sum",
+                 "int_count", "int_min", "int_max", "int_sum")
+    
+    def __init__(self):
+        self.size = 0
+        self.lines = 0
+        self.tokens = 0
+        self.first_count = 0  # 第一行中的整数
+        self.first_min = None
+        self.first_max = None
+        self.first_sum = 0
+        self.int_count = 0  # 全部内容中的整数
+        self.int_min = None
+        self.int_max = None
+        self.int_sum = 0
+    
+    def to_dict(self):
+        """转换为可以保存到缓存中的字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """从缓存的字典恢复"""
+        stats = cls()
+        for name in cls.__slots__:
+            setattr(stats, name, data[name])
+        return stats
+    
+    def __repr__(self):
+        return f"ContentStats(size={self.size}, lines={self.lines}, tokens={self.tokens}, " \
+               f"first=[{self.first_min}, {self.first_max}], ints=[{self.int_min}, {self.int_max}])"
+
+def load_numpy():
+    """NumPy是可选依赖，没有安装时返回None"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def iter_chunks(buffer, start, end):
+    """把[start, end)划分为若干块，每块都在空白字符之后结束，不会把一个单词分到两块中"""
+    pos = start
+    while pos < end:
+        stop = min(end, pos + CHUNK_SIZE)
+        if stop < end:
+            chunk = buffer[pos:stop]
+            cut = max(chunk.rfind(b'\n'), chunk.rfind(b' '))
+            if cut >= 0:
+                stop = pos + cut + 1
+            else:
+                # 一个单词比块还长：向后读取直到空白字符
+                while stop < end:
+                    part = buffer[stop:min(end, stop + CHUNK_SIZE)]
+                    match = WHITESPACE.search(part)
+                    if match is not None:
+                        stop += match.end()
+                        break
+                    stop = stop + len(part) if part else end
+        yield pos, stop
+        pos = stop
+
+def scan_python(chunk):
+    """纯Python实现：返回块中的(单词数, 整数列表)"""
+    tokens = chunk.split()
+    return len(tokens), [int(token) for token in tokens if INT_TOKEN.fullmatch(token)]
+
+def scan_numpy(np, chunk):
+    """用NumPy向量化解析：返回块中的(单词数, 整数数组)"""
+    data = np.frombuffer(chunk, dtype=np.uint8)
+    if not len(data):
+        return 0, np.zeros(0, dtype=np.int64)
+    space_table = np.zeros(256, dtype=bool)
+    space_table[list(b" \t\n\r\f\v")] = True  # 与bytes.split()使用相同的空白字符
+    is_space = space_table[data]
+    previous_space = np.empty_like(is_space)
+    previous_space[0] = True
+    previous_space[1:] = is_space[:-1]
+    next_space = np.empty_like(is_space)
+    next_space[-1] = True
+    next_space[:-1] = is_space[1:]
+    starts = np.flatnonzero(~is_space & previous_space)
+    ends = np.flatnonzero(~is_space & next_space) + 1
+    if not len(starts):
+        return 0, np.zeros(0, dtype=np.int64)
+    
+    # 单词中除了开头的负号全是数字，且位数不超过MAX_DIGITS时是整数
+    is_digit = (data >= 48) & (data <= 57)
+    digit_prefix = np.zeros(len(data) + 1, dtype=np.int64)
+    np.cumsum(is_digit, out=digit_prefix[1:])
+    digits = digit_prefix[ends] - digit_prefix[starts]
+    negative = data[starts] == 45
+    valid = (digits > 0) & (digits <= MAX_DIGITS) & (digits == ends - starts - negative)
+    
+    # 每个数字乘以10的(到单词末尾的距离)次方，再按单词求和
+    token_index = np.cumsum(~is_space & previous_space) - 1
+    exponent = ends[token_index] - 1 - np.arange(len(data))
+    powers = 10 ** np.arange(MAX_DIGITS + 1, dtype=np.int64)
+    weighted = np.where(is_digit, (data - 48).astype(np.int64) * powers[np.clip(exponent, 0, MAX_DIGITS)], 0)
+    values = np.add.reduceat(weighted, starts)[valid]
+    values = np.where(negative[valid], -values, values)
+    return len(starts), values
+
+def add_integers(stats, values, first_line):
+    """把一批整数计入统计结果，values可以是列表或NumPy数组"""
+    if not len(values):
+        return
+    if hasattr(values, 'dtype'):
+        low, high = int(values.min()), int(values.max())
+    else:
+        low, high = min(values), max(values)
+    if hasattr(values, 'dtype') and max(abs(low), abs(high)) < (2 ** 63 - 1) // len(values):
+        total = int(values.sum())  # 不会溢出时直接用64位整数求和
+    else:
+        total = sum(int(value) for value in values)
+    if first_line:
+        stats.first_count += len(values)
+        stats.first_min = low if stats.first_min is None else min(stats.first_min, low)
+        stats.first_max = high if stats.first_max is None else max(stats.first_max, high)
+        stats.first_sum += total
+    stats.int_count += len(values)
+    stats.int_min = low if stats.int_min is None else min(stats.int_min, low)
+    stats.int_max = high if stats.int_max is None else max(stats.int_max, high)
+    stats.int_sum += total
+
+def compute_stats(value, use_numpy=True):
+    """统计测试点内容，value可以是延迟加载的测试点内容或字符串；缺少的输入或输出返回None"""
+    if value == MISSING_INPUT or value == MISSING_OUTPUT:
+        return None
+    if not isinstance(value, FileContent):
+        value = value.encode('utf-8')
+    np = load_numpy() if use_numpy else None
+    stats = ContentStats()
+    with open_buffer(value) as (buffer, start, end):
+        stats.size = end - start
+        first_end = buffer.find(b'\n', start, end)
+        if first_end < 0:
+            first_end = end
+        newlines = 0
+        for chunk_start, chunk_end in iter_chunks(buffer, start, end):
+            # 第一行单独解析，以便分别统计第一行中的整数
+            for part_start, part_end, first_line in ((chunk_start, min(chunk_end, first_end), True),
+                                                      (max(chunk_start, first_end), chunk_end, False)):
+                if part_start >= part_end:
+                    continue
+                chunk = buffer[part_start:part_end]
+                newlines += chunk.count(b'\n')
+                tokens, values = scan_numpy(np, chunk) if np is not None else scan_python(chunk)
+                stats.tokens += tokens
+                add_integers(stats, values, first_line)
+        last_byte = buffer[end - 1:end] if end > start else b'\n'
+        stats.lines = newlines + (0 if last_byte == b'\n' else 1)
+    return stats
+
+def stats_cache_key(value):
+    """测试点内容在统计缓存中的键，只有延迟加载的内容（对应磁盘上的文件）才缓存"""
+    if not isinstance(value, FileContent):
+        return None
+    return "|".join(str(part) for part in (value.KIND, value.path, getattr(value, "member", ""),
+                                           value.offset, value.length, value.size, value.mtime_ns))
+
+def get_stats(value, parse_cache=None, use_numpy=True):
+    """获取测试点内容的统计结果，优先使用缓存"""
+    key = stats_cache_key(value) if parse_cache is not None else None
+    if key is not None:
+        cached = parse_cache.get_stats(key)
+        if cached is not None:
+            return ContentStats.from_dict(cached)
+    stats = compute_stats(value, use_numpy)
+    if key is not None and stats is not None:
+        parse_cache.put_stats(key, stats.to_dict())
+    return stats
+
+def stats_testpoints(items, parse_cache=None, workers=None, result_callback=None, cancel_event=None):
+    """统计多个测试点的输入和输出，items为(名称, 测试点数据)列表，返回{名称: (输入统计, 输出统计)}
+    
+    每统计完一个测试点调用一次result_callback(name, input_stats, output_stats)；cancel_event被设置后不再开始新的测试点。
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    def run(name, data):
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        result = []
+        for side in ('input', 'output'):
+            try:
+                result.append(get_stats(data[side], parse_cache))
+            except OSError:
+                result.append(None)  # 文件已被删除或无法读取
+        return name, result[0], result[1]
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = [executor.submit(run, name, data) for name, data in items]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                name, input_stats, output_stats = result
+                results[name] = (input_stats, output_stats)
+                if result_callback is not None:
+                    result_callback(name, input_stats, output_stats)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return results
@@ -0,0 +1,227 @@
+"""testpoint_compare的测试：三种比较方式、误差范围、行末空白和末尾空行、报告的第一个不同之处，以及逐行差异对比"""
+import os
+import random
+import re
+import shutil
+import tempfile
+import unittest
+from array import array
+from unittest import mock
+
+import testpoint_compare
+from testpoint_compare import FLOAT_MODE, LINE_MODE, TOKEN_MODE, DiffDocument, compare_outputs, diff_hashes
+
+def normalized_lines(data):
+    """逐行比较的参考实现：删除行末空白字符和末尾的空行"""
+    lines = [re.sub(rb"[ \t\r\f\v]+$", b"", line) for line in data.split(b"\n")]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+class LineModeTest(unittest.TestCase):
+    
+    def test_trailing_space_and_blank_lines(self):
+        self.assertTrue(compare_outputs(b"1 2  \r\n3\t\n\n\n", b"1 2\n3", LINE_MODE))
+        self.assertTrue(compare_outputs(b"1\n", b"1\n\n \n\t\n", LINE_MODE))
+        self.assertTrue(compare_outputs(b"", b"\n\n", LINE_MODE))
+    
+    def test_inner_whitespace_matters(self):
+        self.assertFalse(compare_outputs(b"1  2\n", b"1 2\n", LINE_MODE))
+        self.assertFalse(compare_outputs(b" 1\n", b"1\n", LINE_MODE))
+        self.assertFalse(compare_outputs(b"1\n\n2\n", b"1\n2\n", LINE_MODE))
+    
+    def test_first_difference(self):
+        result = compare_outputs(b"abc\n  x\n", b"abc\n  y\n", LINE_MODE)
+        self.assertEqual((result.line, result.column, result.token), (2, 3, None))
+        self.assertEqual((result.expected, result.actual), ("y", "x"))
+        self.assertEqual(result.describe(), "第2行第3列不同：期望 'y'，实际 'x'")
+    
+    def test_different_length(self):
+        result = compare_outputs(b"1 2\n3", b"1 2\n3\n4\n", LINE_MODE)
+        self.assertEqual((result.line, result.column, result.expected, result.actual), (3, 1, "4", "<文件结束>"))
+        result = compare_outputs(b"1 2\n3\n\n5\n", b"1 2\n3\n", LINE_MODE)
+        self.assertEqual((result.line, result.column, result.expected, result.actual), (4, 1, "<文件结束>", "5"))
+    
+    def test_chunk_boundaries(self):
+        # 很小的块让行末空白、很长的空白和换行落在块的边界上，结果应与参考实现和不分块时一致
+        rng = random.Random(20240601)
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        actual_path = os.path.join(directory, "actual.out")
+        expected_path = os.path.join(directory, "expected.out")
+        for case in range(200):
+            expected = bytes(rng.choice(b"ab  \t\r\n\n") for _ in range(rng.randrange(30)))
+            actual = expected
+            if case % 2:
+                actual = bytearray(expected + b" \t\n" * rng.randrange(3))
+                if actual and case % 4 == 1:
+                    actual[rng.randrange(len(actual))] = rng.choice(b"ab \n")
+                actual = bytes(actual)
+            with open(actual_path, "wb") as f:
+                f.write(actual)
+            with open(expected_path, "wb") as f:
+                f.write(expected)
+            reference = compare_outputs(actual, expected, LINE_MODE)
+            self.assertEqual(bool(reference), normalized_lines(actual) == normalized_lines(expected), (actual, expected))
+            for chunk_size in (1, 2, 3, 5):
+                with self.subTest(case=case, chunk_size=chunk_size), \
+                        mock.patch.object(testpoint_compare, "CHUNK_SIZE", chunk_size):
+                    result = compare_outputs(actual_path, expected_path, LINE_MODE)
+                    self.assertEqual(repr(result), repr(reference))
+
+class TokenModeTest(unittest.TestCase):
+    
+    def test_whitespace_ignored(self):
+        self.assertTrue(compare_outputs(b"1  2\n\n3", b"1 2 3", TOKEN_MODE))
+        self.assertTrue(compare_outputs(b"\r\n1\t2\r\n", b"1 2", TOKEN_MODE))
+        self.assertFalse(compare_outputs(b"1 2 3", b"1 23", TOKEN_MODE))
+    
+    def test_first_difference(self):
+        result = compare_outputs(b"1 2\n3 5", b"1 2 3 4", TOKEN_MODE)
+        self.assertEqual((result.line, result.column, result.token), (2, 3, 4))
+        self.assertEqual(result.describe(), "第2行第3列（第4个单词）不同：期望 '4'，实际 '5'")
+        result = compare_outputs(b"1 2", b"1 2 3", TOKEN_MODE)
+        self.assertEqual((result.line, result.column, result.token, result.actual), (1, 4, 3, "<文件结束>"))
+    
+    def test_numbers_compared_exactly(self):
+        self.assertFalse(compare_outputs(b"1.0", b"1", TOKEN_MODE))
+    
+    def test_long_tokens_across_chunks(self):
+        with mock.patch.object(testpoint_compare, "CHUNK_SIZE", 3):
+            self.assertTrue(compare_outputs(b"abcdefgh  ij\n", b"abcdefgh ij", TOKEN_MODE))
+            result = compare_outputs(b"abcdefgh ij x", b"abcdefgh ik x", TOKEN_MODE)
+            self.assertEqual((result.column, result.token, result.expected), (10, 2, "ik"))
+
+class FloatModeTest(unittest.TestCase):
+    
+    def test_absolute_error(self):
+        self.assertTrue(compare_outputs(b"1.0000001", b"1", FLOAT_MODE))
+        self.assertTrue(compare_outputs(b"0.0000009", b"0", FLOAT_MODE))
+        self.assertFalse(compare_outputs(b"1.00001", b"1", FLOAT_MODE))
+        self.assertFalse(compare_outputs(b"0.000002", b"0", FLOAT_MODE))
+    
+    def test_relative_error(self):
+        # 答案的绝对值大于1时按相对误差比较
+        self.assertTrue(compare_outputs(b"1000000.5", b"1000000", FLOAT_MODE))
+        self.assertFalse(compare_outputs(b"1000010", b"1000000", FLOAT_MODE))
+        self.assertTrue(compare_outputs(b"1000010", b"1000000", FLOAT_MODE, eps=1e-5))
+    
+    def test_custom_eps(self):
+        self.assertTrue(compare_outputs(b"0.15", b"0.1", FLOAT_MODE, eps=0.06))
+        self.assertFalse(compare_outputs(b"0.15", b"0.1", FLOAT_MODE, eps=0.01))
+    
+    def test_non_numbers(self):
+        self.assertTrue(compare_outputs(b"YES 1.0000001", b"YES 1", FLOAT_MODE))
+        self.assertTrue(compare_outputs(b"nan", b"nan", FLOAT_MODE))
+        self.assertFalse(compare_outputs(b"nan", b"1", FLOAT_MODE))
+        result = compare_outputs(b"abc 1", b"abd 1", FLOAT_MODE)
+        self.assertEqual((result.line, result.column, result.token), (1, 1, 1))
+
+class CompareSourcesTest(unittest.TestCase):
+    
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            compare_outputs(b"", b"", "exact")
+    
+    def test_file_objects(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b"1 2  \n")
+            f.flush()
+            self.assertTrue(compare_outputs(f, b"1 2", LINE_MODE))
+
+def lcs_length(a, b):
+    """最长公共子序列的长度，用于检查差异是否最优"""
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for index, y in enumerate(b):
+            current.append(previous[index] + 1 if x == y else max(previous[index + 1], current[-1]))
+        previous = current
+    return previous[-1]
+
+class DiffHashesTest(unittest.TestCase):
+    
+    def check(self, a, b, max_cost=None):
+        """计算差异，检查操作列表首尾相接，并且能分别从a重建b、从b重建a"""
+        a, b = array('q', a), array('q', b)
+        opcodes = diff_hashes(a, b) if max_cost is None else diff_hashes(a, b, max_cost)
+        i = j = 0
+        to_b, to_a = [], []
+        for tag, i1, i2, j1, j2 in opcodes:
+            self.assertEqual((i1, j1), (i, j))
+            self.assertEqual((i1 < i2, j1 < j2), {'equal': (True, True), 'replace': (True, True),
+                                                  'delete': (True, False), 'insert': (False, True)}[tag])
+            if tag == 'equal':
+                self.assertEqual(a[i1:i2], b[j1:j2])
+                to_b.extend(a[i1:i2])
+                to_a.extend(b[j1:j2])
+            else:
+                to_b.extend(b[j1:j2])
+                to_a.extend(a[i1:i2])
+            i, j = i2, j2
+        self.assertEqual((i, j), (len(a), len(b)))
+        self.assertEqual(to_a, list(a))
+        self.assertEqual(to_b, list(b))
+        return opcodes
+    
+    def equal_lines(self, opcodes):
+        return sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+    
+    def test_empty_inputs(self):
+        self.assertEqual(self.check([], []), [])
+        self.assertEqual(self.check([], [1, 2]), [('insert', 0, 0, 0, 2)])
+        self.assertEqual(self.check([1, 2], []), [('delete', 0, 2, 0, 0)])
+        self.assertEqual(self.check([1, 2], [1, 2]), [('equal', 0, 2, 0, 2)])
+    
+    def test_unique_lines_filtered(self):
+        # 只在一侧出现的行被提前去掉，相同的块在换算回原来的行号时会被它们分开
+        a = [1, 2, 100, 3, 4, 101, 102, 5, 6]
+        b = [1, 200, 2, 3, 201, 4, 5, 202, 6]
+        opcodes = self.check(a, b)
+        self.assertEqual(self.equal_lines(opcodes), 6)
+        self.assertEqual(self.check([100, 101], [200]), [('replace', 0, 2, 0, 1)])
+        self.assertEqual(self.equal_lines(self.check([7, 100, 7], [7, 7, 200])), 2)
+    
+    def test_random_sequences(self):
+        rng = random.Random(20240602)
+        for case in range(500):
+            a = [rng.randrange(6) for _ in range(rng.randrange(25))]
+            if case % 2:
+                b = list(a)
+                for _ in range(rng.randrange(5)):
+                    position = rng.randrange(len(b) + 1)
+                    b[position:position + rng.randrange(2)] = [rng.randrange(10, 13)] * rng.randrange(3)
+            else:
+                b = [rng.randrange(6) for _ in range(rng.randrange(25))]
+            with self.subTest(a=a, b=b):
+                self.assertEqual(self.equal_lines(self.check(a, b)), lcs_length(a, b))
+                # 编辑距离的上限很小时不再细分，但结果仍然有效
+                self.check(a, b, max_cost=1)
+
+class DiffDocumentTest(unittest.TestCase):
+    
+    def test_aligned_sides(self):
+        document = DiffDocument("a\nb\nc\nd\n", "a\nx  \ny\nc\n")
+        self.addCleanup(document.close)
+        self.assertEqual(document.left.get_lines(0, document.left.line_count), "a\nb\n\nc\nd\n")
+        self.assertEqual(document.right.get_lines(0, document.right.line_count), "a\nx  \ny\nc\n\n")
+        self.assertEqual(list(document.left.line_tags(0, 10)), [('changed', 1, 2), ('filler', 2, 3), ('removed', 4, 5)])
+        self.assertEqual(list(document.right.line_tags(0, 10)), [('changed', 1, 3), ('filler', 4, 5)])
+        self.assertEqual(document.right.source_line(2), 2)
+        self.assertIsNone(document.left.source_line(2))
+    
+    def test_change_navigation(self):
+        document = DiffDocument("a\nb\nc\nd\n", "a\nx\ny\nc\n")
+        self.addCleanup(document.close)
+        self.assertEqual(document.changes, [1, 4])
+        self.assertEqual((document.next_change(0), document.next_change(1), document.next_change(4)), (1, 4, None))
+        self.assertEqual((document.previous_change(4), document.previous_change(1)), (1, None))
+        self.assertEqual([document.change_index(row) for row in (1, 4, 2, 5)], [0, 1, None, None])
+    
+    def test_trailing_space_ignored(self):
+        document = DiffDocument("1 2  \n3\t\n", "1 2\n3\n")
+        self.addCleanup(document.close)
+        self.assertEqual(document.changes, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""testpoint_core中流式JSON读写的测试：分块边界、转义、代理对，以及导出后重新加载"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from testpoint_core import (FileContent, JsonEventReader, JsonStringContent, load_json_testpoints, read_content,
+                            write_testpoints_json)
+
+TRICKY = 'a"b\\c\n\té中\U0001F600\\"end\\\\'
+
+def read_events(data, chunk_size, decode_limit=None):
+    """用指定的块大小读取JSON字节串，返回事件列表"""
+    reader = JsonEventReader(io.BytesIO(data), decode_limit)
+    reader.CHUNK_SIZE = chunk_size
+    return list(reader.events())
+
+def read_all(testpoints):
+    """把测试点数据中的内容全部读出来，便于比较"""
+    return {name: (read_content(data['input']), read_content(data['output'])) for name, data in testpoints.items()}
+
+class JsonEventReaderTest(unittest.TestCase):
+    
+    def test_strings_split_across_chunks(self):
+        data = json.dumps({"k": [TRICKY, 12, True, None, "x"]}).encode('utf-8')
+        expected = read_events(data, len(data) + 1)
+        for chunk_size in range(1, 12):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(read_events(data, chunk_size), expected)
+        strings = [value for event, value in expected if event == 'string']
+        self.assertEqual(strings[0][2], TRICKY)
+        # 偏移和长度对应原始字节中的字符串字面量
+        offset, length, _ = strings[0]
+        self.assertEqual(json.loads(data[offset:offset + length]), TRICKY)
+    
+    def test_surrogate_pair_escape(self):
+        data = b'["\\ud83d\\ude00", "\\u4e2d"]'
+        for chunk_size in (1, 2, 3, 5, 100):
+            with self.subTest(chunk_size=chunk_size):
+                values = [value[2] for event, value in read_events(data, chunk_size) if event == 'string']
+                self.assertEqual(values, ["\U0001F600", "中"])
+    
+    def test_long_string_not_decoded(self):
+        data = json.dumps(["x" * 50, "y"]).encode('utf-8')
+        for chunk_size in (1, 7, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                strings = [value for event, value in read_events(data, chunk_size, decode_limit=10) if event == 'string']
+                self.assertIsNone(strings[0][2])
+                self.assertEqual(strings[0][:2], (1, 52))
+                self.assertEqual(strings[1][2], "y")
+    
+    def test_unterminated_string(self):
+        with self.assertRaises(ValueError):
+            read_events(b'["abc', 2)
+
+class JsonTestpointsTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def write(self, name, value):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        return path
+    
+    def load(self, path, lazy):
+        # 很小的块大小让字符串和转义序列跨越读取的边界
+        with mock.patch.object(JsonEventReader, 'CHUNK_SIZE', 7):
+            return load_json_testpoints(path, lazy=lazy)
+    
+    def test_top_level_list(self):
+        path = self.write("list.json", [{"name": "a", "input": "1 2\n", "output": "3\n"},
+                                        {"input": TRICKY, "output": 5}])
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                self.assertEqual(read_all(self.load(path, lazy)), {
+                    "list.json_a": ("1 2\n", "3\n"),
+                    "list.json_测试点_2": (TRICKY, "5"),
+                })
+    
+    def test_luogu_test_cases(self):
+        long_input = TRICKY * 500  # 超过延迟加载时解码的长度上限
+        path = self.write("p.json", {"title": "A+B", "samples": {"input": "x", "output": "y"},
+                                     "testCases": [{"input": "1 2\n", "output": "3\n"},
+                                                   {"input": long_input, "output": "\\"}]})
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                testpoints = self.load(path, lazy)
+                self.assertEqual(read_all(testpoints), {
+                    "p.json_测试点_1": ("1 2\n", "3\n"),
+                    "p.json_测试点_2": (long_input, "\\"),
+                })
+                self.assertEqual(isinstance(testpoints["p.json_测试点_2"]['input'], JsonStringContent), lazy)
+    
+    def test_export_and_reload(self):
+        text_path = os.path.join(self.directory, "1.in")
+        with open(text_path, 'wb') as f:
+            f.write(b"1\r\n2\r3\n" + "中文".encode('utf-8') * 3000)
+        source = self.write("source.json", {"testCases": [{"input": TRICKY * 500, "output": "ok"}]})
+        json_content = self.load(source, lazy=True)["source.json_测试点_1"]['input']
+        self.assertIsInstance(json_content, JsonStringContent)
+        items = [
+            ("plain", {"input": TRICKY, "output": ""}),
+            ("file", {"input": FileContent(text_path), "output": "7\n"}),
+            ("json", {"input": json_content, "output": TRICKY}),
+        ]
+        expected = {name: (read_content(data['input']), read_content(data['output'])) for name, data in items}
+        for name, compact in (("out.json", False), ("out.json", True), ("out.json.gz", False)):
+            with self.subTest(name=name, compact=compact):
+                path = os.path.join(self.directory, name)
+                self.assertTrue(write_testpoints_json(items, path, compact=compact))
+                if not name.endswith('.gz'):
+                    # 导出的文件也是标准的JSON
+                    with open(path, encoding='utf-8') as f:
+                        exported = json.load(f)
+                    self.assertEqual({key: (value['input'], value['output']) for key, value in exported.items()}, expected)
+                for lazy in (False, True):
+                    reloaded = read_all(self.load(path, lazy))
+                    self.assertEqual(reloaded, {f"{name}_{key}": value for key, value in expected.items()})
+
+if __name__ == "__main__":
+    unittest.main()
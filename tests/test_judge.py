@@ -0,0 +1,44 @@
+"""testpoint_judge的测试：设置资源限制的启动器本身的时间和内存不计入评测结果"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from testpoint_judge import AC, MLE, build_command, resource, run_testpoint
+
+AB_SCRIPT = "#!/bin/sh\nread a b\necho $((a + b))\n"
+
+@unittest.skipIf(resource is None or shutil.which("sh") is None, "需要resource模块和/bin/sh")
+class JudgeLimitTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.program = os.path.join(self.directory, "ab.sh")
+        with open(self.program, "w") as f:
+            f.write(AB_SCRIPT)
+        os.chmod(self.program, 0o755)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_ab_under_tight_memory_limit(self):
+        # 16MB小于Python解释器本身的内存，启动器的内存不能算到程序头上
+        data = {"input": "1 2\n", "output": "3\n"}
+        for memory_mb in (8, 16):
+            with self.subTest(memory_mb=memory_mb):
+                result = run_testpoint(build_command(self.program), "1", data, time_limit=1.0,
+                                       memory_limit=memory_mb * 1024 * 1024)
+                self.assertEqual(result.verdict, AC, result.message)
+                self.assertTrue(result.memory is None or result.memory <= memory_mb * 1024 * 1024)
+                self.assertLess(result.time, 0.5)
+    
+    def test_memory_limit_still_applies(self):
+        program = os.path.join(self.directory, "big.py")
+        with open(program, "w") as f:
+            f.write("x = bytearray(400 * 1024 * 1024)\nprint(3)\n")
+        result = run_testpoint(build_command(program), "1", {"input": "", "output": "3\n"},
+                               memory_limit=64 * 1024 * 1024)
+        self.assertEqual(result.verdict, MLE)
+
+if __name__ == "__main__":
+    unittest.main()
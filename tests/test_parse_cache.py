@@ -0,0 +1,121 @@
+"""ParseCache的测试：相关文件或目录变化时失效、版本变化时重建，以及按最近最少使用的顺序淘汰"""
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from testpoint_core import FileContent, ParseCache, make_source_spec, parse_testpoint_source
+
+class ParseCacheTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.data_dir = os.path.join(self.directory, "data")
+        os.mkdir(self.data_dir)
+        for name, text in (("1.in", "1 2\n"), ("1.out", "3\n"), ("2.in", "5 6\n"), ("2.out", "11\n")):
+            self.write(name, text)
+        self.db_path = os.path.join(self.directory, "cache.db")
+        self.cache = self.open_cache()
+        self.spec = make_source_spec(self.data_dir, False)
+    
+    def open_cache(self, **kwargs):
+        cache = ParseCache(self.db_path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+    
+    def write(self, name, text):
+        path = os.path.join(self.data_dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+    
+    def parse(self):
+        """解析文件夹来源并写入缓存"""
+        testpoints = parse_testpoint_source(self.spec, lazy=True, parse_cache=self.cache)
+        self.assertEqual(len(testpoints), 2)
+        return testpoints
+    
+    def shift_mtime(self, path, delta_ns=10 ** 9):
+        """修改文件或目录的修改时间，不依赖文件系统的时间精度"""
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + delta_ns))
+    
+    def test_round_trip(self):
+        testpoints = self.parse()
+        cached = self.cache.get(self.spec)
+        self.assertEqual(sorted(cached), sorted(testpoints))
+        for name, data in cached.items():
+            self.assertIsInstance(data['input'], FileContent)
+            self.assertEqual(data['input'].read(), testpoints[name]['input'].read())
+    
+    def test_file_size_change(self):
+        self.parse()
+        path = os.path.join(self.data_dir, "1.out")
+        stat = os.stat(path)
+        with open(path, "a") as f:
+            f.write("4\n")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # 只有大小变化
+        self.assertIsNone(self.cache.get(self.spec))
+        # 失效的条目已被删除
+        self.assertIsNone(self.cache.get(self.spec))
+    
+    def test_file_mtime_change(self):
+        self.parse()
+        self.shift_mtime(os.path.join(self.data_dir, "2.in"))
+        self.assertIsNone(self.cache.get(self.spec))
+    
+    def test_directory_change(self):
+        self.parse()
+        self.shift_mtime(self.data_dir)
+        self.assertIsNone(self.cache.get(self.spec))
+    
+    def test_file_removed(self):
+        self.parse()
+        os.remove(os.path.join(self.data_dir, "2.out"))
+        self.assertIsNone(self.cache.get(self.spec))
+    
+    def test_unrelated_change_keeps_entry(self):
+        self.parse()
+        self.shift_mtime(self.directory)  # 上一级目录不是依赖
+        self.assertIsNotNone(self.cache.get(self.spec))
+    
+    def test_schema_version_bump(self):
+        self.parse()
+        self.cache.close()
+        self.assertIsNotNone(self.open_cache().get(self.spec))
+        with mock.patch.object(ParseCache, "SCHEMA_VERSION", ParseCache.SCHEMA_VERSION + 1):
+            self.assertIsNone(self.open_cache().get(self.spec))
+        # 旧版本打开时同样重建
+        self.assertIsNone(self.open_cache().get(self.spec))
+    
+    def test_lru_eviction(self):
+        max_bytes = 4000
+        cache = self.open_cache(max_bytes=max_bytes)
+        paths = [self.write(f"{index}.txt", str(index)) for index in range(20)]
+        entry = {"t": {"input": "x" * 300, "output": ""}}
+        # 用递增的计数代替当前时间，使最近使用的顺序确定
+        with mock.patch("testpoint_core.time.time", side_effect=itertools.count().__next__):
+            for index, path in enumerate(paths):
+                cache.put(path, entry)
+                if index >= 1:
+                    self.assertIsNotNone(cache.get(paths[0]))  # 一直在使用的条目不会被淘汰
+                total = cache._conn.execute("SELECT SUM(payload_size) FROM parse_cache").fetchone()[0]
+                self.assertLessEqual(total, max_bytes)
+            kept = [path for path in paths if cache.get(path) is not None]
+        self.assertIn(paths[0], kept)
+        self.assertIn(paths[-1], kept)
+        self.assertLess(len(kept), len(paths))
+        # 淘汰的是最久未使用的条目：保留的是最后写入的一段
+        self.assertEqual(kept[1:], paths[len(paths) - len(kept) + 1:])
+    
+    def test_oversized_entry_not_cached(self):
+        cache = self.open_cache(max_bytes=800)
+        path = self.write("big.txt", "x")
+        cache.put(path, {"t": {"input": "x" * 200, "output": ""}})
+        self.assertIsNone(cache.get(path))
+
+if __name__ == "__main__":
+    unittest.main()
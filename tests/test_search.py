@@ -0,0 +1,99 @@
+"""testpoint_search的测试：正则表达式逐行按字符匹配，有没有必须包含的文字时结果相同，大文件中途可以取消"""
+import threading
+import time
+import unittest
+
+from testpoint_search import INPUT_SIDE, SearchQuery, search_buffer, search_testpoints
+
+def search(pattern, text, ignore_case=False):
+    """在只有一个测试点输入的数据中搜索，返回(行号, 列号)列表"""
+    items = [("1", {"input": text, "output": ""})]
+    hits = search_testpoints(items, pattern, regex=True, ignore_case=ignore_case, sides=(INPUT_SIDE,), workers=1)
+    return [(hit.line, hit.column) for hit in hits]
+
+class RegexLineTest(unittest.TestCase):
+    
+    def test_query_paths(self):
+        # 确认下面的测试分别覆盖了两种查找方式
+        self.assertEqual(SearchQuery(r"abc\s+def", regex=True).needle, b"abc")
+        self.assertIsNotNone(SearchQuery(r"[a-z]+\s+def", regex=True).needle)
+        self.assertIsNone(SearchQuery(r"[a-z]+\s+[de]e[fg]", regex=True).needle)
+        self.assertTrue(SearchQuery(r"[a-c]+\Z", regex=True).line_by_line)
+    
+    def test_no_match_across_lines(self):
+        for pattern in (r"abc\s+def", r"[a-z]+\s+def", r"[a-z]+\s+[de]e[fg]", r"c[^x]d", r"(?s)c.d", "c\nd"):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(search(pattern, "abc\ndef\n"), [])
+    
+    def test_match_within_line(self):
+        for pattern in (r"abc\s+def", r"[a-z]+\s+def", r"[a-z]+\s+[de]e[fg]"):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(search(pattern, "xyz\nabc  def\n"), [(2, 1)])
+    
+    def test_later_line_after_cross_line_match(self):
+        # 第一处匹配跨越换行符，后面的行中仍能找到单独一行中的匹配
+        text = "abc\ndef\nabc def\n"
+        self.assertEqual(search(r"abc\s+def", text), [(3, 1)])
+        self.assertEqual(search(r"[a-c]+\s+[de]e[fg]", text), [(3, 1)])
+    
+    def test_line_boundaries(self):
+        text = "12 ab\n34\nab 56\n"
+        self.assertEqual(search(r"^\d+$", text), [(2, 1)])
+        self.assertEqual(search(r"ab\Z", text), [(1, 4)])
+        self.assertEqual(search(r"[a-b]+\Z", text), [(1, 4)])
+        self.assertEqual(search(r"\d(?!\d)", text), [(1, 2), (2, 2), (3, 5)])
+    
+    def test_ignore_case(self):
+        self.assertEqual(search(r"ABC\s+DEF", "abc\ndef\nABC def\n", ignore_case=True), [(3, 1)])
+
+class RegexCharacterTest(unittest.TestCase):
+    # 列号按字节计算，一个汉字占3个字节
+    
+    def test_dot_matches_character(self):
+        self.assertEqual(search("中.", "中文\n"), [(1, 1)])
+        self.assertEqual(search("^中.$", "中文\n中\n"), [(1, 1)])
+        self.assertEqual(search("^.{2}$", "ab\n中文\n中文字\n"), [(1, 1), (2, 1)])
+        self.assertEqual(search("^.$", "中文\n"), [])
+    
+    def test_character_classes(self):
+        self.assertEqual(search(r"\w+", "  中文\n"), [(1, 3)])
+        self.assertEqual(search("[中文]{2}", "a 中文\n"), [(1, 3)])
+        self.assertEqual(search("[^a]文", "a中文\n"), [(1, 2)])
+    
+    def test_needle_path(self):
+        self.assertEqual(SearchQuery("测试.+结果", regex=True).needle, "测试".encode('utf-8'))
+        text = "第一行\n测试结果\n一些测试和结果\n"
+        self.assertEqual(search("测试.+结果", text), [(3, 7)])
+        self.assertEqual(search("测试.{2,}结果", text), [])
+        self.assertEqual(search("[一些]+测试", text), [(3, 1)])
+    
+    def test_columns_after_match_on_same_chunk(self):
+        # 同一块中多行匹配时，字节偏移换算不能出错
+        text = "中a\n文文b\nc\n中中中d\n"
+        self.assertEqual(search("[a-d]", text), [(1, 4), (2, 7), (3, 1), (4, 10)])
+    
+    def test_invalid_utf8(self):
+        buffer = b"\xff\xfeab\n\xe4cd\n"
+        for pattern in ("[a-z]+", "[a-z]{2}"):
+            with self.subTest(pattern=pattern):
+                hits = search_buffer("1", INPUT_SIDE, buffer, 0, len(buffer), SearchQuery(pattern, regex=True), 10)
+                self.assertEqual([(hit.line, hit.column) for hit in hits], [(1, 3), (2, 2)])
+
+class CancelTest(unittest.TestCase):
+    
+    def check_cancelled(self, pattern, regex):
+        buffer = b"x" * (64 * 1024 * 1024)
+        cancel_event = threading.Event()
+        cancel_event.set()
+        begin = time.perf_counter()
+        hits = search_buffer("1", INPUT_SIDE, buffer, 0, len(buffer), SearchQuery(pattern, regex), 10, cancel_event)
+        self.assertEqual(hits, [])
+        self.assertLess(time.perf_counter() - begin, 0.5)
+    
+    def test_cancel_inside_file(self):
+        for pattern, regex in (("xy", False), ("xy", True), ("[y]", True), (r"y\Z", True)):
+            with self.subTest(pattern=pattern, regex=regex):
+                self.check_cancelled(pattern, regex)
+
+if __name__ == '__main__':
+    unittest.main()